@@ -1,31 +1,27 @@
 # WebSecurity.py
-from datetime import timedelta
+import hashlib
+import os
+import secrets
+import threading
+import time
+from datetime import datetime, timedelta, timezone
 from flask_sqlalchemy import SQLAlchemy
 from flask_wtf import CSRFProtect
-from flask_login import LoginManager, UserMixin, login_user, login_required, logout_user, current_user
+from flask_login import LoginManager, UserMixin, login_user, login_required, logout_user, current_user, user_logged_in
 from werkzeug.security import generate_password_hash, check_password_hash
 from sqlalchemy import text
-from flask import session, request, redirect, url_for, render_template_string
-import bleach
+from flask import session, request, redirect, url_for, render_template, jsonify
+from bleach.sanitizer import Cleaner
 
-# --- Assume 'app' is imported from app.py ---
-from app import app  # IMPORTANT: import the existing Flask app
+from response_cache import LRUCache
+from session_store import ServerSessionInterface, SessionStore
+from user_store import USER_DB_PATH
 
-# --- Session & security config ---
-app.config["SESSION_COOKIE_HTTPONLY"] = True
-app.config["SESSION_COOKIE_SECURE"] = False  # Set True in production
-app.config["SESSION_COOKIE_SAMESITE"] = "Lax"
-app.config["PERMANENT_SESSION_LIFETIME"] = timedelta(minutes=30)
-
-# --- Database setup ---
-app.config["SQLALCHEMY_DATABASE_URI"] = "sqlite:///site.db"
-app.config["SQLALCHEMY_TRACK_MODIFICATIONS"] = False
-db = SQLAlchemy(app)
-
-# --- CSRF & Login ---
-csrf = CSRFProtect(app)
-login_manager = LoginManager(app)
-login_manager.login_view = "login"
+# --- Extensions, bound to the app by init_app() ---
+db = SQLAlchemy()
+csrf = CSRFProtect()
+login_manager = LoginManager()
+login_manager.login_view = "site.login_page"
 
 # --- User model (for DB) ---
 class User(UserMixin, db.Model):
@@ -33,59 +29,228 @@ class User(UserMixin, db.Model):
     username = db.Column(db.String(64), unique=True, index=True, nullable=False)
     password_hash = db.Column(db.String(255), nullable=False)
 
-with app.app_context():
-    db.create_all()
+# --- Comments (sanitised HTML, newest first by id) ---
+# Each visitor sees only their own comments, as when they lived in the
+# session cookie: `owner` is a random token kept in the session, so it
+# follows the session across login/logout and goes when the session does.
+class Comment(db.Model):
+    __table_args__ = (db.Index("ix_comment_owner_id", "owner", "id"),)
+    id = db.Column(db.Integer, primary_key=True)
+    owner = db.Column(db.String(32), nullable=False)
+    body = db.Column(db.Text, nullable=False)
+    created_at = db.Column(db.DateTime, nullable=False, default=lambda: datetime.now(timezone.utc))
+
+# --- Loaded users, cached per session for a short while ---
+USER_CACHE_SIZE = int(os.environ.get("USER_CACHE_SIZE", 4096))
+USER_CACHE_TTL = float(os.environ.get("USER_CACHE_TTL", 60))
+# (session id, user id) -> (expiry, SessionUser); keyed by session so a
+# logout or a session expiry never hands a user to anyone else
+user_cache = LRUCache(USER_CACHE_SIZE)
+
+class SessionUser(UserMixin):
+    """Plain copy of a User's columns, safe to share between requests.
+
+    A User instance belongs to the SQLAlchemy session that loaded it and
+    is expired by that session's next commit, so it cannot be cached.
+    """
+
+    def __init__(self, id, username):
+        self.id = id
+        self.username = username
 
 @login_manager.user_loader
 def load_user(user_id):
-    return db.session.get(User, int(user_id))
+    key = (getattr(session, "sid", None), user_id)
+    cached = user_cache.get(key)
+    if cached is not None and cached[0] > time.monotonic():
+        return cached[1]
+    row = db.session.get(User, int(user_id))
+    if row is None:
+        return None
+    user = SessionUser(row.id, row.username)
+    if key[0] is not None:
+        user_cache.put(key, (time.monotonic() + USER_CACHE_TTL, user))
+    return user
 
 # --- Security headers ---
-@app.after_request
-def set_security_headers(resp):
-    resp.headers["Content-Security-Policy"] = (
+# The pages still carry inline scripts and event handlers, and index.html
+# pulls Font Awesome from cdnjs; the policy has to allow both. asgi.py adds
+# the same set to the responses it sends without going through Flask.
+SECURITY_HEADERS = {
+    "Content-Security-Policy": (
         "default-src 'self'; "
-        "script-src 'self'; "
-        "style-src 'self' 'unsafe-inline'; "
+        "script-src 'self' 'unsafe-inline'; "
+        "style-src 'self' 'unsafe-inline' https://cdnjs.cloudflare.com; "
+        "font-src 'self' https://cdnjs.cloudflare.com; "
         "img-src 'self' data:; "
         "frame-ancestors 'none'; "
         "base-uri 'self'; "
         "form-action 'self'"
-    )
-    resp.headers["X-Frame-Options"] = "DENY"
-    resp.headers["X-Content-Type-Options"] = "nosniff"
-    resp.headers["Referrer-Policy"] = "strict-origin-when-cross-origin"
-    resp.headers["Permissions-Policy"] = "geolocation=(), microphone=(), camera=()"
+    ),
+    "X-Frame-Options": "DENY",
+    "X-Content-Type-Options": "nosniff",
+    "Referrer-Policy": "strict-origin-when-cross-origin",
+    "Permissions-Policy": "geolocation=(), microphone=(), camera=()",
+}
+
+def set_security_headers(resp):
+    resp.headers.update(SECURITY_HEADERS)
     return resp
 
 # --- XSS-safe comment posting ---
 ALLOWED_TAGS = ["b", "i", "strong", "em", "a", "code"]
 ALLOWED_ATTRS = {"a": ["href", "title", "rel"]}
+COMMENTS_PER_PAGE = 20
+MAX_COMMENTS_PER_PAGE = 100
+
+# One sanitiser per thread, reused for every submission (bleach.clean
+# builds a new one per call); a Cleaner is not thread-safe. Comments are
+# stored cleaned, so rendering never re-sanitises.
+_cleaners = threading.local()
+
+def clean_comment(raw):
+    cleaner = getattr(_cleaners, "cleaner", None)
+    if cleaner is None:
+        cleaner = _cleaners.cleaner = Cleaner(tags=ALLOWED_TAGS, attributes=ALLOWED_ATTRS, strip=True)
+    return cleaner.clean(raw)
+
+def comment_page(owner, before=None, after=None, limit=COMMENTS_PER_PAGE):
+    """One page of `owner`'s comments plus the cursor of the next older page (or None).
+
+    Keyset pagination on (owner, id): each page is one index range scan
+    however long the thread is. Without `after` the page runs newest
+    first, below `before` if given; with `after` it holds the comments
+    posted since that id, oldest first, for appending.
+    """
+    if owner is None:
+        return [], None
+    query = db.select(Comment).where(Comment.owner == owner).limit(limit + 1)
+    if after is not None:
+        query = query.where(Comment.id > after).order_by(Comment.id)
+    else:
+        query = query.order_by(Comment.id.desc())
+        if before is not None:
+            query = query.where(Comment.id < before)
+    comments = db.session.scalars(query).all()
+    older = None
+    if len(comments) > limit:
+        comments = comments[:limit]
+        if after is None:
+            older = comments[-1].id
+    return comments, older
+
+def comment_owner(create=False):
+    """This session's comment owner token; made on first use if `create`."""
+    owner = session.get("comment_owner")
+    if owner is None and create:
+        owner = session["comment_owner"] = secrets.token_urlsafe(24)
+    return owner
 
-@app.route("/comment", methods=["GET", "POST"])
 def post_comment():
-    comments = session.get("comments", [])
     if request.method == "POST":
         raw = request.form.get("comment", "")
-        cleaned = bleach.clean(raw, tags=ALLOWED_TAGS, attributes=ALLOWED_ATTRS, strip=True)
-        comments.append(cleaned)
-        session["comments"] = comments
+        db.session.add(Comment(owner=comment_owner(create=True), body=clean_comment(raw)))
+        db.session.commit()
         return redirect(url_for("post_comment"))
-    return render_template_string("""
-        <h2>Comments (XSS-safe)</h2>
-        <form method="post">{{ csrf_token() }}
-            <textarea name="comment" rows="3" cols="40" placeholder="Say hi (HTML allowed but sanitized)"></textarea>
-            <button>Post</button>
-        </form>
-        <ul>{% for c in comments %}<li>{{ c|safe }}</li>{% endfor %}</ul>
-    """, comments=comments)
+    comments, older = comment_page(comment_owner(), before=request.args.get("before", type=int))
+    # templates/comments.html is compiled on first use and cached by Jinja
+    return render_template("comments.html", comments=comments, older=older)
+
+def comments_api():
+    """GET /comments: JSON pages of this session's comments.
+
+    ?before=<id> pages back through older comments (newest first);
+    ?after=<id> returns what was posted since, oldest first, so a client
+    appends it to what it already shows. The response carries `before`
+    (cursor of the next older page, or null) and `after` (the newest id
+    seen, to poll with).
+    """
+    before = request.args.get("before", type=int)
+    after = request.args.get("after", type=int)
+    limit = request.args.get("limit", COMMENTS_PER_PAGE, type=int)
+    limit = max(1, min(limit, MAX_COMMENTS_PER_PAGE))
+    comments, older = comment_page(comment_owner(), before=before, after=after, limit=limit)
+    ids = [c.id for c in comments]
+    return jsonify({
+        "comments": [{"id": c.id, "html": c.body, "created_at": c.created_at.isoformat()}
+                     for c in comments],
+        "before": older,
+        "after": max(ids) if ids else after,
+    })
 
 # --- Optional: session hijack / integrity checks ---
-@app.before_request
+# Files never need the check: static files, built assets and video ranges.
+# Nor do the JSON APIs that never look at the session or the user. Their
+# responses do not depend on the cookie, so they must not carry
+# Vary: Cookie either (/recommend is publicly cacheable).
+UNCHECKED_ENDPOINTS = {
+    "static", "site.asset", "site.video",
+    "site.recommend_route", "site.recommend_cache_stats", "site.recommend_batch_route",
+    "site.suggest_cities", "site.health", "site.readiness", "site.chatbot", "metrics",
+}
+
+def ua_fingerprint():
+    """Short hash of the User-Agent; what the session stores and compares."""
+    return hashlib.sha256(request.headers.get("User-Agent", "").encode("utf-8")).hexdigest()[:32]
+
+@user_logged_in.connect
+def remember_user_agent(sender, user, **extra):
+    session["ua"] = ua_fingerprint()
+
 def enforce_session_controls():
+    if request.endpoint in UNCHECKED_ENDPOINTS:
+        return
+    # only a logged-in session carries _user_id; skip the user load otherwise
+    if "_user_id" not in session:
+        return
     if current_user.is_authenticated:
-        if session.get("ua") != request.headers.get("User-Agent", "")[:120]:
+        if session.get("ua") != ua_fingerprint():
+            user_cache.pop((getattr(session, "sid", None), session.get("_user_id")))
             logout_user()
             session.clear()
             return "Session integrity check failed. Please sign in again.", 401
-        
+
+def ignore_session_reads(resp):
+    # Flask-Login's remember-cookie hook reads the session on every
+    # response, which makes the session interface add Vary: Cookie
+    if request.endpoint in UNCHECKED_ENDPOINTS:
+        session.accessed = False
+    return resp
+
+
+def init_app(app):
+    """Apply the session/database config and register the extensions, hooks and routes.
+
+    Creates the database tables (users, comments, sessions), then closes the
+    pooled connections (SQLAlchemy's and the session store's) so none is
+    inherited by workers forked after this (see gunicorn.conf.py).
+    """
+    # --- Session & security config ---
+    # server-side sessions: the cookie holds only an opaque ID
+    app.session_interface = ServerSessionInterface(SessionStore())
+    app.config["SESSION_COOKIE_HTTPONLY"] = True
+    app.config["SESSION_COOKIE_SECURE"] = False  # Set True in production
+    app.config["SESSION_COOKIE_SAMESITE"] = "Lax"
+    app.config["PERMANENT_SESSION_LIFETIME"] = timedelta(minutes=30)
+
+    # --- Database setup: the same SQLite file user_store.py uses ---
+    app.config["SQLALCHEMY_DATABASE_URI"] = "sqlite:///" + os.path.abspath(USER_DB_PATH)
+    app.config["SQLALCHEMY_TRACK_MODIFICATIONS"] = False
+    db.init_app(app)
+
+    # --- CSRF & Login ---
+    csrf.init_app(app)
+    # after_request hooks run last-registered first: this one must follow
+    # the one login_manager registers
+    app.after_request(ignore_session_reads)
+    login_manager.init_app(app)
+
+    app.after_request(set_security_headers)
+    app.before_request(enforce_session_controls)
+    app.add_url_rule("/comment", "post_comment", post_comment, methods=["GET", "POST"])
+    app.add_url_rule("/comments", "comments_api", comments_api, methods=["GET"])
+
+    with app.app_context():
+        db.create_all()
+        db.engine.dispose()
+    app.session_interface.store.close()
@@ -1,469 +1,505 @@
+import hmac
 import os
-import pickle
-from flask import Flask, request, jsonify, send_from_directory, session
+import threading
+from flask import Blueprint, Flask, current_app, request, jsonify, session
 import hashlib
-import json
-import pandas as pd
+import metrics
+import WebSecurity
+from assets import send_asset, send_page
+from chatbot import matcher as chatbot_intents
+from cities import CITIES
+from media import send_video
+from model_reload import ModelReloader
+from pages import send_city_page
+from response_cache import LRUCache
+from passwords import HasherBusy, PasswordHasher
+from user_store import UserStore
 
 # ---------------------------
 # User handling
 # ---------------------------
+# Legacy JSON user file; imported into the SQLite user store on first start.
 USERS_FILE = 'users.json'
 
+user_store = None
+
+
 def load_users():
-    if os.path.exists(USERS_FILE):
+    """Open the user store, importing the legacy users.json into an empty one."""
+    global user_store
+    user_store = UserStore()
+    if user_store.is_empty() and os.path.exists(USERS_FILE):
         try:
-            with open(USERS_FILE, 'r', encoding='utf-8') as f:
-                return json.load(f)
-        except Exception:
-            return {}
-    return {}
+            user_store.import_users_json(USERS_FILE)
+        except Exception as e:
+            print(f"Warning: failed to import {USERS_FILE}: {e}")
+
 
-def save_users(users):
-    with open(USERS_FILE, 'w', encoding='utf-8') as f:
-        json.dump(users, f, indent=2)
+password_hasher = PasswordHasher()
 
-def hash_password(pw):
-    return hashlib.sha256(pw.encode('utf-8')).hexdigest()
+def busy_response():
+    resp = jsonify({'error': 'server busy, please retry'})
+    resp.status_code = 503
+    resp.headers['Retry-After'] = '1'
+    return resp
 
 # ---------------------------
-# Flask app setup
+# Routes live on a blueprint; create_app() below builds the app
 # ---------------------------
-app = Flask(__name__, static_folder='static')
-app.secret_key = os.environ.get('FLASK_SECRET_KEY', 'dev-secret-please-change')
+site = Blueprint('site', __name__)
+
+# Either the pickled model.pkl or a memory-mapped model directory
+# (see model_store.py).
+MODEL_PATH = os.environ.get('MODEL_PATH', 'model.pkl')
+
+# Maximum number of cities accepted by one /recommend/batch request.
+MAX_BATCH_CITIES = 100
 
+# Serialised /recommend bodies kept in memory, and how long clients may
+# reuse a response before revalidating it with If-None-Match.
+RECOMMEND_CACHE_SIZE = int(os.environ.get('RECOMMEND_CACHE_SIZE', 1024))
+RECOMMEND_MAX_AGE = int(os.environ.get('RECOMMEND_MAX_AGE', 300))
+recommend_cache = LRUCache(RECOMMEND_CACHE_SIZE)
+
+# Bearer token for POST /admin/reload; the endpoint is disabled without one.
+ADMIN_TOKEN = os.environ.get('ADMIN_TOKEN')
 
 # ---------------------------
-# WebSecurity integration
+# Model loading
 # ---------------------------
-# Import init function from WebSecurity.py and initialize
+def model_swapped(old, new):
+    # cached bodies are keyed by model version and can never hit again
+    recommend_cache.clear()
 
 
-
-MODEL_PATH = 'model.pkl'
+# models.current is the loaded Model (see model_store.py), or None. Read it
+# once per request: a reload swaps in a new object without touching the
+# one a request in flight is using.
+models = ModelReloader(MODEL_PATH, on_swap=model_swapped)
 
 # ---------------------------
-# Model loading
+# Model and app metrics
 # ---------------------------
-artifacts = None
-if os.path.exists(MODEL_PATH):
-    try:
-        with open(MODEL_PATH, 'rb') as f:
-            artifacts = pickle.load(f)
-    except Exception as e:
-        print(f"Warning: failed to load {MODEL_PATH}: {e}")
-
-if artifacts:
-    vectorizer = artifacts.get('vectorizer')
-    tfidf = artifacts.get('tfidf')
-    sim_matrix = artifacts.get('sim_matrix')
-    city_df = artifacts.get('city_df')
-    city_col = artifacts.get('city_col')
-    dur_col = artifacts.get('dur_col')
-    time_col = artifacts.get('time_col')
-    city_to_idx = artifacts.get('city_to_idx')
-else:
-    # placeholders to avoid NameError
-    vectorizer = None
-    tfidf = None
-    sim_matrix = None
-    city_df = None
-    city_col = None
-    dur_col = None
-    time_col = None
-    city_to_idx = None
+metrics.registry.describe('recommend_stage_seconds', 'histogram',
+                          'Time spent in each /recommend stage (lookup, score, serialize).')
+
+
+def collect_app_metrics():
+    model = models.current
+    yield ('model_loaded', 'gauge', 'Whether the recommender model is loaded and ready.',
+           [({}, model is not None)])
+    if model is not None:
+        yield ('model_info', 'gauge', 'Loaded model version and scoring mode.',
+               [({'version': model.version, 'mode': model.recommender.mode}, 1)])
+        yield ('model_load_seconds', 'gauge', 'Time taken to load the model and build the recommender.',
+               [({}, model.load_seconds)])
+        yield ('model_artifact_bytes', 'gauge', 'Size on disk of the loaded model artifacts.',
+               [({}, model.size_bytes)])
+    stats = recommend_cache.stats()
+    yield ('recommend_cache_hits_total', 'counter', '/recommend response cache hits.',
+           [({}, stats['hits'])])
+    yield ('recommend_cache_misses_total', 'counter', '/recommend response cache misses.',
+           [({}, stats['misses'])])
+    yield ('recommend_cache_evictions_total', 'counter', '/recommend response cache evictions.',
+           [({}, stats['evictions'])])
+    yield ('recommend_cache_entries', 'gauge', 'Responses held in the /recommend cache.',
+           [({}, stats['size'])])
+    yield ('chatbot_intent_hits_total', 'counter', 'Chatbot messages answered, by intent.',
+           [({'intent': name}, count) for name, count in sorted(chatbot_intents.stats().items())])
+
+
+metrics.registry.add_collector(collect_app_metrics)
 
 # ---------------------------
 # Routes
 # ---------------------------
 
-@app.route('/recommend', methods=['GET'])
+MODEL_NOT_LOADED = 'Model not loaded. Please run the notebook to create model.pkl'
+
+
+def resolve_city(model, city):
+    """Map a user-supplied name to a city_to_idx key, fuzzy matching if needed."""
+    if city in model.city_to_idx:
+        return city
+    return model.city_index.resolve(city)
+
+
+def format_results(model, neighbors, scores):
+    results = []
+    for i, score in zip(neighbors.tolist(), scores.tolist()):
+        name, duration, best_time = model.rows[i]
+        results.append({
+            'city': name,
+            model.dur_col: duration,
+            model.time_col: best_time,
+            'score': score
+        })
+    return results
+
+
+class BadQuery(Exception):
+    """A /recommend query answered with an error instead of results."""
+
+    def __init__(self, message, status):
+        super().__init__(message)
+        self.status = status
+
+
+def recommend_key(model, city, topn):
+    """Validate /recommend arguments and resolve the city against `model`.
+
+    Returns the response cache key and its ETag. Results only depend on the
+    resolved city, the effective topn and the model version, so that triple
+    keys both. Raises BadQuery for queries that get an error response.
+    """
+    if not city:
+        raise BadQuery("Missing required query parameter: city", 400)
+    try:
+        topn = int(topn)
+    except ValueError:
+        raise BadQuery("topn must be an integer", 400)
+
+    if model is None:
+        raise BadQuery(MODEL_NOT_LOADED, 500)
+
+    # fuzzy match if exact not found
+    with metrics.registry.timer('recommend_stage_seconds', stage='lookup'):
+        match = resolve_city(model, city)
+    if match is None:
+        raise BadQuery(f"City '{city}' not found", 404)
+
+    topn = max(0, min(topn, model.recommender.size - 1))
+    key = (match, topn, model.version)
+    return key, hashlib.sha1(repr(key).encode('utf-8')).hexdigest()[:20]
+
+
+def recommend_body(model, key):
+    """Serialised /recommend response for a key from recommend_key, cached."""
+    body = recommend_cache.get(key)
+    if body is None:
+        city, topn, _ = key
+        with metrics.registry.timer('recommend_stage_seconds', stage='score'):
+            neighbors, scores = model.recommender.top_neighbors(model.city_to_idx[city], topn)
+        with metrics.registry.timer('recommend_stage_seconds', stage='serialize'):
+            body = jsonify({'query_city': city,
+                            'results': format_results(model, neighbors, scores)}).get_data()
+        recommend_cache.put(key, body)
+    return body
+
+
+@site.route('/recommend', methods=['GET'])
 def recommend_route():
     """Return top-n similar cities for a given city name."""
-    city = request.args.get('city')
-    if not city:
-        return jsonify({'error': "Missing required query parameter: city"}), 400
+    model = models.current
+    try:
+        key, etag = recommend_key(model, request.args.get('city'), request.args.get('topn', 5))
+    except BadQuery as e:
+        return jsonify({'error': str(e)}), e.status
+
+    if request.if_none_match.contains(etag):
+        resp = current_app.response_class(status=304)
+    else:
+        resp = current_app.response_class(recommend_body(model, key), mimetype='application/json')
+    resp.set_etag(etag)
+    resp.headers['Cache-Control'] = f'public, max-age={RECOMMEND_MAX_AGE}'
+    resp.headers['X-Model-Version'] = model.version
+    return resp
+
+
+@site.route('/recommend/cache', methods=['GET'])
+def recommend_cache_stats():
+    """Hit/miss/eviction counters of the /recommend response cache."""
+    return jsonify(recommend_cache.stats())
+
+
+@site.route('/recommend/batch', methods=['POST'])
+def recommend_batch_route():
+    """Return top-n similar cities for many city names in one request.
+
+    Expects JSON {"cities": [...], "topn": 5}. Each entry of the response
+    mirrors what /recommend returns for that city.
+    """
+    data = request.get_json(silent=True)
+    if not isinstance(data, dict):
+        return jsonify({'error': "cities must be a non-empty list of city names"}), 400
+    cities = data.get('cities')
+    if not isinstance(cities, list) or not cities or not all(isinstance(c, str) for c in cities):
+        return jsonify({'error': "cities must be a non-empty list of city names"}), 400
+    if len(cities) > MAX_BATCH_CITIES:
+        return jsonify({'error': f"at most {MAX_BATCH_CITIES} cities per request"}), 400
 
     try:
-        topn = int(request.args.get('topn', 5))
-    except ValueError:
+        topn = int(data.get('topn', 5))
+    except (TypeError, ValueError):
         return jsonify({'error': "topn must be an integer"}), 400
 
-    if artifacts is None or city_to_idx is None or sim_matrix is None:
-        return jsonify({'error': 'Model not loaded. Please run the notebook to create model.pkl'}), 500
+    model = models.current
+    if model is None:
+        return jsonify({'error': MODEL_NOT_LOADED}), 500
 
-    # fuzzy match if exact not found
-    if city not in city_to_idx:
-        candidates = [c for c in city_to_idx.keys() if c.lower() == city.lower()]
-        if candidates:
-            city = candidates[0]
-        else:
-            candidates = [c for c in city_to_idx.keys() if city.lower() in c.lower()]
-            if candidates:
-                city = candidates[0]
-            else:
-                return jsonify({'error': f"City '{city}' not found"}), 404
-
-    idx = city_to_idx[city]
-    scores = list(enumerate(sim_matrix[idx]))
-    scores = sorted(scores, key=lambda x: x[1], reverse=True)
+    resolved = [resolve_city(model, city) if city else None for city in cities]
+    found = [name for name in resolved if name is not None]
+    neighbors, scores = model.recommender.top_neighbors_batch(
+        [model.city_to_idx[name] for name in found], topn)
 
     results = []
-    for i, score in scores:
-        if i == idx:
+    row = 0
+    for city, name in zip(cities, resolved):
+        if name is None:
+            results.append({'city': city, 'error': f"City '{city}' not found"})
             continue
         results.append({
-            'city': str(city_df.loc[i, city_col]),
-            dur_col: str(city_df.loc[i, dur_col]),
-            time_col: str(city_df.loc[i, time_col]),
-            'score': float(score)
+            'city': city,
+            'query_city': name,
+            'results': format_results(model, neighbors[row], scores[row]),
         })
-        if len(results) >= topn:
-            break
+        row += 1
 
-    return jsonify({'query_city': city, 'results': results})
+    resp = jsonify({'topn': topn, 'results': results})
+    resp.headers['X-Model-Version'] = model.version
+    return resp
 
 
-@app.route('/health', methods=['GET'])
-def health():
-    return jsonify({'status': 'ok'})
-
-
-# ---- Static HTML pages ----
-@app.route('/')
-def index():
-    return send_from_directory(app.static_folder, 'index.html')
+@site.route('/cities/suggest', methods=['GET'])
+def suggest_cities():
+    """Autocomplete city names for a partial or misspelt query."""
+    query = request.args.get('q')
+    if not query:
+        return jsonify({'error': "Missing required query parameter: q"}), 400
 
-@app.route('/login')
-def login_page():
-    return send_from_directory(app.static_folder, 'login.html')
-
-@app.route('/signup')
-def signup_page():
-    return send_from_directory(app.static_folder, 'signup.html')
+    try:
+        limit = min(int(request.args.get('limit', 10)), 50)
+    except ValueError:
+        return jsonify({'error': "limit must be an integer"}), 400
 
-@app.route('/kolkata')
-def kolkata_page():
-    return send_from_directory(app.static_folder, 'kolkatapage.html')
+    model = models.current
+    if model is None:
+        return jsonify({'error': MODEL_NOT_LOADED}), 500
 
-@app.route('/varanasi')
-def varanasi_page():
-    return send_from_directory(app.static_folder, 'varanasipage.html')
+    resp = jsonify({'query': query, 'suggestions': model.city_index.search(query, limit)})
+    resp.headers['X-Model-Version'] = model.version
+    return resp
 
-@app.route('/goa')
-def goa_page():
-    return send_from_directory(app.static_folder, 'goapage.html')
 
-@app.route('/mumbai')
-def mumbai_page():
-    return send_from_directory(app.static_folder, 'mumbaipage.html')
+@site.route('/health', methods=['GET'])
+def health():
+    """Liveness plus model readiness; status is 'degraded' without a usable model."""
+    model = models.current
+    return jsonify({
+        'status': 'ok' if model is not None else 'degraded',
+        'model': {
+            # only validated models are ever swapped in
+            'loaded': model is not None,
+            'ready': model is not None,
+            'version': model.version if model is not None else None,
+            'mode': model.recommender.mode if model is not None else None,
+            'cities': model.recommender.size if model is not None else 0,
+        },
+    })
+
+
+@site.route('/admin/reload', methods=['POST'])
+def admin_reload():
+    """Reload the model in the background; needs `Authorization: Bearer $ADMIN_TOKEN`.
+
+    Answers 202 straight away; /health shows the version once it is swapped
+    in. Only this process reloads: under gunicorn rely on the watcher
+    (MODEL_WATCH_INTERVAL), which runs in every worker.
+    """
+    if not ADMIN_TOKEN:
+        return jsonify({'error': 'not found'}), 404
+    token = request.headers.get('Authorization', '').removeprefix('Bearer ')
+    if not hmac.compare_digest(token.encode('utf-8'), ADMIN_TOKEN.encode('utf-8')):
+        return jsonify({'error': 'forbidden'}), 403
+    models.request_reload()
+    model = models.current
+    return jsonify({'reloading': True, 'version': model.version if model is not None else None}), 202
+
+
+@site.route('/ready', methods=['GET'])
+def readiness():
+    """Readiness probe: 503 until this process has run warm_up()."""
+    if not ready.is_set():
+        return jsonify({'ready': False}), 503
+    return jsonify({'ready': True})
 
-@app.route('/shimla')
-def shimla_page():
-    return send_from_directory(app.static_folder, 'shimlapage.html')
 
-@app.route('/chennai')
-def chennai_page():
-    return send_from_directory(app.static_folder, 'chennaipage.html')
+# ---- Static HTML pages ----
+@site.route('/')
+def index():
+    return send_page('index.html')
 
-@app.route('/jaipur')
-def jaipur_page():
-    return send_from_directory(app.static_folder, 'jaipurpage.html')
+@site.route('/login')
+def login_page():
+    return send_page('login.html')
 
-@app.route('/delhi')
-def delhi_page():
-    return send_from_directory(app.static_folder, 'delhipage.html')
+@site.route('/signup')
+def signup_page():
+    return send_page('signup.html')
 
-@app.route('/tips')
+@site.route('/tips')
 def tips_page():
-    return send_from_directory(app.static_folder, 'tips.html')
+    return send_page('tips.html')
 
-@app.route('/time')
+@site.route('/time')
 def time_page():
-    return send_from_directory(app.static_folder, 'time.html')
+    return send_page('time.html')
 
-@app.route('/market')
+@site.route('/market')
 def market_page():
-    return send_from_directory(app.static_folder, 'market.html')
+    return send_page('market.html')
 
-@app.route('/index')
+@site.route('/index')
 def index_page():
-    return send_from_directory(app.static_folder, 'index.html')
+    return send_page('index.html')
+
+# one rendered template per city in cities.py
+@site.route('/<city>')
+def city_page(city):
+    return send_city_page(city)
+
+# fingerprinted, pre-compressed files produced by build_static.py
+@site.route('/assets/<path:filename>')
+def asset(filename):
+    return send_asset(filename)
+
+# city videos, with Range support and a per-worker stream cap
+@site.route('/videos/<name>')
+def video(name):
+    return send_video(name)
 
 
 
 
 
 # ---- Auth API ----
-@app.route('/auth/signup', methods=['POST'])
+@site.route('/auth/signup', methods=['POST'])
 def signup():
     data = request.get_json() or {}
     username = (data.get('username') or '').strip()
     password = data.get('password') or ''
     if not username or not password:
         return jsonify({'error': 'username and password required'}), 400
-    users = load_users()
-    if username in users:
+    # cheap existence check first so taken names don't cost a KDF run
+    if user_store.get_password_hash(username) is not None:
+        return jsonify({'error': 'user exists'}), 400
+    try:
+        pw_hash = password_hasher.hash(password)
+    except HasherBusy:
+        return busy_response()
+    if not user_store.create_user(username, pw_hash):
         return jsonify({'error': 'user exists'}), 400
-    users[username] = {'pw': hash_password(password)}
-    save_users(users)
     return jsonify({'ok': True})
 
-@app.route('/auth/login', methods=['POST'])
+@site.route('/auth/login', methods=['POST'])
 def login():
     data = request.get_json() or {}
     username = (data.get('username') or '').strip()
     password = data.get('password') or ''
-    users = load_users()
-    if username not in users:
+    stored = user_store.get_password_hash(username)
+    if stored is None:
         return jsonify({'error': 'invalid credentials'}), 400
-    if users[username].get('pw') != hash_password(password):
+    try:
+        ok, needs_rehash = password_hasher.verify(stored, password)
+    except HasherBusy:
+        return busy_response()
+    if not ok:
         return jsonify({'error': 'invalid credentials'}), 400
+    if needs_rehash:
+        # upgrade legacy SHA-256 / outdated-cost entries transparently
+        try:
+            user_store.set_password_hash(username, password_hasher.hash(password))
+        except HasherBusy:
+            pass
+    # a new session ID, so one handed out before login never gains it
+    session.regenerate()
     session['username'] = username
     return jsonify({'ok': True, 'username': username})
 
-@app.route('/auth/whoami', methods=['GET'])
+@site.route('/auth/whoami', methods=['GET'])
 def whoami():
     username = session.get('username')
     if not username:
         return jsonify({'ok': False}), 200
     return jsonify({'ok': True, 'username': username})
 
-@app.route('/auth/logout', methods=['POST'])
+@site.route('/auth/logout', methods=['POST'])
 def logout():
     session.pop('username', None)
+    session.regenerate()
     return jsonify({'ok': True})
 
 # ---------------------------
 # chat bot
 
-@app.route('/chatbot', methods=['POST'])
+@site.route('/chatbot', methods=['POST'])
 def chatbot():
-    data = request.get_json()
-    user_msg = (data.get("message") or "").lower()
-
-    # Simple rule-based responses
-    if any(word in user_msg for word in ["hello", "hi", "hey"]):
-        reply = "👋 Hello! I’m your travel assistant. How can I help you today?"
-    elif "help" in user_msg:
-        reply = "💡 You can ask me about cities, booking options, best time to visit, food, or travel tips!"
-    elif "recommend" in user_msg or "suggest" in user_msg:
-        reply = "🌍 Looking for ideas? Try beaches in Goa, forts in Jaipur, backwaters in Kerala, or mountains in Himachal Pradesh!"
-    elif "book" in user_msg or "ticket" in user_msg or "hotel" in user_msg:
-        reply = "🛫 You can book flights, trains, buses, or hotels in the 'Book Now' section."
-    
-    # City-specific answers
-    elif "kolkata" in user_msg:
-        reply = "🌆 Kolkata is the City of Joy — famous for Durga Puja, Howrah Bridge, Victoria Memorial, and street food."
-    elif "goa" in user_msg:
-        reply = "🏖 Goa is perfect for beaches, nightlife, water sports, and fun!"
-    elif "delhi" in user_msg:
-        reply = "🏰 Delhi is rich with history — visit Red Fort, India Gate, Lotus Temple, and Chandni Chowk for food!"
-    elif "mumbai" in user_msg or "bombay" in user_msg:
-        reply = "🌇 Mumbai is the City of Dreams — don’t miss Marine Drive, Gateway of India, Bollywood vibes, and street food!"
-    elif "jaipur" in user_msg:
-        reply = "🏯 Jaipur is the Pink City — famous for Hawa Mahal, Amber Fort, and vibrant bazaars!"
-    elif "kerala" in user_msg:
-        reply = "🌴 Kerala is God’s Own Country — enjoy houseboats in Alleppey, Munnar tea gardens, and backwaters."
-    elif "himachal" in user_msg or "manali" in user_msg or "shimla" in user_msg:
-        reply = "⛰ Himachal is great for mountains, trekking, snow, and adventure — perfect for Manali and Shimla trips."
-    elif "chennai" in user_msg:
-        reply = "🌊 Chennai is famous for Marina Beach, temples, and delicious South Indian food!"
-    elif "bengaluru" in user_msg or "bangalore" in user_msg:
-        reply = "🌳 Bengaluru is the Garden City — famous for IT hub, parks, pubs, and pleasant weather!"
-    elif "agra" in user_msg or "taj mahal" in user_msg:
-        reply = "🏛 Agra is home to the Taj Mahal — one of the Seven Wonders of the World!"
-    
-    # Experience-specific questions
-    elif "food" in user_msg:
-        reply = "🍴 India is a food paradise! Try pani puri in Mumbai, rosogolla in Kolkata, biryani in Hyderabad, and dosa in Chennai!"
-    elif "festival" in user_msg:
-        reply = "🎉 India celebrates many festivals — Durga Puja in Kolkata, Diwali across India, Holi in Mathura, and Ganesh Chaturthi in Mumbai."
-    elif "best time" in user_msg or "season" in user_msg:
-        reply = "🗓 Best time to visit depends on the city! Winter (Oct–Feb) is great for most places, while Goa & Kerala are perfect in November–March."
-    elif "mountain" in user_msg or "hill station" in user_msg:
-        reply = "⛰ For mountains, try Manali, Shimla, Darjeeling, Ooty, or Leh-Ladakh!"
-    elif "beach" in user_msg:
-        reply = "🏝 For beaches, try Goa, Pondicherry, Andaman & Nicobar Islands, or Kerala!"
-    elif "shopping" in user_msg:
-        reply = "🛍 For shopping, visit Chandni Chowk (Delhi), New Market (Kolkata), Commercial Street (Bengaluru), and Colaba Causeway (Mumbai)."
-    elif "itinerary" in user_msg or "plan trip" in user_msg:
-        reply = "📅 Sure! Tell me the city and days, and I can suggest a short travel plan."
-    
-     # City-specific answers
-    elif "kolkata" in user_msg:
-        reply = ("🌆 Kolkata, the City of Joy — famous for Durga Puja, Howrah Bridge, Victoria Memorial, "
-                 "and street food like rosogolla and puchka.")
-    elif "varanasi" in user_msg:
-        reply = ("🛕 Varanasi — spiritual heart of India on the Ganges, known for ghats, "
-                 "sunrise boat rides, Kashi Vishwanath Temple, and silk weaving.")
-    elif "goa" in user_msg:
-        reply = ("🏖 Goa — beaches, nightlife, water sports, Portuguese heritage, and seafood delights!")
-    elif "mumbai" in user_msg:
-        reply = ("🌇 Mumbai, the City of Dreams — visit Gateway of India, Marine Drive, Bollywood spots, "
-                 "and street food like vada pav and pav bhaji.")
-    elif "shimla" in user_msg:
-        reply = ("⛰ Shimla — queen of hills, perfect for snow in winter, Mall Road shopping, "
-                 "and scenic viewpoints.")
-    elif "chennai" in user_msg:
-        reply = ("🌊 Chennai — Marina Beach, Kapaleeshwarar Temple, rich South Indian culture, "
-                 "and filter coffee!")
-    elif "jaipur" in user_msg:
-        reply = ("🏯 Jaipur, the Pink City — Amber Fort, Hawa Mahal, city palaces, and traditional Rajasthani cuisine.")
-    elif "delhi" in user_msg:
-        reply = ("🏛 Delhi — Red Fort, India Gate, Lotus Temple, Chandni Chowk for street food, "
-                 "blend of modern & historical India.")
-
-    # Theme-based queries
-    elif "food" in user_msg:
-        reply = ("🍴 Try Kolkata’s puchka, Mumbai’s vada pav, Chennai’s dosa, Jaipur’s dal baati, "
-                 "Varanasi’s kachori, and Goa’s seafood!")
-    elif "festival" in user_msg:
-        reply = ("🎉 Major festivals: Durga Puja in Kolkata, Diwali nationwide, Holi in Mathura, "
-                 "Ganesh Chaturthi in Mumbai, and Ganga Aarti in Varanasi.")
-    elif "best time" in user_msg or "season" in user_msg:
-        reply = ("🗓 Best travel times: Oct–Feb is ideal for most cities. Hill stations like Shimla in summer, "
-                 "Goa and Kerala in winter.")
-    elif "mountain" in user_msg or "hill station" in user_msg:
-        reply = "⛰ For mountains: Shimla, Manali, Darjeeling, Ooty, or Himachal Pradesh regions."
-    elif "beach" in user_msg:
-        reply = "🏝 For beaches: Goa, Kerala, Pondicherry, Andaman & Nicobar Islands."
-    elif "shopping" in user_msg:
-        reply = ("🛍 Best shopping: Chandni Chowk (Delhi), New Market (Kolkata), Colaba Causeway (Mumbai), "
-                 "Johari Bazaar (Jaipur), Mall Road (Shimla).")
-    elif "itinerary" in user_msg or "plan trip" in user_msg:
-        reply = "📅 Tell me the city and number of days, and I can suggest a mini travel plan!"
-
-    elif "help" in user_msg:
-        reply = "🆘 How can I assist you further?"
-    
-    #Detailed city guides
-    # Kolkata  
-    elif "kolkata" in user_msg:
-        reply = (
-        "🌆 Kolkata — the City of Joy!\n\n"
-        "🏛 Famous Landmarks: Victoria Memorial, Howrah Bridge, Indian Museum, Marble Palace.\n"
-        "🍴 Food & Cuisine: Street food like puchka, kathi rolls, rosogolla, mishti doi.\n"
-        "🎉 Festivals: Durga Puja (main event), Diwali, Kali Puja.\n"
-        "🗓 Best Time to Visit: October to February (cool & festive season).\n"
-        "🏞 Activities: Tram rides, river cruises on Hooghly, exploring colonial architecture.\n"
-        "🛍 Shopping: New Market, Gariahat Market, Kumartuli crafts.\n"
-        "💡 Travel Tips: Avoid peak hours for traffic; use metro for faster travel.\n"
-        "📅 Suggested Itinerary: "
-        "Day 1 – Victoria Memorial, Indian Museum, Park Street for dinner; "
-        "Day 2 – Howrah Bridge, Kumartuli, Princep Ghat boat ride."
-    )
-
-    # Varanasi
-    elif "varanasi" in user_msg:
-        reply = (
-        "🛕 Varanasi — spiritual heart of India!\n\n"
-        "🏛 Famous Landmarks: Kashi Vishwanath Temple, Dashashwamedh Ghat, Sarnath.\n"
-        "🍴 Food & Cuisine: Kachori sabzi, Banarasi paan, Malaiyo in winter.\n"
-        "🎉 Festivals: Ganga Mahotsav, Dev Deepawali, Diwali.\n"
-        "🗓 Best Time to Visit: October to March.\n"
-        "🏞 Activities: Sunrise boat ride on the Ganges, attend Ganga Aarti, explore silk weaving streets.\n"
-        "🛍 Shopping: Banarasi sarees, brassware, handicrafts.\n"
-        "📅 Suggested Itinerary: Day 1 – Ghats + evening Ganga Aarti; Day 2 – Sarnath + local shopping."
-    )
-
-# Goa
-    elif "goa" in user_msg:
-        reply = (
-        "🏖 Goa — beaches, nightlife, and Portuguese heritage!\n\n"
-        "🏛 Famous Landmarks: Basilica of Bom Jesus, Fort Aguada, Chapora Fort.\n"
-        "🍴 Food & Cuisine: Goan fish curry, vindaloo, bebinca, seafood.\n"
-        "🎉 Festivals: Carnival (Feb), Shigmo, Christmas, Sunburn Music Festival.\n"
-        "🗓 Best Time to Visit: November to March.\n"
-        "🏞 Activities: Beaches, water sports, nightclubs, island hopping.\n"
-        "🛍 Shopping: Flea markets in Anjuna & Mapusa.\n"
-        "📅 Suggested Itinerary: Day 1 – North Goa beaches + Fort Aguada; Day 2 – South Goa beaches + Basilica."
-    )
-
-# Mumbai
-    elif "mumbai" in user_msg:
-        reply = (
-        "🌇 Mumbai — City of Dreams!\n\n"
-        "🏛 Famous Landmarks: Gateway of India, Marine Drive, Chhatrapati Shivaji Terminus, Elephanta Caves.\n"
-        "🍴 Food & Cuisine: Vada pav, pav bhaji, bhel puri, seafood.\n"
-        "🎉 Festivals: Ganesh Chaturthi, Diwali, Mumbai Film Festival.\n"
-        "🗓 Best Time to Visit: November to February.\n"
-        "🏞 Activities: Bollywood tours, nightlife, beaches, street food tour.\n"
-        "🛍 Shopping: Colaba Causeway, Linking Road, Crawford Market.\n"
-        "📅 Suggested Itinerary: Day 1 – Gateway of India, Colaba, Marine Drive; Day 2 – Elephanta Caves + shopping."
-    )
-
-# Shimla
-    elif "shimla" in user_msg:
-        reply = (
-        "⛰ Shimla — Queen of Hills!\n\n"
-        "🏛 Famous Landmarks: Mall Road, The Ridge, Jakhoo Temple.\n"
-        "🍴 Food & Cuisine: Himachali cuisine, chha gosht, siddu.\n"
-        "🎉 Festivals: Summer Festival, Winter Carnival.\n"
-        "🗓 Best Time to Visit: March to June (summer), December to February (snow).\n"
-        "🏞 Activities: Trekking, toy train rides, mountain walks.\n"
-        "🛍 Shopping: Mall Road shops, Lakkar Bazaar.\n"
-        "📅 Suggested Itinerary: Day 1 – Mall Road + Ridge + Christ Church; Day 2 – Jakhoo Hill + Kufri trip."
-    )
-
-# Chennai
-    elif "chennai" in user_msg:
-        reply = (
-        "🌊 Chennai — Gateway to South India!\n\n"
-        "🏛 Famous Landmarks: Marina Beach, Kapaleeshwarar Temple, Fort St. George.\n"
-        "🍴 Food & Cuisine: Dosa, idli, filter coffee, Chettinad cuisine.\n"
-        "🎉 Festivals: Pongal, Diwali, Chennai Music Season.\n"
-        "🗓 Best Time to Visit: November to February.\n"
-        "🏞 Activities: Beach walks, temple tours, cultural shows.\n"
-        "🛍 Shopping: T Nagar, Pondy Bazaar.\n"
-        "📅 Suggested Itinerary: Day 1 – Marina Beach + Fort St. George; Day 2 – Kapaleeshwarar Temple + shopping."
-    )
-
-# Jaipur
-    elif "jaipur" in user_msg:
-        reply = (
-        "🏯 Jaipur — The Pink City!\n\n"
-        "🏛 Famous Landmarks: Amber Fort, Hawa Mahal, City Palace, Jantar Mantar.\n"
-        "🍴 Food & Cuisine: Dal Baati Churma, Ghevar, Laal Maas.\n"
-        "🎉 Festivals: Jaipur Literature Festival, Teej, Gangaur.\n"
-        "🗓 Best Time to Visit: October to March.\n"
-        "🏞 Activities: Fort tours, cultural shows, traditional markets.\n"
-        "🛍 Shopping: Johari Bazaar, Bapu Bazaar, Tripolia Bazaar.\n"
-        "📅 Suggested Itinerary: Day 1 – Amber Fort + City Palace; Day 2 – Hawa Mahal + shopping + local food."
-    )
-
-# Delhi
-    elif "delhi" in user_msg:
-        reply = (
-        "🏛 Delhi — Capital of India!\n\n"
-        "🏛 Famous Landmarks: Red Fort, India Gate, Qutub Minar, Lotus Temple, Chandni Chowk.\n"
-        "🍴 Food & Cuisine: Chole Bhature, Parathas, Street food in Chandni Chowk.\n"
-        "🎉 Festivals: Diwali, Republic Day, Holi.\n"
-        "🗓 Best Time to Visit: October to March.\n"
-        "🏞 Activities: Sightseeing tours, heritage walks, food walks.\n"
-        "🛍 Shopping: Dilli Haat, Sarojini Nagar, Janpath.\n"
-        "📅 Suggested Itinerary: Day 1 – Red Fort + Chandni Chowk + India Gate; Day 2 – Qutub Minar + Lotus Temple."
-    )
-
-#Extra
-    elif "travel tips" in user_msg:
-        reply = "💡 Always check weather, local transport, and book popular attractions in advance!"
-    elif "visa" in user_msg or "entry" in user_msg:
-        reply = "🛂 Indian visa info: Most travelers need an e-visa; check government website for details."
-    elif "transport" in user_msg or "getting around" in user_msg:
-        reply = "🚗 Use metro, buses, taxis, or rideshares. For hill stations, taxis or local buses work best."
-    elif "budget" in user_msg or "cheap trip" in user_msg:
-        reply = "💰 Budget tips: Use local transport, street food, and book hotels in advance for savings."
+    data = request.get_json(silent=True)
+    if not isinstance(data, dict):
+        return jsonify({'error': "expected a JSON object with a message"}), 400
+    user_msg = data.get("message")
+    if user_msg is None:
+        user_msg = ""
+    elif not isinstance(user_msg, str):
+        return jsonify({'error': "message must be a string"}), 400
+    return jsonify({"reply": chatbot_intents.reply(user_msg)})
+
+
+
+# ---------------------------
+# App factory and warm-up
+# ---------------------------
+# Set by warm_up(); /ready answers 503 until then, so a load balancer only
+# sends traffic to processes whose first requests will not be cold.
+ready = threading.Event()
+
+
+def create_app():
+    """Build the Flask app.
+
+    The model, the fuzzy city index and the user store are loaded once per
+    process, on the first call. Under gunicorn.conf.py that is the master,
+    before the workers are forked.
+    """
+    if user_store is None:  # first call in this process
+        load_users()
+        models.reload()
+
+    app = Flask(__name__, static_folder='static')
+    app.secret_key = os.environ.get('FLASK_SECRET_KEY', 'dev-secret-please-change')
+    app.register_blueprint(site)
+
+    # per-route latency histograms, counters and in-flight gauges on /metrics
+    metrics.init_app(app)
+
+    # session/cookie config, CSRF, security headers and the comments page;
+    # the JSON APIs take fetch() bodies rather than forms with a token
+    WebSecurity.init_app(app)
+    for view in (recommend_batch_route, admin_reload, signup, login, logout, chatbot):
+        WebSecurity.csrf.exempt(view)
+    # no SQLite connection may be inherited by workers forked after this
+    user_store.close()
+    return app
 
-    else:
-        reply = "🤔 I’m not sure, but you can explore destinations on the site!"
 
-    return jsonify({"reply": reply})
+def warm_up(app):
+    """Run the hot paths once in this process, then report ready.
 
+    Renders and caches every city page, opens this process's user database
+    connection and starts its model watcher (see model_reload.py).
+    """
+    with app.test_request_context():
+        for slug in CITIES:
+            send_city_page(slug)
+        user_store.is_empty()
+    models.start()
+    ready.set()
 
 
 # ---------------------------
 # Run server
 # ---------------------------
 if __name__ == '__main__':
+    app = create_app()
+    warm_up(app)
     app.run(host='0.0.0.0', port=5000, debug=True)
\ No newline at end of file
@@ -0,0 +1,339 @@
+"""ASGI entry point for serving the app under an ASGI server.
+
+    pip install uvicorn
+    uvicorn asgi:application --workers 4 --host 0.0.0.0 --port 8000
+
+The hot streaming and API paths are native coroutines, so idle keep-alive
+connections and slow video downloads cost no thread:
+
+    GET /videos/<name>       ranged video streaming (see media.py)
+    GET /assets/<path>       fingerprinted, pre-compressed assets (see assets.py)
+    GET /recommend           served from the response cache on the event
+                             loop; fuzzy lookups and scoring run in a thread
+                             pool so CPU work never blocks the loop
+
+Disk reads go through the same pool. Every other request is handed to the
+Flask app through a WSGI bridge running on a bounded thread pool, so auth
+(password KDF, SQLite), the chatbot and pages keep their Flask behaviour.
+The native routes skip Flask's request hooks and record their own metrics.
+Lifespan startup warms the process (app.warm_up) before /ready reports it.
+"""
+import asyncio
+import mimetypes
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from tempfile import SpooledTemporaryFile
+from urllib.parse import parse_qsl
+
+from werkzeug.datastructures import Headers
+from werkzeug.http import parse_accept_header, parse_etags
+
+import app as webapp
+import assets
+import media
+import metrics
+from WebSecurity import SECURITY_HEADERS
+
+# Threads running bridged Flask requests; bounds how many run at once.
+ASGI_WSGI_THREADS = int(os.environ.get('ASGI_WSGI_THREADS', 32))
+# Threads for file reads and recommender scoring.
+ASGI_WORKER_THREADS = int(os.environ.get('ASGI_WORKER_THREADS', min(32, (os.cpu_count() or 1) + 4)))
+# Concurrent native video streams per process; they hold no thread.
+ASGI_MAX_VIDEO_STREAMS = int(os.environ.get('ASGI_MAX_VIDEO_STREAMS', 1000))
+# Request bodies larger than this are spooled to disk before reaching Flask.
+MAX_MEMORY_BODY = 64 * 1024
+
+wsgi_pool = ThreadPoolExecutor(ASGI_WSGI_THREADS, thread_name_prefix='wsgi')
+worker_pool = ThreadPoolExecutor(ASGI_WORKER_THREADS, thread_name_prefix='asgi-worker')
+flask_app = webapp.create_app()
+_video_streams = None
+_DONE = object()
+
+
+def request_headers(scope):
+    return Headers([(k.decode('latin-1'), v.decode('latin-1')) for k, v in scope['headers']])
+
+
+def query_args(scope):
+    return dict(parse_qsl(scope['query_string'].decode('latin-1'), keep_blank_values=True))
+
+
+def encode_headers(headers):
+    return [(k.lower().encode('latin-1'), str(v).encode('latin-1')) for k, v in headers.items()]
+
+
+async def send_response(send, status, headers, body=b''):
+    # what WebSecurity.set_security_headers adds to Flask's responses
+    headers.update(SECURITY_HEADERS)
+    headers['Content-Length'] = len(body)
+    await send({'type': 'http.response.start', 'status': status, 'headers': encode_headers(headers)})
+    await send({'type': 'http.response.body', 'body': body})
+
+
+async def send_json(send, status, data, headers=None):
+    # same bytes as Flask's jsonify outside debug mode
+    body = flask_app.json.dumps(data, separators=(',', ':')).encode('utf-8') + b'\n'
+    await send_response(send, status, dict(headers or {}, **{'Content-Type': 'application/json'}), body)
+
+
+def watch_disconnect(receive):
+    """Event set once the client goes away."""
+    gone = asyncio.Event()
+
+    async def watch():
+        while (await receive())['type'] != 'http.disconnect':
+            pass
+        gone.set()
+
+    return gone, asyncio.ensure_future(watch())
+
+
+async def send_file(scope, receive, send, path, size, status, headers, start, stop):
+    """Stream bytes [start, stop) of the `size`-byte file `path`, reading in the worker pool."""
+    headers.update(SECURITY_HEADERS)
+    headers['Content-Length'] = stop - start
+    await send({'type': 'http.response.start', 'status': status, 'headers': encode_headers(headers)})
+    if start == 0 and stop == size and 'http.response.pathsend' in scope.get('extensions', {}):
+        # the server sends the file itself (e.g. with sendfile)
+        await send({'type': 'http.response.pathsend', 'path': os.path.abspath(path)})
+        return
+    loop = asyncio.get_running_loop()
+    gone, watcher = watch_disconnect(receive)
+    f = await loop.run_in_executor(worker_pool, open, path, 'rb')
+    try:
+        f.seek(start)
+        remaining = stop - start
+        while remaining > 0 and not gone.is_set():
+            chunk = await loop.run_in_executor(worker_pool, f.read, min(media.CHUNK_SIZE, remaining))
+            if not chunk:
+                break
+            remaining -= len(chunk)
+            await send({'type': 'http.response.body', 'body': chunk, 'more_body': remaining > 0})
+        if (remaining > 0 or stop == start) and not gone.is_set():
+            await send({'type': 'http.response.body', 'body': b''})
+    finally:
+        watcher.cancel()
+        await loop.run_in_executor(worker_pool, f.close)
+
+
+# ---- Native routes ----
+
+async def video_route(scope, receive, send, name):
+    info = media.videos.get(name)
+    if info is None:
+        return await send_response(send, 404, {'Content-Type': 'text/plain'}, b'Not Found')
+    status, headers, start, stop = media.plan_video(info, request_headers(scope))
+    if start is None:
+        return await send_response(send, status, headers)
+    if _video_streams.locked():
+        return await send_response(send, 503, {'Content-Type': 'text/plain', 'Retry-After': '1'},
+                                   b'Too many concurrent video streams, please retry.')
+    async with _video_streams:
+        headers['Content-Type'] = info.mimetype
+        await send_file(scope, receive, send, info.path, info.size, status, headers, start, stop)
+
+
+async def asset_route(scope, receive, send, filename):
+    if filename not in assets.fingerprinted:
+        return await send_response(send, 404, {'Content-Type': 'text/plain'}, b'Not Found')
+    accept = parse_accept_header(request_headers(scope).get('Accept-Encoding'))
+    relpath, encoding = assets.built_variant(filename, accept)
+    path = os.path.join(assets.DIST_DIR, relpath)
+    headers = {
+        'Content-Type': mimetypes.guess_type(filename)[0] or 'application/octet-stream',
+        'Cache-Control': assets.IMMUTABLE,
+        'Vary': 'Accept-Encoding',
+    }
+    if encoding is not None:
+        headers['Content-Encoding'] = encoding
+    size = await asyncio.get_running_loop().run_in_executor(worker_pool, os.path.getsize, path)
+    await send_file(scope, receive, send, path, size, 200, headers, 0, size)
+
+
+def _recommend(model, city, topn, if_none_match):
+    """Blocking part of /recommend, for the worker pool."""
+    key, etag = webapp.recommend_key(model, city, topn)
+    if parse_etags(if_none_match).contains(etag):
+        return etag, None
+    with flask_app.app_context():
+        return etag, webapp.recommend_body(model, key)
+
+
+async def recommend_route(scope, receive, send):
+    args = query_args(scope)
+    city, topn = args.get('city'), args.get('topn', 5)
+    if_none_match = request_headers(scope).get('If-None-Match')
+    model = webapp.models.current
+    try:
+        if model is not None and city in model.city_to_idx:
+            # exact name: cheap to resolve, and usually a cache hit
+            key, etag = webapp.recommend_key(model, city, topn)
+            if parse_etags(if_none_match).contains(etag):
+                body = None
+            else:
+                body = webapp.recommend_cache.get(key)
+                if body is None:
+                    etag, body = await asyncio.get_running_loop().run_in_executor(
+                        worker_pool, _recommend, model, city, topn, None)
+        else:
+            etag, body = await asyncio.get_running_loop().run_in_executor(
+                worker_pool, _recommend, model, city, topn, if_none_match)
+    except webapp.BadQuery as e:
+        return await send_json(send, e.status, {'error': str(e)})
+
+    headers = {'ETag': f'"{etag}"', 'Cache-Control': f'public, max-age={webapp.RECOMMEND_MAX_AGE}',
+               'X-Model-Version': model.version}
+    if body is None:
+        return await send_response(send, 304, headers)
+    headers['Content-Type'] = 'application/json'
+    await send_response(send, 200, headers, body)
+
+
+# ---- WSGI bridge ----
+
+def wsgi_environ(scope, body, length):
+    """WSGI environ for `scope`, whose whole body (`length` bytes) is buffered in `body`."""
+    script_name = scope.get('root_path', '').encode('utf-8').decode('latin-1')
+    path_info = scope['path'].encode('utf-8').decode('latin-1')
+    if script_name and path_info.startswith(script_name):
+        path_info = path_info[len(script_name):]
+    server = scope.get('server') or ('localhost', 80)
+    environ = {
+        'REQUEST_METHOD': scope['method'],
+        'SCRIPT_NAME': script_name,
+        'PATH_INFO': path_info,
+        'QUERY_STRING': scope['query_string'].decode('latin-1'),
+        'SERVER_NAME': server[0],
+        'SERVER_PORT': str(server[1] or 80),
+        'SERVER_PROTOCOL': 'HTTP/' + scope.get('http_version', '1.1'),
+        'wsgi.version': (1, 0),
+        'wsgi.url_scheme': scope.get('scheme', 'http'),
+        'wsgi.input': body,
+        # the body is fully buffered, so it ends at EOF even without a
+        # Content-Length (chunked uploads, HTTP/2)
+        'wsgi.input_terminated': True,
+        'wsgi.errors': sys.stderr,
+        'wsgi.multithread': True,
+        'wsgi.multiprocess': True,
+        'wsgi.run_once': False,
+    }
+    if scope.get('client'):
+        environ['REMOTE_ADDR'], environ['REMOTE_PORT'] = scope['client'][0], str(scope['client'][1])
+    for name, value in scope['headers']:
+        name = name.decode('latin-1')
+        if name == 'content-length':
+            key = 'CONTENT_LENGTH'
+        elif name == 'content-type':
+            key = 'CONTENT_TYPE'
+        else:
+            key = 'HTTP_' + name.upper().replace('-', '_')
+        value = value.decode('latin-1')
+        environ[key] = f'{environ[key]},{value}' if key in environ else value
+    environ.setdefault('CONTENT_LENGTH', str(length))
+    return environ
+
+
+async def wsgi_bridge(scope, receive, send):
+    """Run the Flask app for one request on the WSGI thread pool."""
+    loop = asyncio.get_running_loop()
+    with SpooledTemporaryFile(max_size=MAX_MEMORY_BODY) as body:
+        while True:
+            message = await receive()
+            if message['type'] == 'http.disconnect':
+                return
+            body.write(message.get('body', b''))
+            if not message.get('more_body'):
+                break
+        length = body.tell()
+        body.seek(0)
+
+        started = {}
+
+        def start_response(status, headers, exc_info=None):
+            started['status'] = int(status.split(' ', 1)[0])
+            started['headers'] = [(k.lower().encode('latin-1'), v.encode('latin-1')) for k, v in headers]
+
+        def begin():
+            iterable = flask_app(wsgi_environ(scope, body, length), start_response)
+            it = iter(iterable)
+            return iterable, it, next(it, _DONE)
+
+        iterable, it, chunk = await loop.run_in_executor(wsgi_pool, begin)
+        try:
+            await send({'type': 'http.response.start', 'status': started['status'],
+                        'headers': started['headers']})
+            while chunk is not _DONE:
+                if chunk:
+                    await send({'type': 'http.response.body', 'body': chunk, 'more_body': True})
+                chunk = await loop.run_in_executor(wsgi_pool, next, it, _DONE)
+            await send({'type': 'http.response.body', 'body': b''})
+        finally:
+            if hasattr(iterable, 'close'):
+                await loop.run_in_executor(wsgi_pool, iterable.close)
+
+
+# ---- Application ----
+
+async def lifespan(receive, send):
+    global _video_streams
+    while True:
+        message = await receive()
+        if message['type'] == 'lifespan.startup':
+            _video_streams = asyncio.Semaphore(ASGI_MAX_VIDEO_STREAMS)
+            await asyncio.get_running_loop().run_in_executor(worker_pool, webapp.warm_up, flask_app)
+            await send({'type': 'lifespan.startup.complete'})
+        elif message['type'] == 'lifespan.shutdown':
+            wsgi_pool.shutdown(wait=False)
+            worker_pool.shutdown(wait=False)
+            await send({'type': 'lifespan.shutdown.complete'})
+            return
+
+
+def native_route(scope):
+    """(metrics route label, handler, args) for a native route, or None."""
+    if scope['method'] != 'GET':
+        return None
+    path = scope['path']
+    if path == '/recommend':
+        return '/recommend', recommend_route, ()
+    if path.startswith('/assets/') and len(path) > len('/assets/'):
+        return '/assets/<path:filename>', asset_route, (path[len('/assets/'):],)
+    if path.startswith('/videos/') and '/' not in path[len('/videos/'):] and len(path) > len('/videos/'):
+        return '/videos/<name>', video_route, (path[len('/videos/'):],)
+    return None
+
+
+async def application(scope, receive, send):
+    global _video_streams
+    if scope['type'] == 'lifespan':
+        return await lifespan(receive, send)
+    if scope['type'] != 'http':
+        raise ValueError(f"unsupported ASGI scope type {scope['type']!r}")
+    route = native_route(scope)
+    if route is None:
+        return await wsgi_bridge(scope, receive, send)
+    if _video_streams is None:
+        # server without lifespan support
+        _video_streams = asyncio.Semaphore(ASGI_MAX_VIDEO_STREAMS)
+
+    label, handler, args = route
+    status = {}
+
+    async def send_recorded(message):
+        if message['type'] == 'http.response.start':
+            status['code'] = message['status']
+        await send(message)
+
+    start = time.perf_counter()
+    metrics.registry.inc('http_requests_in_flight', route=label)
+    try:
+        await handler(scope, receive, send_recorded, *args)
+    finally:
+        metrics.registry.inc('http_requests_in_flight', -1, route=label)
+        code = status.get('code', 500)
+        metrics.registry.observe('http_request_duration_seconds', time.perf_counter() - start, route=label)
+        metrics.registry.inc('http_requests_total', route=label, method='GET', status=str(code))
+        if code >= 500:
+            metrics.registry.inc('http_request_errors_total', route=label, method='GET')
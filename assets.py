@@ -0,0 +1,87 @@
+"""Serving side of the static asset pipeline (see build_static.py).
+
+The build manifest is read once at import. Fingerprinted files are served
+from /assets/ with a year-long immutable Cache-Control, and pages and
+assets are sent as the pre-built brotli or gzip variant the client accepts.
+Without a build, pages fall back to the plain files in static/.
+"""
+import json
+import mimetypes
+import os
+
+from flask import Response, abort, current_app, request, send_from_directory
+
+from build_static import DIST_DIR, MANIFEST_FILE, STATIC_DIR
+from responsive import responsive_images
+
+IMMUTABLE = 'public, max-age=31536000, immutable'
+REVALIDATE = 'no-cache'
+
+
+def load_manifest(dist_dir=DIST_DIR):
+    try:
+        with open(os.path.join(dist_dir, MANIFEST_FILE), 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {'version': None, 'assets': {}, 'pages': [], 'encodings': {}}
+
+
+manifest = load_manifest()
+fingerprinted = frozenset(manifest['assets'].values())
+# unbuilt pages after the responsive image rewrite, by name
+unbuilt_pages = {}
+
+
+def built_variant(relpath, accept_encodings):
+    """(file under static/dist, Content-Encoding or None) to send for relpath.
+
+    Picks the best pre-compressed variant the client accepts; None if
+    relpath was not built. Shared with the ASGI server (asgi.py).
+    """
+    encodings = manifest['encodings'].get(relpath)
+    if encodings is None:
+        return None
+    for encoding, suffix in (('br', '.br'), ('gzip', '.gz')):
+        if encoding in encodings and accept_encodings[encoding]:
+            return relpath + suffix, encoding
+    return relpath, None
+
+
+def send_built(relpath, cache_control):
+    """Send a file from static/dist, choosing a pre-compressed variant if accepted."""
+    variant = built_variant(relpath, request.accept_encodings)
+    if variant is None:
+        abort(404)
+    filename, encoding = variant
+    mimetype = mimetypes.guess_type(relpath)[0] or 'application/octet-stream'
+    resp = send_from_directory(DIST_DIR, filename, mimetype=mimetype)
+    if encoding is not None:
+        resp.headers['Content-Encoding'] = encoding
+    resp.vary.add('Accept-Encoding')
+    resp.headers['Cache-Control'] = cache_control
+    return resp
+
+
+def send_asset(filename):
+    """Serve a fingerprinted asset; its URL changes whenever its content does."""
+    if filename not in fingerprinted:
+        abort(404)
+    return send_built(filename, IMMUTABLE)
+
+
+def send_page(name):
+    """Serve an HTML page, preferring the built copy with fingerprinted links."""
+    if name in manifest['pages']:
+        return send_built('pages/' + name, REVALIDATE)
+    body = unbuilt_pages.get(name)
+    if body is None:
+        try:
+            with open(os.path.join(STATIC_DIR, name), 'r', encoding='utf-8') as f:
+                body = responsive_images(f.read()).encode('utf-8')
+        except OSError:
+            abort(404)
+        if not current_app.debug:
+            unbuilt_pages[name] = body
+    resp = Response(body, mimetype='text/html')
+    resp.headers['Cache-Control'] = REVALIDATE
+    return resp
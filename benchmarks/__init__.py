@@ -0,0 +1 @@
+"""Performance benchmarks: micro-benchmarks and load tests (see run.py)."""
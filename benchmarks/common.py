@@ -0,0 +1,103 @@
+"""Timing, summary and baseline-comparison helpers shared by the benchmarks."""
+import json
+import os
+import resource
+import sys
+import time
+
+BASELINE_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'baseline.json')
+
+# Metrics where a smaller number is better; everything else (ops/s) is
+# better when larger.
+LOWER_IS_BETTER = ('_ms', '_us', '_seconds', '_mb', 'failures')
+
+
+def percentile(sorted_values, q):
+    if not sorted_values:
+        return 0.0
+    k = min(len(sorted_values) - 1, max(0, round(q / 100 * (len(sorted_values) - 1))))
+    return sorted_values[k]
+
+
+def summarize(durations, wall=None, unit='us'):
+    """Throughput and p50/p99 latency of a list of per-call durations (seconds)."""
+    durations = sorted(durations)
+    scale = 1e6 if unit == 'us' else 1e3
+    total = wall if wall is not None else sum(durations)
+    return {
+        'ops_per_sec': round(len(durations) / total, 1) if total else 0.0,
+        f'p50_{unit}': round(percentile(durations, 50) * scale, 2),
+        f'p99_{unit}': round(percentile(durations, 99) * scale, 2),
+    }
+
+
+def time_calls(fn, args, warmup=50):
+    """Call fn(arg) for every arg, returning per-call wall durations."""
+    for arg in args[:warmup]:
+        fn(arg)
+    durations = []
+    for arg in args:
+        start = time.perf_counter()
+        fn(arg)
+        durations.append(time.perf_counter() - start)
+    return durations
+
+
+def peak_rss_mb():
+    """Peak resident set size of this process so far, in MiB."""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # kilobytes on Linux, bytes on macOS
+    return round(peak / (1024 * 1024 if sys.platform == 'darwin' else 1024), 1)
+
+
+def load_baseline(path=BASELINE_FILE):
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def save_baseline(results, path=BASELINE_FILE):
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(results, f, indent=1, sort_keys=True)
+        f.write('\n')
+
+
+def flatten(results, prefix=''):
+    flat = {}
+    for key, value in results.items():
+        name = f'{prefix}.{key}' if prefix else str(key)
+        if isinstance(value, dict):
+            flat.update(flatten(value, name))
+        elif isinstance(value, (int, float)) and not isinstance(value, bool):
+            flat[name] = value
+    return flat
+
+
+def compare(results, baseline, tolerance):
+    """Return (metric, baseline, current, change) rows and the regressed metrics.
+
+    `change` is the relative difference oriented so that positive means
+    worse; a metric regresses when it is worse by more than `tolerance`.
+    """
+    current = flatten(results)
+    previous = flatten(baseline)
+    rows = []
+    regressions = []
+    for name in sorted(current):
+        if name not in previous or not previous[name]:
+            continue
+        old, new = previous[name], current[name]
+        change = (new - old) / old
+        if not name.endswith(LOWER_IS_BETTER):
+            change = -change
+        rows.append((name, old, new, change))
+        if change > tolerance:
+            regressions.append(name)
+    return rows, regressions
+
+
+def print_results(results, prefix=''):
+    for name, value in flatten(results, prefix).items():
+        print(f'  {name:60} {value}')
@@ -0,0 +1,125 @@
+"""Load tests against the real app.
+
+The app is imported with its user database redirected to a temporary
+file. Each scenario then sends a fixed number of requests, either through
+a threaded local WSGI server with a pool of concurrent HTTP clients
+(transport 'http', the default) or sequentially through Flask's test
+client (transport 'test', no sockets involved).
+"""
+import http.client
+import json
+import logging
+import os
+import random
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import quote
+
+from benchmarks.common import peak_rss_mb, summarize
+
+BENCH_USER = 'bench-user'
+BENCH_PASSWORD = 'bench-password'
+
+CHAT_MESSAGES = ('hello', 'goa guide', 'best time to visit jaipur', 'food in kolkata',
+                 'what should I pack', 'book a hotel in mumbai', 'delhi details')
+PAGES = ('/', '/goa', '/kolkata', '/tips', '/login')
+
+
+def scenarios(app_module, rng):
+    """name -> (request count, factory returning (method, path, json body))."""
+    model = app_module.models.current
+    names = list(model.city_to_idx) if model is not None else []
+    cities = [quote(name) for name in names]
+    typos = [quote(name[:-1]) for name in names]
+    return {
+        'recommend': (2000, lambda: ('GET', f'/recommend?city={rng.choice(cities)}&topn=5', None)),
+        'recommend_fuzzy': (1000, lambda: ('GET', f'/recommend?city={rng.choice(typos)}&topn=5', None)),
+        'chatbot': (2000, lambda: ('POST', '/chatbot', {'message': rng.choice(CHAT_MESSAGES)})),
+        # each login runs the password KDF, so far fewer requests
+        'auth_login': (100, lambda: ('POST', '/auth/login',
+                                     {'username': BENCH_USER, 'password': BENCH_PASSWORD})),
+        'pages': (2000, lambda: ('GET', rng.choice(PAGES), None)),
+    }
+
+
+def import_app(tmp):
+    os.environ['USER_DB_PATH'] = os.path.join(tmp, 'users.db')
+    import app as app_module
+    app = app_module.create_app()
+    app_module.warm_up(app)
+    app_module.user_store.create_user(BENCH_USER, app_module.password_hasher.hash(BENCH_PASSWORD))
+    return app_module, app
+
+
+def run_test_client(app, requests):
+    client = app.test_client()
+    durations, failures = [], 0
+    wall = time.perf_counter()
+    for method, path, body in requests:
+        start = time.perf_counter()
+        resp = client.open(path, method=method, json=body, headers={'Accept-Encoding': 'gzip'})
+        resp.get_data()
+        durations.append(time.perf_counter() - start)
+        failures += resp.status_code >= 400
+    return durations, failures, time.perf_counter() - wall
+
+
+def run_http(port, requests, concurrency):
+    def send(req):
+        method, path, body = req
+        data = json.dumps(body).encode('utf-8') if body is not None else None
+        headers = {'Accept-Encoding': 'gzip'}
+        if data is not None:
+            headers['Content-Type'] = 'application/json'
+        start = time.perf_counter()
+        conn = http.client.HTTPConnection('127.0.0.1', port, timeout=30)
+        try:
+            conn.request(method, path, body=data, headers=headers)
+            resp = conn.getresponse()
+            resp.read()
+            status = resp.status
+        finally:
+            conn.close()
+        return time.perf_counter() - start, status
+
+    wall = time.perf_counter()
+    with ThreadPoolExecutor(concurrency) as pool:
+        outcomes = list(pool.map(send, requests))
+    wall = time.perf_counter() - wall
+    return [d for d, _ in outcomes], sum(status >= 400 for _, status in outcomes), wall
+
+
+def describe_transport(transport, concurrency):
+    return f'http, {concurrency} clients' if transport == 'http' else transport
+
+
+def run(transport='http', concurrency=8, seed=0):
+    from werkzeug.serving import make_server
+
+    rng = random.Random(seed)
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        app_module, app = import_app(tmp)
+        server = None
+        if transport == 'http':
+            logging.getLogger('werkzeug').setLevel(logging.WARNING)
+            server = make_server('127.0.0.1', 0, app, threaded=True)
+            threading.Thread(target=server.serve_forever, daemon=True).start()
+        try:
+            for name, (count, make_request) in scenarios(app_module, rng).items():
+                print(f'load: {name} ({count} requests, {transport}) ...', flush=True)
+                requests = [make_request() for _ in range(count)]
+                if server is not None:
+                    durations, failures, wall = run_http(server.port, requests, concurrency)
+                else:
+                    durations, failures, wall = run_test_client(app, requests)
+                results[name] = dict(summarize(durations, wall, unit='ms'), failures=failures)
+        finally:
+            if server is not None:
+                server.shutdown()
+    results['peak_rss_mb'] = peak_rss_mb()
+    # how the numbers were taken; runs are only comparable when this matches
+    results['transport'] = describe_transport(transport, concurrency)
+    return results
@@ -0,0 +1,99 @@
+"""Micro-benchmarks of the /recommend building blocks on synthetic models.
+
+For each model size a child process writes a synthetic model.pkl, then
+times loading it, building the recommender and the city index, and the
+three per-request stages: fuzzy city lookup, scoring and serialisation.
+Running every size in its own process keeps the peak RSS figures separate.
+"""
+import multiprocessing
+import os
+import random
+import tempfile
+import time
+
+from benchmarks.common import peak_rss_mb, summarize, time_calls
+from benchmarks.synthetic import make_artifacts, write_pickle
+
+SIZES = (1000, 10000, 50000)
+# Above this many cities the synthetic model omits the dense sim_matrix
+# and the recommender runs in sparse mode.
+DENSE_MAX_CITIES = 5000
+SAMPLES = 2000
+
+
+def misspell(name, rng):
+    i = rng.randrange(len(name))
+    return name[:i] + name[i + 1:]
+
+
+def bench_size(n, samples=SAMPLES, seed=0):
+    # imported here so the parent process stays small
+    from flask import Flask
+
+    from city_index import CityIndex
+    from model_store import load_artifacts, result_rows
+    from recommender import Recommender
+
+    rng = random.Random(seed)
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'model.pkl')
+        write_pickle(make_artifacts(n, dense=n <= DENSE_MAX_CITIES, seed=seed), path)
+        results['artifact_mb'] = round(os.path.getsize(path) / (1024 * 1024), 2)
+
+        start = time.perf_counter()
+        artifacts = load_artifacts(path)
+        results['load_seconds'] = round(time.perf_counter() - start, 4)
+
+    start = time.perf_counter()
+    recommender = Recommender.from_artifacts(artifacts)
+    results['build_recommender_seconds'] = round(time.perf_counter() - start, 4)
+    results['mode'] = recommender.mode
+    if recommender.mode == 'sparse':
+        artifacts.pop('sim_matrix', None)
+
+    start = time.perf_counter()
+    city_to_idx = artifacts['city_to_idx']
+    city_index = CityIndex(city_to_idx)
+    rows = result_rows(artifacts)
+    results['build_city_index_seconds'] = round(time.perf_counter() - start, 4)
+
+    names = list(city_to_idx)
+    picked = [rng.choice(names) for _ in range(samples)]
+    typos = [misspell(name, rng) for name in picked]
+    idxs = [city_to_idx[name] for name in picked]
+    dump = Flask(__name__).json.dumps
+    dur_col, time_col = artifacts['dur_col'], artifacts['time_col']
+
+    def to_json(idx, top, scores):
+        # mirrors app.format_results + jsonify
+        results_ = []
+        for i, score in zip(top.tolist(), scores.tolist()):
+            name, duration, best_time = rows[i]
+            results_.append({'city': name, dur_col: duration, time_col: best_time, 'score': score})
+        return dump({'query_city': rows[idx][0], 'results': results_})
+
+    neighbors = {idx: recommender.top_neighbors(idx, 5) for idx in set(idxs)}
+
+    ops = {
+        'lookup_exact': time_calls(city_index.resolve, picked),
+        'lookup_fuzzy': time_calls(city_index.resolve, typos),
+        'score_top5': time_calls(lambda i: recommender.top_neighbors(i, 5), idxs),
+        # wider than the neighbour index: exercises the partial-sort fallback
+        'score_top100': time_calls(lambda i: recommender.top_neighbors(i, 100), idxs[:samples // 4]),
+        'serialise': time_calls(lambda i: to_json(i, *neighbors[i]), idxs),
+        'end_to_end': time_calls(lambda i: to_json(i, *recommender.top_neighbors(i, 5)), idxs),
+    }
+    results['ops'] = {name: summarize(durations) for name, durations in ops.items()}
+    results['peak_rss_mb'] = peak_rss_mb()
+    return results
+
+
+def run(sizes=SIZES, samples=SAMPLES):
+    results = {}
+    ctx = multiprocessing.get_context('spawn')
+    for n in sizes:
+        print(f'micro: {n} cities ...', flush=True)
+        with ctx.Pool(1) as pool:
+            results[str(n)] = pool.apply(bench_size, (n, samples))
+    return results
@@ -0,0 +1,85 @@
+"""Run the benchmark suite and compare it with the stored baseline.
+
+    python -m benchmarks.run                      # micro + load, compare
+    python -m benchmarks.run micro --sizes 1000   # one part, fewer sizes
+    python -m benchmarks.run --save-baseline      # record a new baseline
+
+Exits non-zero with --fail-on-regression when any metric is worse than the
+baseline by more than --tolerance. Baselines are only comparable on the
+same machine; re-record after changing hardware. Load results are skipped
+when their --transport/--concurrency differ from the baseline's.
+"""
+import argparse
+import platform
+import sys
+
+from benchmarks import load, micro
+from benchmarks.common import compare, load_baseline, print_results, save_baseline
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('parts', nargs='*', metavar='{micro,load}', help='default: both')
+    parser.add_argument('--sizes', default=','.join(map(str, micro.SIZES)),
+                        help='comma-separated synthetic model sizes for the micro-benchmarks')
+    parser.add_argument('--samples', type=int, default=micro.SAMPLES)
+    parser.add_argument('--transport', choices=['http', 'test'], default='http')
+    parser.add_argument('--concurrency', type=int, default=8)
+    parser.add_argument('--save-baseline', action='store_true')
+    parser.add_argument('--tolerance', type=float, default=0.2,
+                        help='allowed relative slowdown before a metric counts as regressed')
+    parser.add_argument('--fail-on-regression', action='store_true')
+    args = parser.parse_args(argv)
+    parts = args.parts or ['micro', 'load']
+    if not set(parts) <= {'micro', 'load'}:
+        parser.error(f"unknown part(s): {', '.join(sorted(set(parts) - {'micro', 'load'}))}")
+
+    results = {}
+    if 'micro' in parts:
+        sizes = [int(s) for s in args.sizes.split(',') if s]
+        results['micro'] = micro.run(sizes, args.samples)
+    if 'load' in parts:
+        results['load'] = load.run(args.transport, args.concurrency)
+
+    print('\nResults:')
+    print_results(results)
+
+    baseline = load_baseline()
+    if args.save_baseline:
+        if baseline:
+            # keep the parts that were not re-run
+            baseline.update(results)
+            results = baseline
+        results['machine'] = {'python': platform.python_version(), 'platform': platform.platform(),
+                              'processor': platform.machine()}
+        save_baseline(results)
+        print('\nBaseline saved.')
+        return 0
+    if not baseline:
+        print('\nNo baseline recorded; run with --save-baseline to create one.')
+        return 0
+
+    if 'load' in results:
+        recorded = baseline.get('load', {}).get('transport')
+        if recorded != results['load']['transport']:
+            # sequential test-client timings say nothing about concurrent
+            # HTTP ones (or other concurrency levels), and vice versa
+            print(f"\nLoad baseline was recorded with transport {recorded!r}, not "
+                  f"{results['load']['transport']!r}; not comparing load results. "
+                  f"Re-run with matching options or --save-baseline.")
+            results = {part: value for part, value in results.items() if part != 'load'}
+    rows, regressions = compare(results, {part: baseline.get(part, {}) for part in results},
+                                args.tolerance)
+    print(f'\nAgainst baseline (positive change = worse, tolerance {args.tolerance:.0%}):')
+    for name, old, new, change in rows:
+        flag = '  REGRESSION' if name in regressions else ''
+        print(f'  {name:60} {old:>12} -> {new:>12}  {change:+.1%}{flag}')
+    if regressions:
+        print(f'\n{len(regressions)} metric(s) regressed.')
+        if args.fail_on_regression:
+            return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,60 @@
+"""Synthetic model artifacts of arbitrary size.
+
+The artifacts have the same shape as the ones demo.ipynb pickles: an
+L2-normalised TF-IDF matrix over a small token vocabulary, a city table and
+a name -> row index. The dense similarity matrix is only included when
+asked for, since at 10k+ cities it no longer fits comfortably in memory and
+the app scores from the sparse TF-IDF instead.
+"""
+import pickle
+import random
+
+import numpy as np
+from scipy import sparse
+
+DURATIONS = ('1-2', '2-3', '3-4', '4-5', '5-7')
+SEASONS = ('October-March', 'October-June', 'March-June', 'November-February', 'All year')
+SYLLABLES = ('ma', 'na', 'li', 'pur', 'ga', 'dha', 'ra', 'ko', 'shi', 'vi', 'ja', 'bad',
+             'tan', 'che', 'lo', 'mu', 'ha', 'ri', 'del', 'war', 'ka', 'su', 'nag', 'am')
+
+
+def city_names(n, rng):
+    names = set()
+    while len(names) < n:
+        name = ''.join(rng.choice(SYLLABLES) for _ in range(rng.randint(2, 4)))
+        names.add(name.capitalize() + (f' {rng.randint(1, n)}' if len(names) > n // 2 else ''))
+    return sorted(names)
+
+
+def make_artifacts(n, vocab=300, terms=8, dense=False, seed=0):
+    """Artifacts dict for `n` synthetic cities."""
+    rng = random.Random(seed)
+    np_rng = np.random.default_rng(seed)
+    names = city_names(n, rng)
+    cols = np.concatenate([np_rng.choice(vocab, terms, replace=False) for _ in range(n)])
+    rows = np.repeat(np.arange(n), terms)
+    data = np_rng.random(n * terms) + 0.1
+    tfidf = sparse.csr_matrix((data, (rows, cols)), shape=(n, vocab))
+    norms = np.sqrt(tfidf.multiply(tfidf).sum(axis=1)).A1
+    tfidf = sparse.csr_matrix(sparse.diags(1 / norms) @ tfidf)
+    artifacts = {
+        'vectorizer': None,
+        'tfidf': tfidf,
+        'city_columns': {
+            'City': names,
+            'Ideal_duration': [rng.choice(DURATIONS) for _ in range(n)],
+            'Best_time_to_visit': [rng.choice(SEASONS) for _ in range(n)],
+        },
+        'city_col': 'City',
+        'dur_col': 'Ideal_duration',
+        'time_col': 'Best_time_to_visit',
+        'city_to_idx': {name: i for i, name in enumerate(names)},
+    }
+    if dense:
+        artifacts['sim_matrix'] = (tfidf @ tfidf.T).toarray()
+    return artifacts
+
+
+def write_pickle(artifacts, path):
+    with open(path, 'wb') as f:
+        pickle.dump(artifacts, f, protocol=pickle.HIGHEST_PROTOCOL)
@@ -0,0 +1,95 @@
+"""Offline generator for responsive image derivatives.
+
+For every JPEG/PNG in static/images this writes resized AVIF, WebP and JPEG
+copies at a few fixed widths into static/derived/images/, and records them
+in static/derived/manifest.json. Sources whose content hash is unchanged
+since the last run are skipped, so reruns only touch new or edited images.
+Page serving (responsive.py) turns the manifest into <picture>/srcset markup.
+
+Requires Pillow:
+
+    python build_images.py
+    python build_static.py   # then fingerprint the derivatives with the rest
+"""
+import hashlib
+import json
+import os
+
+from PIL import Image, features
+
+from build_static import STATIC_DIR, write_file
+from responsive import DERIVED_DIR, IMAGE_MANIFEST, load_image_manifest
+
+IMAGES_DIR = os.path.join(STATIC_DIR, 'images')
+
+WIDTHS = (320, 480, 768)
+# Largest derivative; the source width is used when it is smaller.
+MAX_WIDTH = 1280
+SOURCE_EXTS = {'.jpg', '.jpeg', '.png'}
+
+# (format name, Pillow format, file extension, save options)
+FORMATS = [
+    ('avif', 'AVIF', '.avif', {'quality': 55}),
+    ('webp', 'WEBP', '.webp', {'quality': 75, 'method': 6}),
+    ('jpeg', 'JPEG', '.jpg', {'quality': 80, 'optimize': True, 'progressive': True}),
+]
+if not features.check('avif'):
+    FORMATS = FORMATS[1:]
+
+
+def target_widths(width):
+    widths = [w for w in WIDTHS if w < width]
+    widths.append(min(width, MAX_WIDTH))
+    return sorted(set(widths))
+
+
+def build_derivatives(relpath, path):
+    """Write all derivatives of one source image; return its manifest entry."""
+    with Image.open(path) as im:
+        im.load()
+        if im.mode not in ('RGB', 'RGBA'):
+            im = im.convert('RGBA' if 'transparency' in im.info else 'RGB')
+        width, height = im.size
+        stem = os.path.splitext(relpath)[0]
+        variants = {name: [] for name, _, _, _ in FORMATS}
+        for w in target_widths(width):
+            resized = im if w == width else im.resize((w, round(height * w / width)), Image.LANCZOS)
+            for name, fmt, ext, options in FORMATS:
+                out = resized.convert('RGB') if fmt == 'JPEG' and resized.mode != 'RGB' else resized
+                target = f"derived/{stem}-{w}{ext}"
+                dest = os.path.join(STATIC_DIR, target)
+                os.makedirs(os.path.dirname(dest), exist_ok=True)
+                out.save(dest + '.tmp', fmt, **options)
+                os.replace(dest + '.tmp', dest)
+                variants[name].append([w, target])
+    return {'width': width, 'height': height, 'variants': variants}
+
+
+def build():
+    previous = load_image_manifest()
+    images = {}
+    built = 0
+    for filename in sorted(os.listdir(IMAGES_DIR)):
+        if os.path.splitext(filename)[1].lower() not in SOURCE_EXTS:
+            continue
+        relpath = 'images/' + filename
+        path = os.path.join(IMAGES_DIR, filename)
+        with open(path, 'rb') as f:
+            digest = hashlib.sha256(f.read()).hexdigest()
+        entry = previous.get(relpath)
+        if (entry is None or entry.get('sha256') != digest
+                or set(entry['variants']) != {name for name, _, _, _ in FORMATS}
+                or not all(os.path.exists(os.path.join(STATIC_DIR, target))
+                           for variants in entry['variants'].values() for _, target in variants)):
+            entry = build_derivatives(relpath, path)
+            entry['sha256'] = digest
+            built += 1
+        images[relpath] = entry
+    manifest = {'images': images}
+    write_file(IMAGE_MANIFEST, json.dumps(manifest, indent=1, sort_keys=True).encode('utf-8'))
+    return manifest, built
+
+
+if __name__ == '__main__':
+    manifest, built = build()
+    print(f"Rebuilt derivatives for {built} of {len(manifest['images'])} images in {DERIVED_DIR}")
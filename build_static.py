@@ -0,0 +1,153 @@
+"""Build step for static assets.
+
+Copies every file under static/ into static/dist/ under a content-hashed
+name (images/goa.1a2b3c4d5e.jpg), writes gzip and, when the optional
+`brotli` package is installed, brotli variants of compressible files, and
+rewrites the HTML pages to point at the fingerprinted /assets/ URLs, with
+<picture>/srcset markup for images that have derivatives (build_images.py).
+static/dist/manifest.json records the mapping; the server loads it once at
+startup (see assets.py) and never compresses anything at request time.
+
+Run after changing anything in static/:
+
+    python build_images.py   # optional, needs Pillow
+    python build_static.py
+"""
+import gzip
+import hashlib
+import json
+import os
+import re
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+from responsive import IMAGE_MANIFEST, load_image_manifest, responsive_images
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+STATIC_DIR = os.path.join(ROOT, 'static')
+DIST_DIR = os.path.join(STATIC_DIR, 'dist')
+MANIFEST_FILE = 'manifest.json'
+ASSETS_URL = '/assets/'
+
+# Served by the dedicated /videos/ streaming endpoint instead (media.py).
+SKIP_DIRS = {'videos'}
+
+# Already-compressed formats (JPEG, MP4, ...) are served as-is.
+COMPRESSIBLE = {'.css', '.js', '.html', '.svg', '.json', '.txt', '.xml', '.ico', '.map'}
+
+# src="/static/x", href="static/x", url(/static/x) ...
+STATIC_REF = re.compile(r'''(?<=["'(])/?static/([^"'()\s?#]+)''')
+
+
+def fingerprint(relpath, data):
+    stem, ext = os.path.splitext(relpath)
+    return f"{stem}.{hashlib.sha256(data).hexdigest()[:10]}{ext}"
+
+
+def rewrite_refs(text, assets):
+    """Point /static/ references that have a built asset at its /assets/ URL."""
+    def replace(match):
+        target = assets.get(match.group(1))
+        return ASSETS_URL + target if target else match.group(0)
+    return STATIC_REF.sub(replace, text)
+
+
+def asset_url(relpath, assets):
+    """URL of a file under static/: its /assets/ name when built, else /static/."""
+    target = assets.get(relpath)
+    return ASSETS_URL + target if target else '/static/' + relpath
+
+
+def write_file(path, data):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp = path + '.tmp'
+    with open(tmp, 'wb') as f:
+        f.write(data)
+    os.replace(tmp, path)
+
+
+def write_variants(relpath, data):
+    """Write relpath and its compressed variants; return the encodings kept."""
+    dest = os.path.join(DIST_DIR, relpath)
+    write_file(dest, data)
+    encodings = []
+    if os.path.splitext(relpath)[1].lower() not in COMPRESSIBLE:
+        return encodings
+    variants = [('gzip', '.gz', lambda d: gzip.compress(d, 9, mtime=0))]
+    if brotli is not None:
+        variants.insert(0, ('br', '.br', lambda d: brotli.compress(d, quality=11)))
+    for encoding, suffix, compress in variants:
+        packed = compress(data)
+        if len(packed) < len(data):
+            write_file(dest + suffix, packed)
+            encodings.append(encoding)
+    return encodings
+
+
+def source_files():
+    for dirpath, dirnames, filenames in os.walk(STATIC_DIR):
+        if os.path.abspath(dirpath) == STATIC_DIR:
+            dirnames[:] = [d for d in dirnames
+                           if os.path.join(dirpath, d) != DIST_DIR and d not in SKIP_DIRS]
+        for filename in sorted(filenames):
+            path = os.path.join(dirpath, filename)
+            if path == IMAGE_MANIFEST:
+                continue
+            yield os.path.relpath(path, STATIC_DIR).replace(os.sep, '/'), path
+
+
+def build():
+    assets = {}
+    encodings = {}
+    pages = []
+    sources = sorted(source_files())
+    # plain files first so stylesheets and pages can reference their hashes
+    plain = [src for src in sources if not src[0].endswith(('.html', '.css'))]
+    styles = [src for src in sources if src[0].endswith('.css')]
+    for relpath, path in plain + styles:
+        with open(path, 'rb') as f:
+            data = f.read()
+        if relpath.endswith('.css'):
+            data = rewrite_refs(data.decode('utf-8'), assets).encode('utf-8')
+        target = fingerprint(relpath, data)
+        if os.path.exists(os.path.join(DIST_DIR, target)):
+            # content-addressed: an existing file is already up to date
+            encodings[target] = [enc for enc, suffix in (('br', '.br'), ('gzip', '.gz'))
+                                 if os.path.exists(os.path.join(DIST_DIR, target + suffix))]
+        else:
+            encodings[target] = write_variants(target, data)
+        assets[relpath] = target
+
+    images = load_image_manifest()
+    version = hashlib.sha256(json.dumps(assets, sort_keys=True).encode('utf-8'))
+    for relpath, path in sources:
+        if not relpath.endswith('.html'):
+            continue
+        with open(path, 'r', encoding='utf-8') as f:
+            html = responsive_images(f.read(), lambda p: asset_url(p, assets), images=images)
+        html = rewrite_refs(html, assets).encode('utf-8')
+        target = 'pages/' + relpath
+        encodings[target] = write_variants(target, html)
+        pages.append(relpath)
+        version.update(html)
+
+    manifest = {
+        'version': version.hexdigest()[:12],
+        'assets': assets,
+        'pages': pages,
+        'encodings': encodings,
+    }
+    write_file(os.path.join(DIST_DIR, MANIFEST_FILE),
+               json.dumps(manifest, indent=1, sort_keys=True).encode('utf-8'))
+    return manifest
+
+
+if __name__ == '__main__':
+    manifest = build()
+    print(f"Built {len(manifest['assets'])} assets and {len(manifest['pages'])} pages "
+          f"into {DIST_DIR} (version {manifest['version']})")
+    if brotli is None:
+        print("Note: install 'brotli' to also write .br variants")
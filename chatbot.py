@@ -0,0 +1,197 @@
+"""Rule-based travel assistant behind the /chatbot route.
+
+Replies are declared in the INTENTS table below; the detailed city guides
+come from the city table in cities.py. At import time every
+keyword is compiled into a single Aho-Corasick automaton, so a message is
+matched in one linear pass no matter how many intents or cities are added.
+When several intents match, the one listed first wins.
+
+Intent fields:
+    name      -- label used for the hit counters
+    keywords  -- substrings, any of which triggers the intent
+    words     -- like keywords, but only matched as whole words
+    also      -- optional second group; one of these must match as well
+    reply     -- the response text
+"""
+import threading
+from collections import Counter, deque
+
+from cities import CITIES
+
+FALLBACK_REPLY = "🤔 I’m not sure, but you can explore destinations on the site!"
+
+INTENTS = (
+    {'name': 'greeting', 'words': ('hello', 'hi', 'hey'),
+     'reply': "👋 Hello! I’m your travel assistant. How can I help you today?"},
+    {'name': 'help', 'keywords': ('help',),
+     'reply': "💡 You can ask me about cities, booking options, best time to visit, food, or travel tips!"},
+    {'name': 'recommend', 'keywords': ('recommend', 'suggest'),
+     'reply': "🌍 Looking for ideas? Try beaches in Goa, forts in Jaipur, backwaters in Kerala, or mountains in Himachal Pradesh!"},
+    {'name': 'booking', 'keywords': ('book', 'ticket', 'hotel'),
+     'reply': "🛫 You can book flights, trains, buses, or hotels in the 'Book Now' section."},
+
+    # Detailed city guides, e.g. "kolkata guide"
+    *({'name': 'guide_' + slug, 'keywords': (slug,), 'also': ('guide', 'detail'),
+       'reply': city['guide']} for slug, city in CITIES.items()),
+
+    # City-specific answers
+    {'name': 'kolkata', 'keywords': ('kolkata',),
+     'reply': "🌆 Kolkata is the City of Joy — famous for Durga Puja, Howrah Bridge, Victoria Memorial, and street food."},
+    {'name': 'goa', 'keywords': ('goa',),
+     'reply': "🏖 Goa is perfect for beaches, nightlife, water sports, and fun!"},
+    {'name': 'delhi', 'keywords': ('delhi',),
+     'reply': "🏰 Delhi is rich with history — visit Red Fort, India Gate, Lotus Temple, and Chandni Chowk for food!"},
+    {'name': 'mumbai', 'keywords': ('mumbai', 'bombay'),
+     'reply': "🌇 Mumbai is the City of Dreams — don’t miss Marine Drive, Gateway of India, Bollywood vibes, and street food!"},
+    {'name': 'jaipur', 'keywords': ('jaipur',),
+     'reply': "🏯 Jaipur is the Pink City — famous for Hawa Mahal, Amber Fort, and vibrant bazaars!"},
+    {'name': 'kerala', 'keywords': ('kerala',),
+     'reply': "🌴 Kerala is God’s Own Country — enjoy houseboats in Alleppey, Munnar tea gardens, and backwaters."},
+    {'name': 'himachal', 'keywords': ('himachal', 'manali', 'shimla'),
+     'reply': "⛰ Himachal is great for mountains, trekking, snow, and adventure — perfect for Manali and Shimla trips."},
+    {'name': 'chennai', 'keywords': ('chennai',),
+     'reply': "🌊 Chennai is famous for Marina Beach, temples, and delicious South Indian food!"},
+    {'name': 'bengaluru', 'keywords': ('bengaluru', 'bangalore'),
+     'reply': "🌳 Bengaluru is the Garden City — famous for IT hub, parks, pubs, and pleasant weather!"},
+    {'name': 'agra', 'keywords': ('agra', 'taj mahal'),
+     'reply': "🏛 Agra is home to the Taj Mahal — one of the Seven Wonders of the World!"},
+
+    # Experience-specific questions
+    {'name': 'food', 'keywords': ('food',),
+     'reply': "🍴 India is a food paradise! Try pani puri in Mumbai, rosogolla in Kolkata, biryani in Hyderabad, and dosa in Chennai!"},
+    {'name': 'festival', 'keywords': ('festival',),
+     'reply': "🎉 India celebrates many festivals — Durga Puja in Kolkata, Diwali across India, Holi in Mathura, and Ganesh Chaturthi in Mumbai."},
+    {'name': 'best_time', 'keywords': ('best time', 'season'),
+     'reply': "🗓 Best time to visit depends on the city! Winter (Oct–Feb) is great for most places, while Goa & Kerala are perfect in November–March."},
+    {'name': 'mountains', 'keywords': ('mountain', 'hill station'),
+     'reply': "⛰ For mountains, try Manali, Shimla, Darjeeling, Ooty, or Leh-Ladakh!"},
+    {'name': 'beaches', 'keywords': ('beach',),
+     'reply': "🏝 For beaches, try Goa, Pondicherry, Andaman & Nicobar Islands, or Kerala!"},
+    {'name': 'shopping', 'keywords': ('shopping',),
+     'reply': "🛍 For shopping, visit Chandni Chowk (Delhi), New Market (Kolkata), Commercial Street (Bengaluru), and Colaba Causeway (Mumbai)."},
+    {'name': 'itinerary', 'keywords': ('itinerary', 'plan trip'),
+     'reply': "📅 Sure! Tell me the city and days, and I can suggest a short travel plan."},
+    {'name': 'varanasi', 'keywords': ('varanasi',),
+     'reply': ("🛕 Varanasi — spiritual heart of India on the Ganges, known for ghats, "
+               "sunrise boat rides, Kashi Vishwanath Temple, and silk weaving.")},
+
+    # Extra
+    {'name': 'travel_tips', 'keywords': ('travel tips',),
+     'reply': "💡 Always check weather, local transport, and book popular attractions in advance!"},
+    {'name': 'visa', 'keywords': ('visa', 'entry'),
+     'reply': "🛂 Indian visa info: Most travelers need an e-visa; check government website for details."},
+    {'name': 'transport', 'keywords': ('transport', 'getting around'),
+     'reply': "🚗 Use metro, buses, taxis, or rideshares. For hill stations, taxis or local buses work best."},
+    {'name': 'budget', 'keywords': ('budget', 'cheap trip'),
+     'reply': "💰 Budget tips: Use local transport, street food, and book hotels in advance for savings."},
+)
+
+
+class KeywordAutomaton:
+    """Aho-Corasick automaton reporting every (end, pattern id) occurrence."""
+
+    def __init__(self, patterns):
+        self.goto = [{}]
+        self.fail = [0]
+        self.out = [[]]
+        for pid, pattern in enumerate(patterns):
+            node = 0
+            for ch in pattern:
+                nxt = self.goto[node].get(ch)
+                if nxt is None:
+                    nxt = len(self.goto)
+                    self.goto.append({})
+                    self.fail.append(0)
+                    self.out.append([])
+                    self.goto[node][ch] = nxt
+                node = nxt
+            self.out[node].append(pid)
+
+        queue = deque(self.goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for ch, nxt in self.goto[node].items():
+                queue.append(nxt)
+                fail = self.fail[node]
+                while fail and ch not in self.goto[fail]:
+                    fail = self.fail[fail]
+                self.fail[nxt] = self.goto[fail].get(ch, 0) if node else 0
+                self.out[nxt] = self.out[nxt] + self.out[self.fail[nxt]]
+
+    def iter_matches(self, text):
+        node = 0
+        for end, ch in enumerate(text, 1):
+            while node and ch not in self.goto[node]:
+                node = self.fail[node]
+            node = self.goto[node].get(ch, 0)
+            for pid in self.out[node]:
+                yield end, pid
+
+
+class IntentMatcher:
+    """Compiles an intent table into one automaton plus per-intent counters."""
+
+    def __init__(self, intents):
+        self.intents = intents
+        self.terms = []           # (pattern, whole_word)
+        self.term_intents = []    # term id -> priorities it triggers
+        self.requires = {}        # priority -> term ids of its `also` group
+        term_ids = {}
+
+        def term(pattern, whole_word):
+            key = (pattern, whole_word)
+            if key not in term_ids:
+                term_ids[key] = len(self.terms)
+                self.terms.append(key)
+                self.term_intents.append([])
+            return term_ids[key]
+
+        for priority, intent in enumerate(intents):
+            for pattern in intent.get('keywords', ()):
+                self.term_intents[term(pattern, False)].append(priority)
+            for pattern in intent.get('words', ()):
+                self.term_intents[term(pattern, True)].append(priority)
+            if intent.get('also'):
+                self.requires[priority] = {term(pattern, False) for pattern in intent['also']}
+
+        self.automaton = KeywordAutomaton([pattern for pattern, _ in self.terms])
+        self.hits = Counter()
+        self._lock = threading.Lock()
+
+    def _matched_terms(self, text):
+        matched = set()
+        for end, tid in self.automaton.iter_matches(text):
+            pattern, whole_word = self.terms[tid]
+            if whole_word:
+                start = end - len(pattern)
+                if (start > 0 and text[start - 1].isalnum()) or (end < len(text) and text[end].isalnum()):
+                    continue
+            matched.add(tid)
+        return matched
+
+    def match(self, message):
+        """Return the highest-priority intent matching `message`, or None."""
+        matched = self._matched_terms(message.lower())
+        best = None
+        for tid in matched:
+            for priority in self.term_intents[tid]:
+                if best is not None and priority >= best:
+                    continue
+                required = self.requires.get(priority)
+                if required is None or required & matched:
+                    best = priority
+        name = self.intents[best]['name'] if best is not None else 'fallback'
+        with self._lock:
+            self.hits[name] += 1
+        return self.intents[best] if best is not None else None
+
+    def reply(self, message):
+        intent = self.match(message)
+        return intent['reply'] if intent else FALLBACK_REPLY
+
+    def stats(self):
+        with self._lock:
+            return dict(self.hits)
+
+
+matcher = IntentMatcher(INTENTS)
@@ -0,0 +1,470 @@
+"""City data behind the /<city> pages and the chatbot's city guides.
+
+One entry per city; adding a row here is enough to publish a new page
+(rendered from templates/city.html) and a "<city> guide" chatbot reply.
+The page hero video is /videos/<slug>.mp4 and card images live in
+static/images/.
+
+City fields:
+    name       -- display name
+    tagline    -- hero subtitle
+    spots      -- main attractions, as {'image', 'name', 'text'} cards
+    foods      -- must-try foods, same shape as spots
+    best_time  -- "Best time to visit" paragraph (trusted HTML)
+    motto      -- footer line, followed by the themes
+    themes     -- footer themes, e.g. "Beaches • Culture • Cuisine"
+    guide      -- detailed chatbot guide text
+"""
+
+CITIES = {
+    'kolkata': {
+        'name': "Kolkata",
+        'tagline': (
+            "The cultural capital of India—where history, art, and street food create an "
+            "unforgettable experience."
+        ),
+        'spots': (
+            {'image': 'victoria.jpg', 'name': "Victoria Memorial",
+             'text': (
+                 "A grand marble monument surrounded by lush gardens, reflecting Kolkata’s "
+                 "colonial history."
+             )},
+            {'image': 'howrah.jpg', 'name': "Howrah Bridge",
+             'text': (
+                 "The iconic cantilever bridge over the Hooghly River, best viewed at sunrise or "
+                 "sunset."
+             )},
+            {'image': 'dakshineswar.jpg', 'name': "Dakshineswar Kali Temple",
+             'text': "Spiritual hub on the banks of the Ganges, dedicated to Goddess Kali."},
+        ),
+        'foods': (
+            {'image': 'rosogolla.jpg', 'name': "Rasgulla & Mishti Doi",
+             'text': "Classic Bengali sweets that melt in your mouth—perfect for dessert lovers."},
+            {'image': 'kathiroll.jpg', 'name': "Kathi Roll",
+             'text': "Paratha wraps stuffed with spiced fillings, a true street-food favourite."},
+            {'image': 'machherjhol.jpg', 'name': "Machher Jhol",
+             'text': (
+                 "A traditional fish curry with mustard and spices, representing Bengal’s love "
+                 "for fish."
+             )},
+        ),
+        'best_time': (
+            "<strong>October to March</strong> is ideal, when the weather is cool and pleasant. "
+            "Visit during <strong>Durga Puja</strong> (Sept–Oct) to experience the city’s "
+            "grandest festival, vibrant decorations, and cultural performances."
+        ),
+        'motto': "Discover the soul of Kolkata",
+        'themes': "Culture • Cuisine • Heritage",
+        'guide': (
+            "🌆 Kolkata — the City of Joy!\n\n"
+            "🏛 Famous Landmarks: Victoria Memorial, Howrah Bridge, Indian Museum, Marble Palace.\n"
+            "🍴 Food & Cuisine: Street food like puchka, kathi rolls, rosogolla, mishti doi.\n"
+            "🎉 Festivals: Durga Puja (main event), Diwali, Kali Puja.\n"
+            "🗓 Best Time to Visit: October to February (cool & festive season).\n"
+            "🏞 Activities: Tram rides, river cruises on Hooghly, exploring colonial architecture.\n"
+            "🛍 Shopping: New Market, Gariahat Market, Kumartuli crafts.\n"
+            "💡 Travel Tips: Avoid peak hours for traffic; use metro for faster travel.\n"
+            "📅 Suggested Itinerary: "
+            "Day 1 – Victoria Memorial, Indian Museum, Park Street for dinner; "
+            "Day 2 – Howrah Bridge, Kumartuli, Princep Ghat boat ride."
+        ),
+    },
+    'varanasi': {
+        'name': "Varanasi",
+        'tagline': (
+            "The spiritual heart of India—where ancient ghats, timeless rituals, and sacred Ganga "
+            "meet."
+        ),
+        'spots': (
+            {'image': 'dashashwamedh.jpg', 'name': "Dashashwamedh Ghat",
+             'text': (
+                 "Witness the mesmerizing Ganga Aarti every evening on this vibrant riverfront "
+                 "ghat."
+             )},
+            {'image': 'kashi-vishwanath.jpg', 'name': "Kashi Vishwanath Temple",
+             'text': (
+                 "One of the holiest Shiva temples, a must-visit for devotees and history lovers "
+                 "alike."
+             )},
+            {'image': 'sarnath.jpg', 'name': "Sarnath",
+             'text': (
+                 "The site of Buddha’s first sermon, featuring serene stupas and ancient ruins."
+             )},
+        ),
+        'foods': (
+            {'image': 'banarasi-paan.jpg', 'name': "Banarasi Paan",
+             'text': (
+                 "A traditional betel leaf preparation—sweet, fragrant, and symbolic of the "
+                 "city’s culture."
+             )},
+            {'image': 'kachori-sabzi.jpg', 'name': "Kachori Sabzi",
+             'text': (
+                 "Flaky fried bread with spicy potato curry, the quintessential Varanasi "
+                 "breakfast."
+             )},
+            {'image': 'lassi.jpg', 'name': "Banarasi Lassi",
+             'text': (
+                 "Rich yogurt drink topped with malai and nuts, served in a traditional clay cup."
+             )},
+        ),
+        'best_time': (
+            "<strong>October to March</strong> offers cool, pleasant weather. Experience the "
+            "grand <strong>Dev Deepawali</strong> festival when thousands of diyas light up the "
+            "ghats, creating a breathtaking spectacle."
+        ),
+        'motto': "Discover the soul of Varanasi",
+        'themes': "Spirituality • Culture • Heritage",
+        'guide': (
+            "🛕 Varanasi — spiritual heart of India!\n\n"
+            "🏛 Famous Landmarks: Kashi Vishwanath Temple, Dashashwamedh Ghat, Sarnath.\n"
+            "🍴 Food & Cuisine: Kachori sabzi, Banarasi paan, Malaiyo in winter.\n"
+            "🎉 Festivals: Ganga Mahotsav, Dev Deepawali, Diwali.\n"
+            "🗓 Best Time to Visit: October to March.\n"
+            "🏞 Activities: Sunrise boat ride on the Ganges, attend Ganga Aarti, explore silk weaving streets.\n"
+            "🛍 Shopping: Banarasi sarees, brassware, handicrafts.\n"
+            "📅 Suggested Itinerary: Day 1 – Ghats + evening Ganga Aarti; Day 2 – Sarnath + local shopping."
+        ),
+    },
+    'goa': {
+        'name': "Goa",
+        'tagline': (
+            "India’s beach paradise—sun-kissed shores, vibrant nightlife, and a blend of "
+            "Portuguese charm."
+        ),
+        'spots': (
+            {'image': 'baga-beach.jpg', 'name': "Baga Beach",
+             'text': (
+                 "One of Goa’s most popular beaches, known for water sports, shacks, and lively "
+                 "evenings."
+             )},
+            {'image': 'basilica-bom-jesus.jpg', 'name': "Basilica of Bom Jesus",
+             'text': (
+                 "A UNESCO World Heritage Site housing the relics of St. Francis Xavier, "
+                 "showcasing baroque architecture."
+             )},
+            {'image': 'aguada-fort.jpg', 'name': "Fort Aguada",
+             'text': (
+                 "A 17th-century Portuguese fort overlooking the Arabian Sea, offering panoramic "
+                 "views and history."
+             )},
+        ),
+        'foods': (
+            {'image': 'goan-fish-curry.jpg', 'name': "Goan Fish Curry",
+             'text': (
+                 "A tangy coconut-based curry with fresh fish, perfectly paired with steamed "
+                 "rice."
+             )},
+            {'image': 'prawn-baldao.jpg', 'name': "Prawn Balchao",
+             'text': (
+                 "A spicy and flavorful pickle-style prawn dish influenced by Portuguese cuisine."
+             )},
+            {'image': 'bebinca.jpg', 'name': "Bebinca",
+             'text': (
+                 "Goa’s signature layered dessert made of coconut milk, eggs, and ghee—sweet and "
+                 "decadent."
+             )},
+        ),
+        'best_time': (
+            "<strong>November to February</strong> is perfect for pleasant weather and beach "
+            "activities. Visit in late December to enjoy <strong>Goa Carnival</strong> and lively "
+            "New Year celebrations."
+        ),
+        'motto': "Discover the spirit of Goa",
+        'themes': "Beaches • Culture • Cuisine",
+        'guide': (
+            "🏖 Goa — beaches, nightlife, and Portuguese heritage!\n\n"
+            "🏛 Famous Landmarks: Basilica of Bom Jesus, Fort Aguada, Chapora Fort.\n"
+            "🍴 Food & Cuisine: Goan fish curry, vindaloo, bebinca, seafood.\n"
+            "🎉 Festivals: Carnival (Feb), Shigmo, Christmas, Sunburn Music Festival.\n"
+            "🗓 Best Time to Visit: November to March.\n"
+            "🏞 Activities: Beaches, water sports, nightclubs, island hopping.\n"
+            "🛍 Shopping: Flea markets in Anjuna & Mapusa.\n"
+            "📅 Suggested Itinerary: Day 1 – North Goa beaches + Fort Aguada; Day 2 – South Goa beaches + Basilica."
+        ),
+    },
+    'mumbai': {
+        'name': "Mumbai",
+        'tagline': (
+            "The city of dreams—where Bollywood glamour meets colonial charm and a bustling "
+            "waterfront."
+        ),
+        'spots': (
+            {'image': 'gateway-of-india.jpg', 'name': "Gateway of India",
+             'text': (
+                 "An iconic waterfront arch built in 1924, perfect for sunrise views and boat "
+                 "rides to Elephanta Island."
+             )},
+            {'image': 'marine-drive.jpg', 'name': "Marine Drive",
+             'text': (
+                 "The famous “Queen’s Necklace,” a 3.6-km boulevard along the Arabian Sea ideal "
+                 "for evening strolls."
+             )},
+            {'image': 'chhatrapati-terminus.jpg', 'name': "Chhatrapati Shivaji Terminus",
+             'text': (
+                 "A UNESCO World Heritage railway station blending Victorian Gothic architecture "
+                 "with Indian influences."
+             )},
+        ),
+        'foods': (
+            {'image': 'vada-pav.jpg', 'name': "Vada Pav",
+             'text': (
+                 "Mumbai’s iconic street snack—spicy potato fritter in a soft bun, served with "
+                 "chutneys."
+             )},
+            {'image': 'pav-bhaji.jpg', 'name': "Pav Bhaji",
+             'text': (
+                 "A buttery mix of spiced vegetables served with soft buns, loved by locals and "
+                 "visitors alike."
+             )},
+            {'image': 'bhel-puri.jpg', 'name': "Bhel Puri",
+             'text': (
+                 "A crunchy, tangy snack of puffed rice, vegetables, and chutneys found along "
+                 "Mumbai’s beaches."
+             )},
+        ),
+        'best_time': (
+            "<strong>November to February</strong> offers pleasant weather for sightseeing and "
+            "beach walks. Visit during <strong>Ganesh Chaturthi</strong> (Aug–Sept) to witness "
+            "grand celebrations across the city."
+        ),
+        'motto': "Discover the pulse of Mumbai",
+        'themes': "Heritage • Cuisine • Nightlife",
+        'guide': (
+            "🌇 Mumbai — City of Dreams!\n\n"
+            "🏛 Famous Landmarks: Gateway of India, Marine Drive, Chhatrapati Shivaji Terminus, Elephanta Caves.\n"
+            "🍴 Food & Cuisine: Vada pav, pav bhaji, bhel puri, seafood.\n"
+            "🎉 Festivals: Ganesh Chaturthi, Diwali, Mumbai Film Festival.\n"
+            "🗓 Best Time to Visit: November to February.\n"
+            "🏞 Activities: Bollywood tours, nightlife, beaches, street food tour.\n"
+            "🛍 Shopping: Colaba Causeway, Linking Road, Crawford Market.\n"
+            "📅 Suggested Itinerary: Day 1 – Gateway of India, Colaba, Marine Drive; Day 2 – Elephanta Caves + shopping."
+        ),
+    },
+    'shimla': {
+        'name': "Shimla",
+        'tagline': (
+            "The Queen of Hills—snow-capped peaks, pine forests, and charming colonial heritage "
+            "await you."
+        ),
+        'spots': (
+            {'image': 'the-ridge.jpg', 'name': "The Ridge",
+             'text': (
+                 "A spacious open street in the heart of Shimla, offering stunning views of the "
+                 "surrounding mountains."
+             )},
+            {'image': 'jakhoo-temple.jpg', 'name': "Jakhoo Temple",
+             'text': (
+                 "Dedicated to Lord Hanuman, this hilltop temple provides panoramic views of the "
+                 "entire city."
+             )},
+            {'image': 'kufri.jpg', 'name': "Kufri",
+             'text': (
+                 "A short drive from Shimla, famous for its skiing slopes, hiking trails, and "
+                 "breathtaking vistas."
+             )},
+        ),
+        'foods': (
+            {'image': 'chana-madra.jpg', 'name': "Chana Madra",
+             'text': (
+                 "A traditional Himachali dish made with chickpeas cooked in a creamy "
+                 "yogurt-based gravy."
+             )},
+            {'image': 'sidu.jpg', 'name': "Sidu",
+             'text': (
+                 "Fluffy steamed bread stuffed with a mixture of spices and nuts, often served "
+                 "with ghee."
+             )},
+            {'image': 'babru.jpg', 'name': "Babru",
+             'text': (
+                 "A Himachali version of the kachori, filled with black gram paste and served "
+                 "hot."
+             )},
+        ),
+        'best_time': (
+            "<strong>March to June</strong> is perfect for pleasant summer weather and "
+            "sightseeing. For snow lovers, <strong>December to February</strong> brings beautiful "
+            "winter landscapes and snowfall."
+        ),
+        'motto': "Discover the charm of Shimla",
+        'themes': "Hills • Heritage • Adventure",
+        'guide': (
+            "⛰ Shimla — Queen of Hills!\n\n"
+            "🏛 Famous Landmarks: Mall Road, The Ridge, Jakhoo Temple.\n"
+            "🍴 Food & Cuisine: Himachali cuisine, chha gosht, siddu.\n"
+            "🎉 Festivals: Summer Festival, Winter Carnival.\n"
+            "🗓 Best Time to Visit: March to June (summer), December to February (snow).\n"
+            "🏞 Activities: Trekking, toy train rides, mountain walks.\n"
+            "🛍 Shopping: Mall Road shops, Lakkar Bazaar.\n"
+            "📅 Suggested Itinerary: Day 1 – Mall Road + Ridge + Christ Church; Day 2 – Jakhoo Hill + Kufri trip."
+        ),
+    },
+    'chennai': {
+        'name': "Chennai",
+        'tagline': (
+            "The gateway to South India—where ancient temples, vibrant culture, and golden "
+            "beaches meet."
+        ),
+        'spots': (
+            {'image': 'marina-beach.jpg', 'name': "Marina Beach",
+             'text': (
+                 "India’s longest urban beach, perfect for sunrise walks and evening breezes "
+                 "along the Bay of Bengal."
+             )},
+            {'image': 'kapaleeshwarar-temple.jpg', 'name': "Kapaleeshwarar Temple",
+             'text': (
+                 "A magnificent Dravidian-style temple dedicated to Lord Shiva, rich in color and "
+                 "intricate carvings."
+             )},
+            {'image': 'fort-st-george.jpg', 'name': "Fort St. George",
+             'text': (
+                 "Built in 1644 by the British, this historic fort houses a museum and remnants "
+                 "of colonial architecture."
+             )},
+        ),
+        'foods': (
+            {'image': 'filter-coffee.jpg', 'name': "South Indian Filter Coffee",
+             'text': (
+                 "Strong, aromatic coffee brewed in the traditional style and served frothy in a "
+                 "steel tumbler."
+             )},
+            {'image': 'dosa.jpg', 'name': "Masala Dosa",
+             'text': (
+                 "A crisp fermented crepe stuffed with spiced potatoes, accompanied by sambar and "
+                 "chutneys."
+             )},
+            {'image': 'chettinad-chicken.jpg', 'name': "Chettinad Chicken",
+             'text': (
+                 "A fiery chicken curry made with freshly ground spices—a specialty of Tamil Nadu "
+                 "cuisine."
+             )},
+        ),
+        'best_time': (
+            "The best months are <strong>November to February</strong>, when the weather is "
+            "cooler and pleasant. Experience the city’s culture during the vibrant "
+            "<strong>Margazhi Music Season</strong> of December–January."
+        ),
+        'motto': "Discover the soul of Chennai",
+        'themes': "Culture • Cuisine • Heritage",
+        'guide': (
+            "🌊 Chennai — Gateway to South India!\n\n"
+            "🏛 Famous Landmarks: Marina Beach, Kapaleeshwarar Temple, Fort St. George.\n"
+            "🍴 Food & Cuisine: Dosa, idli, filter coffee, Chettinad cuisine.\n"
+            "🎉 Festivals: Pongal, Diwali, Chennai Music Season.\n"
+            "🗓 Best Time to Visit: November to February.\n"
+            "🏞 Activities: Beach walks, temple tours, cultural shows.\n"
+            "🛍 Shopping: T Nagar, Pondy Bazaar.\n"
+            "📅 Suggested Itinerary: Day 1 – Marina Beach + Fort St. George; Day 2 – Kapaleeshwarar Temple + shopping."
+        ),
+    },
+    'jaipur': {
+        'name': "Jaipur",
+        'tagline': (
+            "The Pink City of India—rich in royal palaces, vibrant bazaars, and historic forts."
+        ),
+        'spots': (
+            {'image': 'hawa-mahal.jpg', 'name': "Hawa Mahal",
+             'text': (
+                 "The iconic “Palace of Winds,” famous for its intricate lattice windows and "
+                 "royal history."
+             )},
+            {'image': 'amber-fort.jpg', 'name': "Amber Fort",
+             'text': (
+                 "A majestic hilltop fort blending Hindu and Mughal architecture, with panoramic "
+                 "views of Jaipur."
+             )},
+            {'image': 'jantar-mantar.jpg', 'name': "Jantar Mantar",
+             'text': (
+                 "An astronomical observatory built in the 18th century, showcasing remarkable "
+                 "historical instruments."
+             )},
+        ),
+        'foods': (
+            {'image': 'daal-baati-churma.jpg', 'name': "Daal Baati Churma",
+             'text': (
+                 "A traditional Rajasthani meal of baked wheat balls, spiced lentils, and sweet "
+                 "crumbled churma."
+             )},
+            {'image': 'ghevar.jpg', 'name': "Ghevar",
+             'text': (
+                 "A crispy sweet dessert soaked in sugar syrup, often enjoyed during festivals "
+                 "like Teej."
+             )},
+            {'image': 'pyaz-ki-kachori.jpg', 'name': "Pyaz Ki Kachori",
+             'text': "Spicy onion-stuffed pastry, a popular street food snack in Jaipur."},
+        ),
+        'best_time': (
+            "<strong>October to March</strong> is ideal with pleasant weather for sightseeing. "
+            "Attend the <strong>Jaipur Literature Festival</strong> in January to experience the "
+            "city’s cultural vibrancy."
+        ),
+        'motto': "Discover the heritage of Jaipur",
+        'themes': "Palaces • Culture • Cuisine",
+        'guide': (
+            "🏯 Jaipur — The Pink City!\n\n"
+            "🏛 Famous Landmarks: Amber Fort, Hawa Mahal, City Palace, Jantar Mantar.\n"
+            "🍴 Food & Cuisine: Dal Baati Churma, Ghevar, Laal Maas.\n"
+            "🎉 Festivals: Jaipur Literature Festival, Teej, Gangaur.\n"
+            "🗓 Best Time to Visit: October to March.\n"
+            "🏞 Activities: Fort tours, cultural shows, traditional markets.\n"
+            "🛍 Shopping: Johari Bazaar, Bapu Bazaar, Tripolia Bazaar.\n"
+            "📅 Suggested Itinerary: Day 1 – Amber Fort + City Palace; Day 2 – Hawa Mahal + shopping + local food."
+        ),
+    },
+    'delhi': {
+        'name': "Delhi",
+        'tagline': (
+            "The capital city of India—where history, politics, and culture coexist in a vibrant "
+            "mix."
+        ),
+        'spots': (
+            {'image': 'red-fort.jpg', 'name': "Red Fort",
+             'text': (
+                 "The iconic 17th-century Mughal fort with stunning architecture and historical "
+                 "significance."
+             )},
+            {'image': 'qutub-minar.jpg', 'name': "Qutub Minar",
+             'text': (
+                 "A UNESCO World Heritage Site and the tallest brick minaret in the world, dating "
+                 "back to 1193 AD."
+             )},
+            {'image': 'india-gate.jpg', 'name': "India Gate",
+             'text': (
+                 "A war memorial honoring Indian soldiers, set amidst lush lawns and fountains."
+             )},
+        ),
+        'foods': (
+            {'image': 'chole-bhature.jpg', 'name': "Chole Bhature",
+             'text': (
+                 "Spicy chickpea curry served with deep-fried fluffy bread—a Delhi breakfast "
+                 "classic."
+             )},
+            {'image': 'butter-chicken.jpg', 'name': "Butter Chicken",
+             'text': (
+                 "Rich, creamy chicken curry with tomato-based gravy—originated in Delhi and "
+                 "loved nationwide."
+             )},
+            {'image': 'Dahi-bhalla.jpg', 'name': "Dahi Bhalla",
+             'text': (
+                 "Soft lentil dumplings soaked in creamy yogurt, topped with tangy chutneys and "
+                 "spices, making it a refreshing street food delight."
+             )},
+        ),
+        'best_time': (
+            "<strong>October to March</strong> is ideal for sightseeing in comfortable weather. "
+            "Visit during <strong>Diwali</strong> or <strong>Republic Day</strong> to witness "
+            "vibrant celebrations."
+        ),
+        'motto': "Discover the spirit of Delhi",
+        'themes': "Heritage • Culture • Cuisine",
+        'guide': (
+            "🏛 Delhi — Capital of India!\n\n"
+            "🏛 Famous Landmarks: Red Fort, India Gate, Qutub Minar, Lotus Temple, Chandni Chowk.\n"
+            "🍴 Food & Cuisine: Chole Bhature, Parathas, Street food in Chandni Chowk.\n"
+            "🎉 Festivals: Diwali, Republic Day, Holi.\n"
+            "🗓 Best Time to Visit: October to March.\n"
+            "🏞 Activities: Sightseeing tours, heritage walks, food walks.\n"
+            "🛍 Shopping: Dilli Haat, Sarojini Nagar, Janpath.\n"
+            "📅 Suggested Itinerary: Day 1 – Red Fort + Chandni Chowk + India Gate; Day 2 – Qutub Minar + Lotus Temple."
+        ),
+    },
+}
@@ -0,0 +1,93 @@
+import unicodedata
+from collections import Counter, defaultdict
+
+# Minimum trigram (Dice) similarity for a typo-tolerant match.
+MIN_SIMILARITY = 0.4
+
+
+def fold(text):
+    """Case-fold, strip accents and collapse whitespace for matching."""
+    text = unicodedata.normalize('NFKD', text.casefold())
+    text = ''.join(ch for ch in text if not unicodedata.combining(ch))
+    return ' '.join(text.split())
+
+
+def ngrams(text, n):
+    return {text[i:i + n] for i in range(len(text) - n + 1)}
+
+
+class CityIndex:
+    """Lookup index over city names, built once at model-load time.
+
+    Holds a folded-name dict for exact matches and an n-gram postings index
+    (all 1-, 2- and 3-grams) for substring and typo-tolerant matching, so a
+    miss no longer scans every city name.
+    """
+
+    def __init__(self, names):
+        self.names = list(names)
+        self.folded = [fold(name) for name in self.names]
+        self.exact = {}
+        self.postings = defaultdict(list)
+        for pos, key in enumerate(self.folded):
+            self.exact.setdefault(key, pos)
+            for n in (1, 2, 3):
+                for gram in ngrams(key, n):
+                    self.postings[gram].append(pos)
+
+    def _substring_matches(self, query):
+        if len(query) <= 3:
+            return self.postings.get(query, [])
+        grams = sorted(ngrams(query, 3), key=lambda g: len(self.postings.get(g, ())))
+        candidates = set(self.postings.get(grams[0], ()))
+        for gram in grams[1:]:
+            if not candidates:
+                break
+            candidates.intersection_update(self.postings.get(gram, ()))
+        return [pos for pos in candidates if query in self.folded[pos]]
+
+    def _similar(self, query):
+        grams = ngrams(query, 3)
+        if not grams:
+            return []
+        common = Counter()
+        for gram in grams:
+            common.update(self.postings.get(gram, ()))
+        scored = []
+        for pos, shared in common.items():
+            score = 2.0 * shared / (len(grams) + len(ngrams(self.folded[pos], 3)))
+            if score >= MIN_SIMILARITY:
+                scored.append((-score, abs(len(self.folded[pos]) - len(query)), pos))
+        scored.sort()
+        return [pos for _, _, pos in scored]
+
+    def search(self, query, limit=10):
+        """Return up to `limit` city names matching `query`, best first.
+
+        Ranking is deterministic: exact (folded) match, then prefix matches,
+        then other substring matches by match position and name length, then
+        typo-tolerant trigram matches by similarity; remaining ties keep the
+        model's city order.
+        """
+        query = fold(query)
+        if not query or limit <= 0:
+            return []
+        hits = self._substring_matches(query)
+        if hits:
+            ranked = sorted(hits, key=lambda pos: (
+                self.folded[pos] != query,
+                self.folded[pos].find(query),
+                len(self.folded[pos]),
+                pos,
+            ))
+        else:
+            ranked = self._similar(query)
+        return [self.names[pos] for pos in ranked[:limit]]
+
+    def resolve(self, query):
+        """Return the best-matching city name for `query`, or None."""
+        pos = self.exact.get(fold(query))
+        if pos is not None:
+            return self.names[pos]
+        matches = self.search(query, limit=1)
+        return matches[0] if matches else None
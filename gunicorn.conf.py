@@ -0,0 +1,66 @@
+"""Gunicorn settings for the pre-fork production server.
+
+    pip install gunicorn
+    gunicorn -c gunicorn.conf.py
+
+The app is built once in the master (preload_app): the model artifacts, the
+fuzzy city index and the database schema are loaded before any worker is
+forked, so workers share those pages copy-on-write instead of each loading
+its own copy. Each worker then warms itself (app.warm_up) before it starts
+accepting connections, and /ready reports it.
+
+Workers are recycled after a jittered number of requests and are given
+GUNICORN_GRACEFUL_TIMEOUT seconds to finish in-flight requests on restart
+or shutdown. Each worker watches the model file and hot-swaps a new
+version itself (see model_reload.py). That copy is private to the worker;
+a restart makes the new model shared again.
+"""
+import gc
+import os
+
+
+def cpu_count():
+    """CPUs this process may run on (honours affinity / container limits)."""
+    try:
+        return len(os.sched_getaffinity(0))
+    except AttributeError:
+        return os.cpu_count() or 1
+
+
+wsgi_app = 'app:create_app()'
+bind = os.environ.get('GUNICORN_BIND', '0.0.0.0:5000')
+preload_app = True
+
+# Scoring and the password KDF are CPU-bound, so one process per core; a few
+# threads per worker keep slow clients and video streams from blocking it.
+# Video streams and password hashing are capped below the thread count
+# (media.MAX_VIDEO_STREAMS and passwords.PASSWORD_HASH_QUEUE default to
+# threads - 1), so at least one thread is left for pages and the API; an
+# explicit cap raises the threads to match.
+worker_class = 'gthread'
+workers = int(os.environ.get('WEB_CONCURRENCY', cpu_count()))
+threads = int(os.environ.get('GUNICORN_THREADS', 4))
+for _cap in ('MAX_VIDEO_STREAMS', 'PASSWORD_HASH_QUEUE'):
+    if _cap in os.environ:
+        threads = max(threads, int(os.environ[_cap]) + 1)
+
+# Recycle workers now and then so slow leaks and fragmentation cannot
+# build up; the jitter keeps them from all restarting at once.
+max_requests = int(os.environ.get('GUNICORN_MAX_REQUESTS', 10000))
+max_requests_jitter = int(os.environ.get('GUNICORN_MAX_REQUESTS_JITTER', 1000))
+graceful_timeout = int(os.environ.get('GUNICORN_GRACEFUL_TIMEOUT', 30))
+timeout = int(os.environ.get('GUNICORN_TIMEOUT', 60))
+keepalive = 5
+
+
+def when_ready(server):
+    # Everything loaded so far is shared with the workers. Move it out of
+    # the collector's reach so a GC pass in a worker does not write to (and
+    # so copy) those pages.
+    gc.freeze()
+
+
+def post_worker_init(worker):
+    # Runs in the worker before it accepts connections.
+    import app
+    app.warm_up(worker.wsgi)
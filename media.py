@@ -0,0 +1,159 @@
+"""Streaming endpoint for the city videos in static/videos.
+
+File size and mtime are read once at startup instead of stat'ed per
+request. Responses honour Range (206 partial content), If-None-Match and
+If-Range. Ranges that run to the end of the file go out through the
+server's wsgi.file_wrapper, which servers such as gunicorn turn into a
+zero-copy sendfile(). At most MAX_VIDEO_STREAMS responses stream at once
+per worker, so video traffic cannot tie up every request thread. The
+default is one less than the worker's GUNICORN_THREADS.
+"""
+import io
+import mimetypes
+import os
+import threading
+from collections import namedtuple
+
+from flask import Response, abort, request
+from werkzeug.http import http_date, parse_etags, parse_if_range_header, parse_range_header
+from werkzeug.wsgi import wrap_file
+
+from build_static import STATIC_DIR
+
+VIDEO_DIR = os.path.join(STATIC_DIR, 'videos')
+MAX_VIDEO_STREAMS = int(os.environ.get(
+    'MAX_VIDEO_STREAMS', max(1, int(os.environ.get('GUNICORN_THREADS', 4)) - 1)))
+VIDEO_MAX_AGE = int(os.environ.get('VIDEO_MAX_AGE', 86400))
+CHUNK_SIZE = 64 * 1024
+
+VideoFile = namedtuple('VideoFile', 'path size mtime etag mimetype')
+
+
+def scan_videos(directory=VIDEO_DIR):
+    """Map file name -> VideoFile for every file in `directory`."""
+    videos = {}
+    if not os.path.isdir(directory):
+        return videos
+    for entry in os.scandir(directory):
+        if not entry.is_file():
+            continue
+        st = entry.stat()
+        videos[entry.name] = VideoFile(
+            path=entry.path,
+            size=st.st_size,
+            mtime=st.st_mtime,
+            etag=f"{int(st.st_mtime)}-{st.st_size:x}",
+            mimetype=mimetypes.guess_type(entry.name)[0] or 'application/octet-stream',
+        )
+    return videos
+
+
+videos = scan_videos()
+video_streams = threading.BoundedSemaphore(MAX_VIDEO_STREAMS)
+
+
+class _StreamFile(io.FileIO):
+    """Video file holding one stream slot, freed when the file is closed.
+
+    The WSGI server closes the response body, and with it this file, once
+    the response is done; keeping fileno() intact lets file_wrapper
+    implementations still use sendfile().
+    """
+
+    def close(self):
+        if not self.closed:
+            video_streams.release()
+        super().close()
+
+
+class _RangeIter:
+    """Iterates `length` bytes of `f` from its current position."""
+
+    def __init__(self, f, length):
+        self.f = f
+        self.remaining = length
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        if self.remaining <= 0:
+            raise StopIteration
+        chunk = self.f.read(min(CHUNK_SIZE, self.remaining))
+        if not chunk:
+            raise StopIteration
+        self.remaining -= len(chunk)
+        return chunk
+
+    def close(self):
+        self.f.close()
+
+
+def _range_applies(info, if_range):
+    """Whether a Range header may be honoured, given any If-Range validator."""
+    if if_range.etag is not None:
+        return if_range.etag == info.etag
+    if if_range.date is not None:
+        return if_range.date.timestamp() >= int(info.mtime)
+    return True
+
+
+def plan_video(info, headers):
+    """Decide the response to a request for `info`, given its request headers.
+
+    Returns (status, response headers, start, stop); start and stop are None
+    when no body is sent (304, 416). Shared with the ASGI server (asgi.py).
+    """
+    resp_headers = {
+        'Accept-Ranges': 'bytes',
+        'ETag': f'"{info.etag}"',
+        'Last-Modified': http_date(info.mtime),
+        'Cache-Control': f'public, max-age={VIDEO_MAX_AGE}',
+    }
+    if parse_etags(headers.get('If-None-Match')).contains(info.etag):
+        return 304, resp_headers, None, None
+
+    start, stop, status = 0, info.size, 200
+    byte_range = parse_range_header(headers.get('Range'))
+    # multipart/byteranges is not supported; a server may ignore Range, so
+    # a multi-range request gets the whole file (range_for_length would
+    # return None for it, which must not turn into a 416)
+    if byte_range is not None and len(byte_range.ranges) != 1:
+        byte_range = None
+    if byte_range is not None and _range_applies(info, parse_if_range_header(headers.get('If-Range'))):
+        bounds = byte_range.range_for_length(info.size)
+        if bounds is None:
+            resp_headers['Content-Range'] = f'bytes */{info.size}'
+            return 416, resp_headers, None, None
+        start, stop = bounds
+        status = 206
+        resp_headers['Content-Range'] = f'bytes {start}-{stop - 1}/{info.size}'
+    return status, resp_headers, start, stop
+
+
+def send_video(name):
+    info = videos.get(name)
+    if info is None:
+        abort(404)
+
+    status, headers, start, stop = plan_video(info, request.headers)
+    if start is None:
+        return Response(status=status, headers=headers)
+
+    if not video_streams.acquire(blocking=False):
+        return Response('Too many concurrent video streams, please retry.', status=503,
+                        headers={'Retry-After': '1'})
+    try:
+        f = _StreamFile(info.path)
+    except BaseException:
+        video_streams.release()
+        raise
+    f.seek(start)
+    if stop == info.size:
+        body = wrap_file(request.environ, f, CHUNK_SIZE)
+    else:
+        body = _RangeIter(f, stop - start)
+    resp = Response(body, status=status, mimetype=info.mimetype, headers=headers,
+                    direct_passthrough=True)
+    resp.content_length = stop - start
+    return resp
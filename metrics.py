@@ -0,0 +1,205 @@
+"""In-process request metrics, exposed in Prometheus text format.
+
+`init_app` installs request hooks that record, per route rule (not per
+raw path, so label cardinality stays bounded):
+
+    http_requests_total              counter   route, method, status
+    http_request_errors_total        counter   route, method (5xx and unhandled exceptions)
+    http_requests_in_flight          gauge     route
+    http_request_duration_seconds    histogram route
+
+Other modules add their own series through the module-level `registry`
+(`registry.timer(...)`, `registry.set(...)`) or by registering a collector
+that is called when /metrics is scraped. Values are per process; with
+several workers each one reports its own.
+"""
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+
+from flask import Response, g, request
+
+# Upper bounds, in seconds, of the latency histogram buckets.
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+
+def _labels(labels):
+    return tuple(sorted(labels.items()))
+
+
+def _format_labels(labels, extra=()):
+    pairs = list(labels) + list(extra)
+    if not pairs:
+        return ''
+    body = ','.join('{}="{}"'.format(k, str(v).replace('\\', r'\\').replace('"', r'\"')
+                                    .replace('\n', r'\n'))
+                    for k, v in pairs)
+    return '{' + body + '}'
+
+
+def _format_value(value):
+    if isinstance(value, bool):
+        return str(int(value))
+    if value == float('inf'):
+        return '+Inf'
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Histogram:
+    """Cumulative-bucket histogram; not locked, the registry serialises access."""
+
+    __slots__ = ('buckets', 'counts', 'sum')
+
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+
+    def observe(self, value):
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+
+
+class Registry:
+    """Thread-safe store of counters, gauges and histograms."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._help = {}
+        self._types = {}
+        self._series = {}
+        self._collectors = []
+
+    def describe(self, name, kind, help_text):
+        self._types[name] = kind
+        self._help[name] = help_text
+        self._series.setdefault(name, {})
+
+    def inc(self, name, amount=1, **labels):
+        key = _labels(labels)
+        with self._lock:
+            series = self._series[name]
+            series[key] = series.get(key, 0) + amount
+
+    def set(self, name, value, **labels):
+        with self._lock:
+            self._series[name][_labels(labels)] = value
+
+    def observe(self, name, value, **labels):
+        key = _labels(labels)
+        with self._lock:
+            series = self._series[name]
+            hist = series.get(key)
+            if hist is None:
+                hist = series[key] = Histogram(LATENCY_BUCKETS)
+            hist.observe(value)
+
+    @contextmanager
+    def timer(self, name, **labels):
+        """Observe the wall time of the with-block into histogram `name`."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - start, **labels)
+
+    def add_collector(self, collect):
+        """Register `collect()`, called per scrape, yielding
+        (name, type, help, [(labels dict, value), ...]) families."""
+        self._collectors.append(collect)
+
+    def render(self):
+        lines = []
+
+        def family(name, kind, help_text, samples):
+            lines.append(f'# HELP {name} {help_text}')
+            lines.append(f'# TYPE {name} {kind}')
+            for labels, value in samples:
+                if kind == 'histogram':
+                    cumulative = 0
+                    for bound, count in zip(value.buckets + (float('inf'),), value.counts):
+                        cumulative += count
+                        lines.append(f'{name}_bucket{_format_labels(labels, [("le", _format_value(bound))])} '
+                                     f'{cumulative}')
+                    lines.append(f'{name}_sum{_format_labels(labels)} {_format_value(value.sum)}')
+                    lines.append(f'{name}_count{_format_labels(labels)} {cumulative}')
+                else:
+                    lines.append(f'{name}{_format_labels(labels)} {_format_value(value)}')
+
+        with self._lock:
+            for name, series in self._series.items():
+                samples = [(labels, value) for labels, value in sorted(series.items())]
+                if self._types[name] == 'histogram':
+                    # copy so rendering happens on a consistent snapshot
+                    samples = [(labels, _snapshot(h)) for labels, h in samples]
+                family(name, self._types[name], self._help[name], samples)
+        for collect in self._collectors:
+            for name, kind, help_text, samples in collect():
+                family(name, kind, help_text,
+                       [(_labels(labels), value) for labels, value in samples])
+        return '\n'.join(lines) + '\n'
+
+
+def _snapshot(hist):
+    copy = Histogram(hist.buckets)
+    copy.counts = list(hist.counts)
+    copy.sum = hist.sum
+    return copy
+
+
+registry = Registry()
+registry.describe('http_requests_total', 'counter', 'HTTP requests by route, method and status.')
+registry.describe('http_request_errors_total', 'counter', 'HTTP requests that ended in a 5xx or an exception.')
+registry.describe('http_requests_in_flight', 'gauge', 'HTTP requests currently being handled.')
+registry.describe('http_request_duration_seconds', 'histogram', 'Time spent handling HTTP requests.')
+
+
+def _route():
+    rule = request.url_rule
+    return rule.rule if rule is not None else '<unmatched>'
+
+
+def _before_request():
+    g.metrics_start = time.perf_counter()
+    g.metrics_route = _route()
+    registry.inc('http_requests_in_flight', route=g.metrics_route)
+
+
+def _after_request(resp):
+    start = g.pop('metrics_start', None)
+    if start is not None:
+        route = g.metrics_route
+        registry.observe('http_request_duration_seconds', time.perf_counter() - start, route=route)
+        registry.inc('http_requests_total', route=route, method=request.method,
+                     status=str(resp.status_code))
+        if resp.status_code >= 500:
+            registry.inc('http_request_errors_total', route=route, method=request.method)
+    return resp
+
+
+def _teardown_request(exc):
+    route = g.pop('metrics_route', None)
+    if route is None:
+        return
+    registry.inc('http_requests_in_flight', -1, route=route)
+    start = g.pop('metrics_start', None)
+    if start is not None:
+        # after_request never ran: the view raised
+        registry.observe('http_request_duration_seconds', time.perf_counter() - start, route=route)
+        registry.inc('http_requests_total', route=route, method=request.method, status='500')
+        registry.inc('http_request_errors_total', route=route, method=request.method)
+
+
+def metrics_view():
+    return Response(registry.render(), content_type=CONTENT_TYPE)
+
+
+def init_app(app):
+    """Install the request hooks and the /metrics endpoint on `app`."""
+    app.before_request(_before_request)
+    app.after_request(_after_request)
+    app.teardown_request(_teardown_request)
+    app.add_url_rule('/metrics', 'metrics', metrics_view)
@@ -0,0 +1,117 @@
+"""Hot reloading of the recommender model.
+
+A `ModelReloader` holds the current `Model` (see model_store.py). A
+background thread polls the artifact's stamp every MODEL_WATCH_INTERVAL
+seconds, or wakes up when `request_reload()` is called, and then loads
+and validates the new artifact off the request path. If it is good, one
+assignment swaps it in. Requests read `reloader.current` once and keep
+that object, so requests already in flight finish on the old version.
+A broken artifact is logged and counted, and the old model keeps serving.
+
+Updating the artifact safely:
+
+* model.pkl: write the new pickle next to it, then os.replace it over the
+  old one. A poll then never picks up a half-written file.
+* model directory: memory-mapped arrays must never be rewritten in place.
+  A model still serving would change under requests in flight, and a
+  worker reading a truncated file dies with SIGBUS. The safe route is to
+  convert into a new directory (``python model_store.py model.pkl
+  model-v2/``) and point MODEL_PATH's symlink at it with an atomic rename
+  (``ln -s model-v2 tmp && mv -T tmp model``). Delete the old directory
+  only once every worker reports the new version. Re-converting into the
+  live directory is also safe for running workers: save_model_dir
+  renames fresh files over the old ones. But a process that starts
+  mid-conversion may load a mix of old and new arrays.
+
+A failed stamp is not retried until the artifact changes again.
+
+Threads do not survive fork, so `start()` must be called in every process
+that serves requests. Each pre-forked worker then watches, and reloads,
+on its own. A reloaded model is private to the worker that loaded it.
+Only models loaded in the master before fork are shared.
+"""
+import os
+import threading
+
+import metrics
+from model_store import artifact_stamp, load_model
+
+# Seconds between checks of the model file for a new version; 0 disables
+# polling, leaving only explicit reload requests.
+MODEL_WATCH_INTERVAL = float(os.environ.get('MODEL_WATCH_INTERVAL', 30))
+
+metrics.registry.describe('model_reloads_total', 'counter',
+                          'Model reload attempts, by result (swapped, unchanged, failed).')
+
+
+class ModelReloader:
+    """The current model, swapped for newer versions from a background thread."""
+
+    def __init__(self, path, interval=MODEL_WATCH_INTERVAL, on_swap=None):
+        self.path = path
+        self.interval = interval
+        self.on_swap = on_swap
+        self.current = None
+        self._failed_stamp = None
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._pid = None
+
+    def reload(self):
+        """Load the artifact and swap it in if it is a new version.
+
+        Returns 'swapped', 'unchanged' or 'failed'. Loads are serialised, and
+        a caller blocks for the duration of its own load.
+        """
+        with self._lock:
+            old = self.current
+            try:
+                new = load_model(self.path)
+            except Exception as e:
+                print(f"Warning: failed to load {self.path}: {e}")
+                self._failed_stamp = artifact_stamp(self.path)
+                result = 'failed'
+            else:
+                self._failed_stamp = None
+                if old is not None and new.version == old.version:
+                    # same content (e.g. the file was touched): keep the
+                    # loaded object and only remember the new stamp
+                    self.current = old._replace(stamp=new.stamp)
+                    result = 'unchanged'
+                else:
+                    self.current = new
+                    result = 'swapped'
+                    if self.on_swap is not None:
+                        self.on_swap(old, new)
+        metrics.registry.inc('model_reloads_total', result=result)
+        return result
+
+    def changed(self):
+        """Whether the artifact on disk differs from the loaded one."""
+        stamp = artifact_stamp(self.path)
+        current = self.current
+        return (stamp is not None and stamp != self._failed_stamp
+                and (current is None or stamp != current.stamp))
+
+    def start(self):
+        """Start this process's watcher thread, once."""
+        if self._pid == os.getpid():
+            return
+        # a lock or event inherited from the parent may be in any state
+        self._pid = os.getpid()
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        threading.Thread(target=self._watch, name='model-reload', daemon=True).start()
+
+    def request_reload(self):
+        """Ask the watcher thread to reload now, without waiting for it."""
+        self.start()
+        self._wake.set()
+
+    def _watch(self):
+        wake = self._wake
+        while True:
+            requested = wake.wait(self.interval if self.interval > 0 else None)
+            wake.clear()
+            if requested or self.changed():
+                self.reload()
@@ -0,0 +1,235 @@
+"""Loading and saving of recommender model artifacts.
+
+Two on-disk formats are supported:
+
+* ``model.pkl`` -- the pickled artifacts dict written by ``demo.ipynb``.
+* a model directory -- one ``.npy`` file per array plus ``meta.json``. Arrays
+  are opened with ``np.load(mmap_mode='r')`` so pre-forked workers share the
+  pages through the OS page cache instead of each unpickling a private copy.
+
+Convert an existing pickle with::
+
+    python model_store.py model.pkl model/
+"""
+import argparse
+import hashlib
+import json
+import os
+import pickle
+import time
+from collections import namedtuple
+
+import numpy as np
+from scipy import sparse
+
+from city_index import CityIndex
+from recommender import Recommender, l2_normalize
+
+FORMAT_VERSION = 1
+META_FILE = 'meta.json'
+
+# Everything the request path needs from one model version. Built complete
+# by load_model() and never mutated, so swapping it is one assignment.
+Model = namedtuple('Model', 'version path stamp city_to_idx rows dur_col time_col '
+                            'city_index recommender size_bytes load_seconds')
+
+
+def load_artifacts(path):
+    """Load artifacts from a pickle file or a model directory.
+
+    The returned dict carries a `model_version` content hash, used to key
+    response caches and ETags.
+    """
+    if os.path.isdir(path):
+        return load_model_dir(path)
+    with open(path, 'rb') as f:
+        data = f.read()
+    artifacts = pickle.loads(data)
+    artifacts['model_version'] = hashlib.sha256(data).hexdigest()[:16]
+    return artifacts
+
+
+def artifact_size(path):
+    """Bytes on disk of a model pickle or model directory."""
+    if not os.path.isdir(path):
+        return os.path.getsize(path)
+    return sum(entry.stat().st_size for entry in os.scandir(path) if entry.is_file())
+
+
+def artifact_stamp(path):
+    """(mtime_ns, size) identifying the current model file or directory, or None.
+
+    A model directory is stamped by its meta.json, which is written last.
+    """
+    if os.path.isdir(path):
+        path = os.path.join(path, META_FILE)
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return st.st_mtime_ns, st.st_size
+
+
+def load_model(path):
+    """Load and validate the artifacts at `path` and build their indexes.
+
+    Raises OSError or ValueError (among others, for a corrupt pickle) when
+    the artifact is not usable; nothing is returned half built.
+    """
+    start = time.perf_counter()
+    stamp = artifact_stamp(path)
+    artifacts = load_artifacts(path)
+    recommender = Recommender.from_artifacts(artifacts)
+    city_to_idx = artifacts.get('city_to_idx')
+    if not city_to_idx:
+        raise ValueError('artifact has no city_to_idx mapping')
+    rows = result_rows(artifacts)
+    if len(rows) != recommender.size:
+        raise ValueError(f'{len(rows)} city rows for a {recommender.size}-city similarity model')
+    if not all(0 <= idx < recommender.size for idx in city_to_idx.values()):
+        raise ValueError('city_to_idx points outside the similarity model')
+    # exercise the scoring path once before the model can be swapped in
+    recommender.top_neighbors(0, 5)
+    return Model(
+        version=artifacts.get('model_version'),
+        path=path,
+        stamp=stamp,
+        city_to_idx=city_to_idx,
+        rows=rows,
+        dur_col=artifacts['dur_col'],
+        time_col=artifacts['time_col'],
+        city_index=CityIndex(city_to_idx),
+        recommender=recommender,
+        size_bytes=artifact_size(path),
+        load_seconds=time.perf_counter() - start,
+    )
+
+
+def load_model_dir(path):
+    """Load a model directory written by `save_model_dir`, memory-mapping the arrays."""
+    with open(os.path.join(path, META_FILE), 'rb') as f:
+        raw = f.read()
+    meta = json.loads(raw)
+    if meta.get('format_version') != FORMAT_VERSION:
+        raise ValueError(f"unsupported model format version: {meta.get('format_version')}")
+
+    def array(name):
+        return np.load(os.path.join(path, name + '.npy'), mmap_mode='r')
+
+    arrays = set(meta['arrays'])
+    tfidf = None
+    if 'tfidf_data' in arrays:
+        tfidf = sparse.csr_matrix(
+            (array('tfidf_data'), array('tfidf_indices'), array('tfidf_indptr')),
+            shape=tuple(meta['tfidf_shape']), copy=False)
+
+    return {
+        'tfidf': tfidf,
+        'sim_matrix': array('sim_matrix') if 'sim_matrix' in arrays else None,
+        'neighbor_idx': array('neighbor_idx') if 'neighbor_idx' in arrays else None,
+        'neighbor_scores': array('neighbor_scores') if 'neighbor_scores' in arrays else None,
+        'tfidf_normalized': meta.get('tfidf_normalized', False),
+        # plain column lists; no pandas needed to serve a model directory
+        'city_df': None,
+        'city_columns': meta['columns'],
+        'city_col': meta['city_col'],
+        'dur_col': meta['dur_col'],
+        'time_col': meta['time_col'],
+        'city_to_idx': meta['city_to_idx'],
+        'model_version': meta.get('version') or hashlib.sha256(raw).hexdigest()[:16],
+    }
+
+
+def city_columns(artifacts):
+    """Return the city table as a dict of column name -> list of values."""
+    columns = artifacts.get('city_columns')
+    if columns is None:
+        city_df = artifacts['city_df']
+        columns = {col: city_df[col].tolist() for col in city_df.columns}
+    return columns
+
+
+def result_rows(artifacts):
+    """Pre-stringified (city, duration, best time) tuples indexed by row.
+
+    Built once at load time so responses are assembled without pandas
+    lookups on the request path.
+    """
+    columns = city_columns(artifacts)
+    cols = (artifacts['city_col'], artifacts['dur_col'], artifacts['time_col'])
+    return tuple(zip(*([str(v) for v in columns[col]] for col in cols)))
+
+
+def save_model_dir(artifacts, path, include_sim_matrix=True, neighbor_index=None):
+    """Write artifacts as a model directory of .npy arrays plus meta.json.
+
+    `neighbor_index` is an optional precomputed (neighbor_idx, neighbor_scores)
+    pair, stored so workers can skip rebuilding it at startup.
+    """
+    os.makedirs(path, exist_ok=True)
+    arrays = {}
+    tfidf = artifacts.get('tfidf')
+    if tfidf is not None:
+        # stored L2-normalised so sparse-mode workers can map it without copying
+        tfidf = l2_normalize(tfidf)
+        arrays['tfidf_data'] = tfidf.data
+        arrays['tfidf_indices'] = tfidf.indices
+        arrays['tfidf_indptr'] = tfidf.indptr
+    sim_matrix = artifacts.get('sim_matrix')
+    if include_sim_matrix and sim_matrix is not None:
+        arrays['sim_matrix'] = np.ascontiguousarray(sim_matrix)
+    if neighbor_index is not None:
+        arrays['neighbor_idx'], arrays['neighbor_scores'] = neighbor_index
+
+    digest = hashlib.sha256()
+    for name in sorted(arrays):
+        filename = os.path.join(path, name + '.npy')
+        # never write into an existing file: running workers may have it
+        # memory-mapped, and would see (or crash on) the new bytes. A fresh
+        # file renamed over it is a new inode; old mappings keep the old one.
+        tmp = filename + '.tmp'
+        with open(tmp, 'wb') as f:
+            np.save(f, np.asarray(arrays[name]))
+        with open(tmp, 'rb') as f:
+            for chunk in iter(lambda: f.read(1 << 20), b''):
+                digest.update(chunk)
+        os.replace(tmp, filename)
+
+    meta = {
+        'format_version': FORMAT_VERSION,
+        'arrays': sorted(arrays),
+        'tfidf_shape': list(tfidf.shape) if tfidf is not None else None,
+        'tfidf_normalized': tfidf is not None,
+        'city_col': artifacts['city_col'],
+        'dur_col': artifacts['dur_col'],
+        'time_col': artifacts['time_col'],
+        'columns': city_columns(artifacts),
+        'city_to_idx': {str(k): int(v) for k, v in artifacts['city_to_idx'].items()},
+    }
+    digest.update(json.dumps(meta, sort_keys=True, default=str).encode('utf-8'))
+    meta['version'] = digest.hexdigest()[:16]
+    # meta.json is written last and atomically: its presence marks the
+    # directory as complete.
+    tmp = os.path.join(path, META_FILE + '.tmp')
+    with open(tmp, 'w', encoding='utf-8') as f:
+        json.dump(meta, f, ensure_ascii=False, default=str)
+    os.replace(tmp, os.path.join(path, META_FILE))
+
+
+def convert(src, dest, include_sim_matrix=True):
+    """Convert a pickled model.pkl into a memory-mappable model directory."""
+    artifacts = load_artifacts(src)
+    recommender = Recommender.from_artifacts(artifacts)
+    save_model_dir(artifacts, dest, include_sim_matrix=include_sim_matrix,
+                   neighbor_index=recommender.neighbor_index())
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Convert model.pkl into a memory-mapped model directory.')
+    parser.add_argument('src', help='path to the pickled artifacts (model.pkl)')
+    parser.add_argument('dest', help='output directory')
+    parser.add_argument('--no-sim-matrix', action='store_true',
+                        help='omit the dense similarity matrix (serve with SIMILARITY_MODE=sparse)')
+    args = parser.parse_args()
+    convert(args.src, args.dest, include_sim_matrix=not args.no_sim_matrix)
+    print(f"Wrote model directory {args.dest}")
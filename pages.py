@@ -0,0 +1,54 @@
+"""City pages rendered from the data table in cities.py.
+
+Every /<city> page comes from templates/city.html. The rendered bytes, with
+fingerprinted asset URLs and responsive image markup already applied, are
+kept in memory along with a gzip copy, keyed by city and asset manifest
+version, so a warm request does no template rendering or filesystem I/O.
+"""
+import gzip
+import hashlib
+from collections import namedtuple
+
+from flask import Response, abort, current_app, render_template, request
+
+import assets
+from build_static import asset_url, rewrite_refs
+from cities import CITIES
+from responsive import responsive_images
+
+RenderedPage = namedtuple('RenderedPage', 'body gzipped etag')
+
+# (city slug, manifest version) -> RenderedPage
+rendered_pages = {}
+
+
+def render_city(slug):
+    built = assets.manifest['assets']
+    html = render_template('city.html', slug=slug, city=CITIES[slug])
+    html = responsive_images(html, lambda path: asset_url(path, built))
+    body = rewrite_refs(html, built).encode('utf-8')
+    gzipped = gzip.compress(body, 9, mtime=0)
+    return RenderedPage(body, gzipped if len(gzipped) < len(body) else None,
+                        hashlib.sha1(body).hexdigest()[:20])
+
+
+def send_city_page(slug):
+    if slug not in CITIES:
+        abort(404)
+    key = (slug, assets.manifest['version'])
+    page = rendered_pages.get(key)
+    if page is None:
+        page = render_city(slug)
+        if not current_app.debug:
+            rendered_pages[key] = page
+
+    if page.gzipped is not None and request.accept_encodings['gzip']:
+        resp = Response(page.gzipped, mimetype='text/html')
+        resp.headers['Content-Encoding'] = 'gzip'
+        resp.set_etag(page.etag + '-gz')
+    else:
+        resp = Response(page.body, mimetype='text/html')
+        resp.set_etag(page.etag)
+    resp.vary.add('Accept-Encoding')
+    resp.headers['Cache-Control'] = assets.REVALIDATE
+    return resp.make_conditional(request)
@@ -0,0 +1,76 @@
+"""Password hashing for the auth API.
+
+Hashes use a werkzeug KDF (scrypt by default) and run on a small bounded
+thread pool: the KDFs release the GIL, so at most PASSWORD_HASH_WORKERS
+cores are spent on hashing. The request thread waits for its job, so at
+most PASSWORD_HASH_QUEUE requests may be hashing or queued at once, one
+less than the worker's GUNICORN_THREADS by default. Others get
+`HasherBusy` straight away (a 503), so logins can never occupy every
+request thread and starve the other routes.
+
+Entries written by the old unsalted SHA-256 scheme are still accepted and
+are upgraded to the current method on the next successful login.
+"""
+import hashlib
+import hmac
+import os
+import re
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from werkzeug.security import check_password_hash, generate_password_hash
+
+# werkzeug method string, e.g. 'scrypt:32768:8:1' or 'pbkdf2:sha256:600000'.
+PASSWORD_HASH_METHOD = os.environ.get('PASSWORD_HASH_METHOD', 'scrypt:32768:8:1')
+PASSWORD_HASH_WORKERS = int(os.environ.get('PASSWORD_HASH_WORKERS', min(4, os.cpu_count() or 1)))
+# Hashing jobs allowed to be running or queued at once; each holds a
+# request thread.
+PASSWORD_HASH_QUEUE = int(os.environ.get(
+    'PASSWORD_HASH_QUEUE', max(1, int(os.environ.get('GUNICORN_THREADS', 4)) - 1)))
+
+_LEGACY_HASH = re.compile(r'[0-9a-f]{64}')
+
+
+class HasherBusy(Exception):
+    """Raised when every hashing slot is taken."""
+
+
+def legacy_hash(password):
+    """The original unsalted SHA-256 scheme, kept only to verify old entries."""
+    return hashlib.sha256(password.encode('utf-8')).hexdigest()
+
+
+class PasswordHasher:
+    """Runs KDF hashing and verification on a bounded worker pool."""
+
+    def __init__(self, method=PASSWORD_HASH_METHOD, workers=PASSWORD_HASH_WORKERS,
+                 queue_size=PASSWORD_HASH_QUEUE):
+        self.method = method
+        self._slots = threading.BoundedSemaphore(queue_size)
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='pwhash')
+
+    def _run(self, fn, *args):
+        if not self._slots.acquire(blocking=False):
+            raise HasherBusy()
+        try:
+            future = self._executor.submit(fn, *args)
+        except BaseException:
+            self._slots.release()
+            raise
+        future.add_done_callback(lambda _: self._slots.release())
+        return future.result()
+
+    def hash(self, password):
+        return self._run(generate_password_hash, password, self.method)
+
+    def verify(self, stored, password):
+        """Check `password` against `stored`.
+
+        Returns (ok, needs_rehash); needs_rehash is set when the password is
+        correct but `stored` uses a legacy scheme or different cost settings.
+        """
+        if _LEGACY_HASH.fullmatch(stored):
+            ok = hmac.compare_digest(stored, legacy_hash(password))
+            return ok, ok
+        ok = self._run(check_password_hash, stored, password)
+        return ok, ok and not stored.startswith(self.method + '$')
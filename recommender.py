@@ -0,0 +1,210 @@
+import os
+
+import numpy as np
+from scipy import sparse
+
+# Number of neighbours kept per city in the precomputed index. Queries with
+# topn <= NEIGHBOR_K are answered by slicing the index; larger ones fall back
+# to a partial sort of the full similarity row. Sparse mode only uses an
+# index shipped with the artifact (see model_store.convert): building one
+# scores all N x N pairs, far too slow to repeat on every model load.
+NEIGHBOR_K = int(os.environ.get('NEIGHBOR_K', 50))
+
+# 'dense' scores rows of the pickled sim_matrix, 'sparse' computes them on
+# demand from the L2-normalised tfidf matrix, 'auto' prefers dense when the
+# artifact ships a sim_matrix.
+SIMILARITY_MODE = os.environ.get('SIMILARITY_MODE', 'auto')
+
+# Upper bound on the number of score cells materialised at once when scoring
+# many rows (index build, batch queries), to bound temporary memory.
+BLOCK_CELLS = 1 << 22
+
+
+def _rank(cols, scores):
+    """Sort each row of (cols, scores) by descending score, ties by column."""
+    order = np.lexsort((cols, -scores), axis=-1)
+    return (np.take_along_axis(cols, order, axis=-1),
+            np.take_along_axis(scores, order, axis=-1))
+
+
+def select_top(block, count):
+    """Top-`count` columns of every row of `block`, ranked by descending score.
+
+    Uses a partition instead of a full sort; ties at the cut-off go to the
+    lowest column so results match a stable descending sort of the row.
+    """
+    n = block.shape[1]
+    if count >= n:
+        cols = np.broadcast_to(np.arange(n), block.shape).copy()
+        return _rank(cols, block)
+    thr = np.partition(block, n - count, axis=1)[:, n - count, None]
+    above = block > thr
+    ties = block == thr
+    room = count - above.sum(axis=1, keepdims=True)
+    chosen = above | (ties & (np.cumsum(ties, axis=1) <= room))
+    cols = np.nonzero(chosen)[1].reshape(block.shape[0], count)
+    return _rank(cols, np.take_along_axis(block, cols, axis=1))
+
+
+def build_neighbor_index(score_blocks, n, k=NEIGHBOR_K):
+    """Precompute the top-k neighbours of every row.
+
+    `score_blocks(rows)` must yield (rows, block) pairs covering the given
+    row indices, each block holding the dense similarity scores of its rows.
+    The index keeps k + 1 columns so the query city itself can be dropped and
+    still leave k results.
+    """
+    width = min(k + 1, n)
+    neighbor_idx = np.empty((n, width), dtype=np.int32)
+    neighbor_scores = np.empty((n, width), dtype=np.float64)
+    for rows, block in score_blocks(np.arange(n)):
+        cols, scores = select_top(block, width)
+        neighbor_idx[rows] = cols
+        neighbor_scores[rows] = scores
+    return neighbor_idx, neighbor_scores
+
+
+def top_from_row(row, idx, topn):
+    """Partial-sort fallback: top-n columns of a single score row, minus idx."""
+    row = np.array(row, dtype=np.float64)
+    row[idx] = -np.inf
+    count = min(topn, row.shape[0] - 1)
+    if count <= 0:
+        return np.empty(0, dtype=np.int64), np.empty(0)
+    cols, scores = select_top(row[None, :], count)
+    return cols[0], scores[0]
+
+
+def l2_normalize(matrix):
+    """Return a CSR copy of `matrix` with every non-empty row scaled to unit length."""
+    matrix = sparse.csr_matrix(matrix, dtype=np.float64, copy=True)
+    norms = np.sqrt(np.asarray(matrix.multiply(matrix).sum(axis=1)).ravel())
+    norms[norms == 0] = 1.0
+    matrix.data /= np.repeat(norms, np.diff(matrix.indptr))
+    return matrix
+
+
+class Recommender:
+    """Cosine-similarity recommender.
+
+    In dense mode rows are read from the precomputed N x N `sim_matrix`; in
+    sparse mode only the tfidf matrix is kept and each row of cosine scores is
+    computed on demand as a sparse product, so memory grows with the number
+    of non-zeros instead of N squared. Without a shipped neighbour index,
+    sparse mode also ranks on demand (`neighbor_idx` is None).
+    """
+
+    def __init__(self, sim_matrix=None, tfidf=None, k=NEIGHBOR_K, neighbor_index=None,
+                 normalized=False):
+        if sim_matrix is not None:
+            self.mode = 'dense'
+            self.sim_matrix = sim_matrix
+            self.tfidf = None
+            self.size = sim_matrix.shape[0]
+        elif tfidf is not None:
+            self.mode = 'sparse'
+            self.sim_matrix = None
+            # model directories store tfidf pre-normalised so the mapped
+            # arrays can be used as-is instead of copied per worker
+            self.tfidf = sparse.csr_matrix(tfidf) if normalized else l2_normalize(tfidf)
+            self.tfidf_t = self.tfidf.T.tocsr()
+            self.size = self.tfidf.shape[0]
+        else:
+            raise ValueError('either sim_matrix or tfidf is required')
+        self.k = k
+        width = min(k + 1, self.size)
+        if neighbor_index is not None and neighbor_index[0].shape[1] >= width:
+            # precomputed by the model directory converter; keep it mapped
+            self.neighbor_idx = neighbor_index[0][:, :width]
+            self.neighbor_scores = neighbor_index[1][:, :width]
+        elif self.mode == 'dense':
+            self.neighbor_idx, self.neighbor_scores = build_neighbor_index(
+                self.score_blocks, self.size, k)
+        else:
+            self.neighbor_idx = self.neighbor_scores = None
+
+    @classmethod
+    def from_artifacts(cls, artifacts, mode=SIMILARITY_MODE, k=NEIGHBOR_K):
+        """Build a recommender from a loaded artifacts dict in the given mode."""
+        sim_matrix = artifacts.get('sim_matrix')
+        tfidf = artifacts.get('tfidf')
+        neighbor_index = None
+        if artifacts.get('neighbor_idx') is not None:
+            neighbor_index = (artifacts['neighbor_idx'], artifacts['neighbor_scores'])
+        if mode == 'sparse' or (mode == 'auto' and sim_matrix is None):
+            if tfidf is None:
+                raise ValueError('sparse similarity mode needs tfidf in the artifact')
+            return cls(tfidf=tfidf, k=k, neighbor_index=neighbor_index,
+                       normalized=artifacts.get('tfidf_normalized', False))
+        if mode not in ('dense', 'auto'):
+            raise ValueError(f"unknown similarity mode '{mode}'")
+        if sim_matrix is None:
+            raise ValueError('dense similarity mode needs sim_matrix in the artifact')
+        return cls(sim_matrix=sim_matrix, k=k, neighbor_index=neighbor_index)
+
+    def neighbor_index(self):
+        """(neighbor_idx, neighbor_scores), building the index if there is none."""
+        if self.neighbor_idx is None:
+            return build_neighbor_index(self.score_blocks, self.size, self.k)
+        return self.neighbor_idx, self.neighbor_scores
+
+    def _indexed(self, topn):
+        """Whether the neighbour index can answer a topn query."""
+        if self.neighbor_idx is None:
+            return False
+        width = self.neighbor_idx.shape[1]
+        return topn < width or width == self.size
+
+    def score_rows(self, rows):
+        """Dense similarity scores for the given row indices."""
+        if self.mode == 'dense':
+            return np.asarray(self.sim_matrix[rows], dtype=np.float64)
+        return (self.tfidf[rows] @ self.tfidf_t).toarray()
+
+    def score_blocks(self, rows):
+        """Yield (rows, scores) blocks covering `rows`, at most BLOCK_CELLS each."""
+        rows = np.asarray(rows)
+        step = max(1, BLOCK_CELLS // max(self.size, 1))
+        for start in range(0, len(rows), step):
+            chunk = rows[start:start + step]
+            yield chunk, self.score_rows(chunk)
+
+    def top_neighbors(self, idx, topn):
+        """Return (indices, scores) of the topn cities most similar to idx."""
+        if topn <= 0:
+            return np.empty(0, dtype=np.int64), np.empty(0)
+        if self._indexed(topn):
+            cols = self.neighbor_idx[idx]
+            keep = cols != idx
+            return cols[keep][:topn], self.neighbor_scores[idx][keep][:topn]
+        return top_from_row(self.score_rows([idx])[0], idx, topn)
+
+    def top_neighbors_batch(self, idxs, topn):
+        """Vectorised `top_neighbors` for many query rows at once.
+
+        Returns (indices, scores) arrays of shape (len(idxs), count), where
+        count = min(topn, N - 1) is the same for every row.
+        """
+        idxs = np.asarray(idxs, dtype=np.int64)
+        count = max(0, min(topn, self.size - 1))
+        if count == 0 or len(idxs) == 0:
+            return (np.empty((len(idxs), 0), dtype=np.int64),
+                    np.empty((len(idxs), 0)))
+        if self._indexed(topn):
+            # every gathered row keeps at least `count` entries besides the
+            # query city itself; take the first `count` of them
+            cols = np.asarray(self.neighbor_idx[idxs])
+            scores = np.asarray(self.neighbor_scores[idxs])
+            keep = cols != idxs[:, None]
+            keep &= np.cumsum(keep, axis=1) <= count
+            return (cols[keep].reshape(len(idxs), count),
+                    scores[keep].reshape(len(idxs), count))
+        cols = np.empty((len(idxs), count), dtype=np.int64)
+        scores = np.empty((len(idxs), count))
+        start = 0
+        for rows, block in self.score_blocks(idxs):
+            block[np.arange(len(rows)), rows] = -np.inf
+            end = start + len(rows)
+            cols[start:end], scores[start:end] = select_top(block, count)
+            start = end
+        return cols, scores
@@ -0,0 +1,66 @@
+"""Responsive <img> markup from the derivative manifest (see build_images.py).
+
+`responsive_images` turns every <img> whose source has derivatives into a
+<picture> with AVIF/WebP <source> sets and a JPEG srcset fallback, and adds
+sizes, intrinsic dimensions and lazy-loading attributes.
+"""
+import json
+import os
+import re
+
+DERIVED_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'static', 'derived')
+IMAGE_MANIFEST = os.path.join(DERIVED_DIR, 'manifest.json')
+
+# Card images take a third of the row on wide screens, the full width otherwise.
+DEFAULT_SIZES = '(min-width: 768px) 33vw, 100vw'
+SOURCE_TYPES = (('avif', 'image/avif'), ('webp', 'image/webp'))
+
+IMG_TAG = re.compile(r'<img\b([^>]*?)\s*/?>', re.IGNORECASE)
+SRC_ATTR = re.compile(r'''\ssrc=["']/?static/([^"']+)["']''')
+
+
+def load_image_manifest(path=IMAGE_MANIFEST):
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)['images']
+    except (OSError, ValueError, KeyError):
+        return {}
+
+
+image_manifest = load_image_manifest()
+
+
+def static_url(relpath):
+    return '/static/' + relpath
+
+
+def responsive_images(html, url_for=static_url, sizes=DEFAULT_SIZES, images=None):
+    """Rewrite <img> tags that have derivatives into responsive <picture> markup.
+
+    `url_for` maps a path relative to static/ to the URL emitted in srcset.
+    """
+    images = image_manifest if images is None else images
+    if not images:
+        return html
+
+    def replace(match):
+        attrs = match.group(1)
+        src = SRC_ATTR.search(attrs)
+        entry = images.get(src.group(1)) if src else None
+        if entry is None or 'srcset=' in attrs:
+            return match.group(0)
+
+        def srcset(fmt):
+            return ', '.join(f"{url_for(path)} {w}w" for w, path in entry['variants'][fmt])
+
+        sources = ''.join(
+            f'<source type="{mime}" srcset="{srcset(fmt)}" sizes="{sizes}">'
+            for fmt, mime in SOURCE_TYPES if fmt in entry['variants'])
+        extra = f' srcset="{srcset("jpeg")}" sizes="{sizes}"'
+        if 'width=' not in attrs and 'height=' not in attrs:
+            extra += f' width="{entry["width"]}" height="{entry["height"]}"'
+        if 'loading=' not in attrs:
+            extra += ' loading="lazy" decoding="async"'
+        return f'<picture>{sources}<img{attrs}{extra}></picture>'
+
+    return IMG_TAG.sub(replace, html)
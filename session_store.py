@@ -0,0 +1,241 @@
+"""Server-side Flask sessions: the cookie carries only an opaque session ID.
+
+Session data lives in the ``session`` table of the site database (see
+user_store.py), serialised with Flask's tagged JSON. A per-process
+read-through cache answers most lookups without touching SQLite: a cached
+entry, or a cached miss for an unknown ID, is trusted for
+SESSION_CACHE_TTL seconds. Sessions that carry a login (VERIFIED_KEYS)
+are always read from the database, so a logout or ID change on one worker
+takes effect on every worker at once.
+
+A cached copy may still be stale, so writes are compare-and-swap on the
+data that was read. If another worker changed the row in between, this
+request's own changes are applied to the current row instead of
+overwriting it; if the row is gone, the write is dropped.
+
+Requests that leave the session unchanged write nothing. The expiry slides
+forward only once half of PERMANENT_SESSION_LIFETIME has passed. Cookies
+naming an unknown or expired session get a fresh random ID, so a
+client-chosen ID is never adopted. Call `session.regenerate()` whenever
+the session's privileges change (login, logout). It moves the data to a
+new ID and drops the old one, so an ID learned beforehand gains nothing.
+"""
+import os
+import secrets
+import time
+
+from flask.json.tag import TaggedJSONSerializer
+from flask.sessions import SecureCookieSession, SessionInterface
+
+from response_cache import LRUCache
+from user_store import SQLiteStore
+
+SESSION_CACHE_SIZE = int(os.environ.get('SESSION_CACHE_SIZE', 4096))
+SESSION_CACHE_TTL = float(os.environ.get('SESSION_CACHE_TTL', 5))
+# Expired rows are deleted at most this often (seconds), on a session write.
+SESSION_PURGE_INTERVAL = 600
+# token_urlsafe(32) is 43 characters; anything longer is not ours.
+MAX_SID_LENGTH = 64
+# Keys of a logged-in session (Flask-Login's and the auth API's).
+VERIFIED_KEYS = frozenset({'_user_id', 'username'})
+# Attempts at applying a write to a row that keeps changing underneath.
+MAX_MERGE_ATTEMPTS = 5
+
+SCHEMA = (
+    'CREATE TABLE IF NOT EXISTS session ('
+    'id VARCHAR(64) NOT NULL, '
+    'data TEXT NOT NULL, '
+    'expires FLOAT NOT NULL, '
+    'PRIMARY KEY (id))',
+    'CREATE INDEX IF NOT EXISTS ix_session_expires ON session (expires)',
+)
+
+
+class SessionStore(SQLiteStore):
+    """Session ID -> (serialised data, expiry timestamp)."""
+
+    schema = SCHEMA
+
+    def load(self, sid, now):
+        """Return (data, expires) of an unexpired session, or None."""
+        with self.connection() as conn:
+            return conn.execute('SELECT data, expires FROM session WHERE id = ? AND expires > ?',
+                                (sid, now)).fetchone()
+
+    def save(self, sid, data, expires):
+        with self.connection() as conn:
+            conn.execute('INSERT OR REPLACE INTO session (id, data, expires) VALUES (?, ?, ?)',
+                         (sid, data, expires))
+
+    def update(self, sid, data, expires, expected):
+        """Replace the data of `sid` only if it still is `expected`; return whether it was."""
+        with self.connection() as conn:
+            return conn.execute('UPDATE session SET data = ?, expires = ? WHERE id = ? AND data = ?',
+                                (data, expires, sid, expected)).rowcount == 1
+
+    def touch(self, sid, expires):
+        with self.connection() as conn:
+            conn.execute('UPDATE session SET expires = ? WHERE id = ?', (expires, sid))
+
+    def delete(self, sid):
+        with self.connection() as conn:
+            conn.execute('DELETE FROM session WHERE id = ?', (sid,))
+
+    def purge(self, now):
+        """Delete expired sessions; return how many were removed."""
+        with self.connection() as conn:
+            return conn.execute('DELETE FROM session WHERE expires <= ?', (now,)).rowcount
+
+
+class ServerSession(SecureCookieSession):
+    """Session dict plus its ID, and the stored expiry (None until first saved)."""
+
+    def __init__(self, initial=None, sid=None, expires=None, loaded=None):
+        super().__init__(initial)
+        self.sid = sid
+        self.expires = expires
+        self.new = expires is None
+        # serialised data as read, which a write expects to replace
+        self.loaded = loaded
+        # previous ID, deleted on save after regenerate()
+        self.replaced_sid = None
+
+    def regenerate(self):
+        """Give the session a fresh ID; the old one is deleted when it is saved."""
+        if not self.new:
+            self.replaced_sid = self.sid
+        self.sid = secrets.token_urlsafe(32)
+        self.expires = None
+        self.new = True
+        self.loaded = None
+        self.modified = True
+
+
+class ServerSessionInterface(SessionInterface):
+    serializer = TaggedJSONSerializer()
+    session_class = ServerSession
+
+    def __init__(self, store, cache_size=SESSION_CACHE_SIZE, cache_ttl=SESSION_CACHE_TTL):
+        self.store = store
+        # sid -> (time read, serialised data, expires), data None for an
+        # unknown ID; the text is cached rather than the dict so no request
+        # can mutate another's copy
+        self.cache = LRUCache(cache_size)
+        self.cache_ttl = cache_ttl
+        self._last_purge = 0.0
+
+    def _load(self, sid, now):
+        """(session dict, expires, serialised data) of a live session, or None."""
+        cached = self.cache.get(sid)
+        if cached is not None and now - cached[0] < self.cache_ttl:
+            _, data, expires = cached
+            if data is None or expires <= now:
+                return None
+            session = self.serializer.loads(data)
+            if VERIFIED_KEYS.isdisjoint(session):
+                return session, expires, data
+        row = self.store.load(sid, now)
+        if row is None:
+            self.cache.put(sid, (now, None, 0.0))
+            return None
+        data, expires = row
+        self.cache.put(sid, (now, data, expires))
+        return self.serializer.loads(data), expires, data
+
+    def _merge(self, session, expires, now):
+        """Apply this request's changes to the row another worker has since written.
+
+        Returns the data written, or None if the session no longer exists.
+        """
+        original = self.serializer.loads(session.loaded)
+        for _ in range(MAX_MERGE_ATTEMPTS):
+            row = self.store.load(session.sid, now)
+            if row is None:
+                return None
+            current = self.serializer.loads(row[0])
+            for key in original.keys() | session.keys():
+                if key not in session:
+                    current.pop(key, None)
+                elif key not in original or original[key] != session[key]:
+                    current[key] = session[key]
+            data = self.serializer.dumps(current)
+            if self.store.update(session.sid, data, expires, row[0]):
+                return data
+        # the row keeps changing; this request's copy wins
+        data = self.serializer.dumps(dict(session))
+        self.store.save(session.sid, data, expires)
+        return data
+
+    def open_session(self, app, request):
+        sid = request.cookies.get(self.get_cookie_name(app))
+        if sid and len(sid) <= MAX_SID_LENGTH:
+            found = self._load(sid, time.time())
+            if found is not None:
+                data, expires, loaded = found
+                return self.session_class(data, sid=sid, expires=expires, loaded=loaded)
+        return self.session_class(sid=secrets.token_urlsafe(32))
+
+    def save_session(self, app, session, response):
+        name = self.get_cookie_name(app)
+        domain = self.get_cookie_domain(app)
+        path = self.get_cookie_path(app)
+        secure = self.get_cookie_secure(app)
+        samesite = self.get_cookie_samesite(app)
+        httponly = self.get_cookie_httponly(app)
+
+        if session.accessed:
+            response.vary.add('Cookie')
+
+        if session.replaced_sid is not None:
+            self.store.delete(session.replaced_sid)
+            self.cache.pop(session.replaced_sid)
+            if not session:
+                response.delete_cookie(name, domain=domain, path=path, secure=secure,
+                                       samesite=samesite, httponly=httponly)
+                response.vary.add('Cookie')
+                return
+
+        if not session:
+            if session.modified and not session.new:
+                self.store.delete(session.sid)
+                self.cache.pop(session.sid)
+                response.delete_cookie(name, domain=domain, path=path, secure=secure,
+                                       samesite=samesite, httponly=httponly)
+                response.vary.add('Cookie')
+            return
+
+        now = time.time()
+        lifetime = app.permanent_session_lifetime.total_seconds()
+        stale = session.expires is not None and session.expires - now < lifetime / 2
+        if not (session.modified or stale):
+            return
+
+        expires = now + lifetime
+        if not session.modified:
+            # only the expiry slides
+            data = session.loaded
+            self.store.touch(session.sid, expires)
+        elif session.loaded is None:
+            data = self.serializer.dumps(dict(session))
+            self.store.save(session.sid, data, expires)
+        else:
+            data = self.serializer.dumps(dict(session))
+            if not self.store.update(session.sid, data, expires, session.loaded):
+                data = self._merge(session, expires, now)
+                if data is None:
+                    # ended by another request (logout, regenerate, expiry)
+                    self.cache.pop(session.sid)
+                    return
+        self.cache.put(session.sid, (now, data, expires))
+        if now - self._last_purge > SESSION_PURGE_INTERVAL:
+            self._last_purge = now
+            self.store.purge(now)
+
+        # the ID only changes through regenerate(), which marks the session
+        # new, so the cookie only needs (re)sending when it is new or
+        # carries an expiry that just moved
+        if session.new or session.permanent:
+            response.set_cookie(name, session.sid, expires=self.get_expiration_time(app, session),
+                                httponly=httponly, domain=domain, path=path, secure=secure,
+                                samesite=samesite)
+            response.vary.add('Cookie')
@@ -0,0 +1,29 @@
+import os
+import sys
+import tempfile
+import warnings
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+# user_store reads the database path at import time; keep the tests away
+# from instance/site.db
+os.environ.setdefault('USER_DB_PATH', os.path.join(tempfile.mkdtemp(prefix='site-tests-'), 'site.db'))
+os.environ.setdefault('MODEL_PATH', os.path.join(ROOT, 'model.pkl'))
+
+
+@pytest.fixture(scope='session')
+def app():
+    """The site app, built once: create_app() loads the model on first call."""
+    import app as site
+    with warnings.catch_warnings():
+        # model.pkl was pickled by an older scikit-learn
+        warnings.simplefilter('ignore')
+        return site.create_app()
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
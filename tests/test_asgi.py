@@ -0,0 +1,106 @@
+import asyncio
+import json
+
+import pytest
+
+import media
+from WebSecurity import SECURITY_HEADERS
+
+
+@pytest.fixture(scope='module')
+def asgi(app):
+    import asgi
+    return asgi
+
+
+def call(asgi, method, path, query=b'', headers=(), chunks=(b'',)):
+    """Run one request through asgi.application; return (status, headers dict, body)."""
+    scope = {
+        'type': 'http', 'http_version': '1.1', 'method': method, 'scheme': 'http',
+        'path': path, 'root_path': '', 'query_string': query,
+        'headers': [(k.lower().encode('latin-1'), v.encode('latin-1')) for k, v in headers],
+        'server': ('testserver', 80), 'client': ('127.0.0.1', 5000),
+    }
+    incoming = [{'type': 'http.request', 'body': chunk, 'more_body': i < len(chunks) - 1}
+                for i, chunk in enumerate(chunks)]
+    sent = []
+
+    async def receive():
+        if incoming:
+            return incoming.pop(0)
+        await asyncio.sleep(3600)
+
+    async def send(message):
+        sent.append(message)
+
+    asyncio.run(asgi.application(scope, receive, send))
+    start = sent[0]
+    assert start['type'] == 'http.response.start'
+    response_headers = {k.decode('latin-1'): v.decode('latin-1') for k, v in start['headers']}
+    body = b''.join(m.get('body', b'') for m in sent[1:] if m['type'] == 'http.response.body')
+    return start['status'], response_headers, body
+
+
+def test_bridge_reads_chunked_bodies(asgi):
+    payload = json.dumps({'message': 'goa'}).encode('utf-8')
+    status, headers, body = call(asgi, 'POST', '/chatbot',
+                                 headers=[('Content-Type', 'application/json'),
+                                          ('Transfer-Encoding', 'chunked')],
+                                 chunks=(payload[:5], payload[5:]))
+    assert status == 200
+    import app as site
+    assert json.loads(body) == {'reply': site.chatbot_intents.reply('goa')}
+
+
+def test_bridge_serves_flask_routes(asgi):
+    status, headers, body = call(asgi, 'GET', '/health')
+    assert status == 200
+    assert json.loads(body)['status'] == 'ok'
+    assert headers['x-content-type-options'] == SECURITY_HEADERS['X-Content-Type-Options']
+    assert call(asgi, 'GET', '/no/such/page')[0] == 404
+
+
+def test_native_recommend_matches_flask(asgi, client):
+    status, headers, body = call(asgi, 'GET', '/recommend', query=b'city=Goa&topn=3')
+    flask_resp = client.get('/recommend?city=Goa&topn=3')
+    assert status == 200
+    assert body == flask_resp.data
+    assert headers['etag'] == flask_resp.headers['ETag']
+    assert headers['cache-control'] == flask_resp.headers['Cache-Control']
+    for name, value in SECURITY_HEADERS.items():
+        assert headers[name.lower()] == value
+
+    status, headers, body = call(asgi, 'GET', '/recommend', query=b'city=Goa&topn=3',
+                                 headers=[('If-None-Match', headers['etag'])])
+    assert (status, body) == (304, b'')
+    status, _, body = call(asgi, 'GET', '/recommend', query=b'city=Nowhere-xyz')
+    assert status == 404 and 'error' in json.loads(body)
+
+
+def test_native_video_ranges(asgi, tmp_path, monkeypatch):
+    (tmp_path / 'clip.mp4').write_bytes(bytes(range(256)) * 4)
+    monkeypatch.setattr(media, 'videos', media.scan_videos(str(tmp_path)))
+    status, headers, body = call(asgi, 'GET', '/videos/clip.mp4', headers=[('Range', 'bytes=10-19')])
+    assert status == 206
+    assert body == bytes(range(10, 20))
+    assert headers['content-range'] == 'bytes 10-19/1024'
+    assert headers['content-security-policy'] == SECURITY_HEADERS['Content-Security-Policy']
+    status, _, body = call(asgi, 'GET', '/videos/clip.mp4')
+    assert (status, len(body)) == (200, 1024)
+    assert call(asgi, 'GET', '/videos/missing.mp4')[0] == 404
+
+
+def test_unknown_asset_is_404(asgi):
+    assert call(asgi, 'GET', '/assets/not-built.js')[0] == 404
+
+
+def test_wsgi_environ(asgi):
+    scope = {'method': 'POST', 'path': '/app/x', 'root_path': '/app', 'query_string': b'a=1',
+             'headers': [(b'content-type', b'text/plain'), (b'x-a', b'1'), (b'x-a', b'2')]}
+    environ = asgi.wsgi_environ(scope, None, 12)
+    assert environ['SCRIPT_NAME'] == '/app'
+    assert environ['PATH_INFO'] == '/x'
+    assert environ['CONTENT_TYPE'] == 'text/plain'
+    assert environ['CONTENT_LENGTH'] == '12'
+    assert environ['HTTP_X_A'] == '1,2'
+    assert environ['wsgi.input_terminated'] is True
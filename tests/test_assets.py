@@ -0,0 +1,75 @@
+import gzip
+
+import pytest
+
+import assets
+
+JS = b'console.log("namaste");\n' * 20
+PAGE = b'<html><body>built tips</body></html>\n' * 20
+
+
+@pytest.fixture
+def dist(tmp_path, monkeypatch):
+    """A small static/dist build: one asset and one page, with compressed variants."""
+    files = {
+        'main.0123456789.js': JS,
+        'main.0123456789.js.gz': gzip.compress(JS, mtime=0),
+        'main.0123456789.js.br': b'brotli-bytes',
+        'pages/tips.html': PAGE,
+        'pages/tips.html.gz': gzip.compress(PAGE, mtime=0),
+    }
+    for name, data in files.items():
+        path = tmp_path / name
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_bytes(data)
+    manifest = {
+        'version': 'test',
+        'assets': {'main.js': 'main.0123456789.js'},
+        'pages': ['tips.html'],
+        'encodings': {'main.0123456789.js': ['br', 'gzip'], 'pages/tips.html': ['gzip']},
+    }
+    monkeypatch.setattr(assets, 'DIST_DIR', str(tmp_path))
+    monkeypatch.setattr(assets, 'manifest', manifest)
+    monkeypatch.setattr(assets, 'fingerprinted', frozenset(manifest['assets'].values()))
+    return tmp_path
+
+
+@pytest.mark.parametrize('accept, encoding, body', [
+    ('br, gzip', 'br', b'brotli-bytes'),
+    ('gzip', 'gzip', gzip.compress(JS, mtime=0)),
+    ('identity', None, JS),
+])
+def test_asset_variant_follows_accept_encoding(client, dist, accept, encoding, body):
+    resp = client.get('/assets/main.0123456789.js', headers={'Accept-Encoding': accept})
+    assert resp.status_code == 200
+    assert resp.headers.get('Content-Encoding') == encoding
+    assert resp.data == body
+    assert resp.headers['Cache-Control'] == assets.IMMUTABLE
+    assert resp.mimetype in ('text/javascript', 'application/javascript')
+    assert 'Accept-Encoding' in resp.headers['Vary']
+
+
+def test_unknown_assets_are_404(client, dist):
+    assert client.get('/assets/main.js').status_code == 404
+    assert client.get('/assets/main.0123456789.js.gz').status_code == 404
+    assert client.get('/assets/../app.py').status_code == 404
+
+
+def test_built_page_is_revalidated(client, dist):
+    resp = client.get('/tips', headers={'Accept-Encoding': 'gzip'})
+    assert resp.headers['Content-Encoding'] == 'gzip'
+    assert gzip.decompress(resp.data) == PAGE
+    assert resp.headers['Cache-Control'] == assets.REVALIDATE
+    plain = client.get('/tips')
+    assert 'Content-Encoding' not in plain.headers
+    assert plain.data == PAGE
+
+
+def test_unbuilt_page_falls_back_to_static(client, monkeypatch):
+    monkeypatch.setattr(assets, 'manifest', dict(assets.manifest, pages=[]))
+    monkeypatch.setattr(assets, 'unbuilt_pages', {})
+    resp = client.get('/tips')
+    assert resp.status_code == 200
+    assert resp.mimetype == 'text/html'
+    assert resp.headers['Cache-Control'] == assets.REVALIDATE
+    assert 'tips.html' in assets.unbuilt_pages
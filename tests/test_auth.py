@@ -0,0 +1,65 @@
+import itertools
+import json
+
+import pytest
+
+from user_store import UserStore
+
+_names = itertools.count()
+
+
+@pytest.fixture
+def username():
+    return f'user-{next(_names)}'
+
+
+@pytest.fixture
+def store(tmp_path):
+    return UserStore(str(tmp_path / 'users.db'))
+
+
+def test_store_create_and_update(store):
+    assert store.is_empty()
+    assert store.create_user('asha', 'h1')
+    assert not store.create_user('asha', 'h2')
+    assert store.get_password_hash('asha') == 'h1'
+    store.set_password_hash('asha', 'h3')
+    assert store.get_password_hash('asha') == 'h3'
+    assert store.get_password_hash('nobody') is None
+    assert not store.is_empty()
+
+
+def test_store_imports_users_json(store, tmp_path):
+    path = tmp_path / 'users.json'
+    path.write_text(json.dumps({'asha': {'pw': 'h1'}, 'ravi': {'pw': 'h2'}, 'empty': {}}))
+    store.create_user('asha', 'kept')
+    assert store.import_users_json(str(path)) == 1
+    assert store.get_password_hash('asha') == 'kept'
+    assert store.get_password_hash('ravi') == 'h2'
+    assert store.get_password_hash('empty') is None
+
+
+def test_signup_then_login(app, client, username):
+    import app as site
+    creds = {'username': username, 'password': 'secret-pw'}
+    assert client.post('/auth/signup', json=creds).get_json() == {'ok': True}
+    assert site.user_store.get_password_hash(username) is not None
+    assert client.post('/auth/signup', json=creds).status_code == 400
+
+    resp = client.post('/auth/login', json=creds)
+    assert resp.get_json() == {'ok': True, 'username': username}
+    assert client.get('/auth/whoami').get_json() == {'ok': True, 'username': username}
+    client.post('/auth/logout')
+    assert client.get('/auth/whoami').get_json() == {'ok': False}
+
+
+@pytest.mark.parametrize('body', [{}, {'username': 'x'}, {'password': 'x'}, {'username': ' ', 'password': 'x'}])
+def test_signup_needs_both_fields(client, body):
+    assert client.post('/auth/signup', json=body).status_code == 400
+
+
+def test_login_rejects_bad_credentials(client, username):
+    client.post('/auth/signup', json={'username': username, 'password': 'right'})
+    assert client.post('/auth/login', json={'username': username, 'password': 'wrong'}).status_code == 400
+    assert client.post('/auth/login', json={'username': 'nobody', 'password': 'x'}).status_code == 400
+    assert client.get('/auth/whoami').get_json() == {'ok': False}
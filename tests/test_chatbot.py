@@ -0,0 +1,68 @@
+import pytest
+
+from chatbot import FALLBACK_REPLY, IntentMatcher, matcher
+
+INTENTS = (
+    {'name': 'greeting', 'words': ('hi', 'hello'), 'reply': 'greeting'},
+    {'name': 'guide_goa', 'keywords': ('goa',), 'also': ('guide',), 'reply': 'goa guide'},
+    {'name': 'goa', 'keywords': ('goa',), 'reply': 'goa'},
+    {'name': 'food', 'keywords': ('food',), 'reply': 'food'},
+)
+
+
+def name(matcher_, message):
+    intent = matcher_.match(message)
+    return intent['name'] if intent else None
+
+
+def test_first_listed_intent_wins():
+    m = IntentMatcher(INTENTS)
+    assert name(m, 'food in goa') == 'goa'
+    assert name(m, 'hello, food in goa?') == 'greeting'
+
+
+def test_also_group_is_required():
+    m = IntentMatcher(INTENTS)
+    assert name(m, 'goa guide please') == 'guide_goa'
+    assert name(m, 'GUIDE to Goa') == 'guide_goa'
+    assert name(m, 'guide to food') == 'food'
+
+
+def test_words_match_whole_words_only():
+    m = IntentMatcher(INTENTS)
+    assert name(m, 'hi') == 'greeting'
+    assert name(m, 'hi!') == 'greeting'
+    assert name(m, 'this trip') is None
+    assert name(m, 'chipotle food') == 'food'
+
+
+def test_keywords_match_inside_words():
+    m = IntentMatcher(INTENTS)
+    assert name(m, 'seafood') == 'food'
+
+
+def test_counts_hits():
+    m = IntentMatcher(INTENTS)
+    m.match('goa')
+    m.match('goa')
+    m.match('nothing here')
+    assert m.stats() == {'goa': 2, 'fallback': 1}
+
+
+def test_site_intents():
+    assert matcher.reply('what should I pack') == FALLBACK_REPLY
+    assert matcher.match('kolkata guide')['name'] == 'guide_kolkata'
+    assert matcher.match('best time to visit jaipur')['name'] == 'jaipur'
+
+
+def test_route_replies(client):
+    resp = client.post('/chatbot', json={'message': 'Hello there'})
+    assert resp.get_json() == {'reply': matcher.reply('hello')}
+    assert client.post('/chatbot', json={}).get_json() == {'reply': FALLBACK_REPLY}
+
+
+@pytest.mark.parametrize('body', [['x'], 'x', 5, {'message': 5}, {'message': 0}, {'message': ['goa']}])
+def test_route_rejects_bad_bodies(client, body):
+    resp = client.post('/chatbot', json=body)
+    assert resp.status_code == 400
+    assert 'error' in resp.get_json()
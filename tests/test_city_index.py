@@ -0,0 +1,35 @@
+from city_index import CityIndex, fold
+
+NAMES = ['Goa', 'Agra', 'Gangtok', 'Nagaon', 'Sri Ganganagar', 'São Goa', 'Jaipur', 'Jaisalmer',
+         'Kolkata', 'Kollam']
+
+
+def test_fold():
+    assert fold('  São   GOA ') == 'sao goa'
+
+
+def test_exact_match_first_then_prefix_then_position():
+    index = CityIndex(NAMES)
+    assert index.search('goa') == ['Goa', 'São Goa']
+    assert index.search('ga') == ['Gangtok', 'Nagaon', 'Sri Ganganagar']
+
+
+def test_prefix_ties_by_length_then_model_order():
+    index = CityIndex(NAMES)
+    assert index.search('jai') == ['Jaipur', 'Jaisalmer']
+    assert index.search('kol') == ['Kollam', 'Kolkata']
+
+
+def test_typo_falls_back_to_trigram_similarity():
+    index = CityIndex(NAMES)
+    assert index.search('jaipor')[0] == 'Jaipur'
+    assert index.resolve('kolkatta') == 'Kolkata'
+
+
+def test_resolve_and_limits():
+    index = CityIndex(NAMES)
+    assert index.resolve('SAO goa') == 'São Goa'
+    assert index.resolve('zzzz') is None
+    assert index.search('ga', limit=2) == ['Gangtok', 'Nagaon']
+    assert index.search('', limit=5) == []
+    assert index.search('goa', limit=0) == []
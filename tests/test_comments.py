@@ -0,0 +1,58 @@
+import pytest
+from flask import Flask
+
+import WebSecurity
+from WebSecurity import Comment, comment_page, db
+
+
+@pytest.fixture(scope='module')
+def app():
+    app = Flask(__name__, template_folder='../templates')
+    app.secret_key = 'test'
+    WebSecurity.init_app(app)
+    app.config['WTF_CSRF_ENABLED'] = False
+    with app.app_context():
+        db.session.add_all(Comment(owner='other', body=f'other {i}') for i in range(3))
+        db.session.add_all(Comment(owner='me', body=f'mine {i}') for i in range(45))
+        db.session.commit()
+    return app
+
+
+def bodies(comments):
+    return [c.body for c in comments]
+
+
+def test_pages_run_newest_first(app):
+    with app.app_context():
+        first, older = comment_page('me', limit=20)
+        assert bodies(first) == [f'mine {i}' for i in range(44, 24, -1)]
+        second, older2 = comment_page('me', before=older, limit=20)
+        assert bodies(second) == [f'mine {i}' for i in range(24, 4, -1)]
+        last, older3 = comment_page('me', before=older2, limit=20)
+        assert bodies(last) == [f'mine {i}' for i in range(4, -1, -1)]
+        assert older3 is None
+
+
+def test_after_returns_newer_comments_oldest_first(app):
+    with app.app_context():
+        page, _ = comment_page('me', limit=50)
+        ids = [c.id for c in page]
+        newer, older = comment_page('me', after=ids[3], limit=50)
+        assert [c.id for c in newer] == ids[:3][::-1]
+        assert older is None
+        assert comment_page('me', after=ids[0])[0] == []
+
+
+def test_pages_are_scoped_to_the_owner(app):
+    with app.app_context():
+        assert bodies(comment_page('other')[0]) == ['other 2', 'other 1', 'other 0']
+        assert comment_page('nobody') == ([], None)
+        assert comment_page(None) == ([], None)
+
+
+def test_visitors_only_see_their_own_comments(app):
+    alice, bob = app.test_client(), app.test_client()
+    alice.post('/comment', data={'comment': '<b>hi</b><script>x</script>'})
+    page = alice.get('/comments').get_json()
+    assert [c['html'] for c in page['comments']] == ['<b>hi</b>x']
+    assert bob.get('/comments').get_json() == {'comments': [], 'before': None, 'after': None}
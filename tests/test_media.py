@@ -0,0 +1,91 @@
+import threading
+
+import pytest
+from werkzeug.http import http_date
+
+import media
+from media import VideoFile, plan_video
+
+INFO = VideoFile(path='clip.mp4', size=100, mtime=1700000000.0, etag='abc', mimetype='video/mp4')
+
+
+def test_full_file():
+    status, headers, start, stop = plan_video(INFO, {})
+    assert (status, start, stop) == (200, 0, 100)
+    assert headers['Accept-Ranges'] == 'bytes'
+    assert headers['ETag'] == '"abc"'
+    assert 'Content-Range' not in headers
+
+
+def test_single_range():
+    status, headers, start, stop = plan_video(INFO, {'Range': 'bytes=10-19'})
+    assert (status, start, stop) == (206, 10, 20)
+    assert headers['Content-Range'] == 'bytes 10-19/100'
+    status, headers, start, stop = plan_video(INFO, {'Range': 'bytes=-10'})
+    assert (status, start, stop) == (206, 90, 100)
+    status, headers, start, stop = plan_video(INFO, {'Range': 'bytes=95-200'})
+    assert (status, start, stop) == (206, 95, 100)
+
+
+def test_unsatisfiable_range():
+    status, headers, start, stop = plan_video(INFO, {'Range': 'bytes=200-300'})
+    assert (status, start, stop) == (416, None, None)
+    assert headers['Content-Range'] == 'bytes */100'
+
+
+def test_multiple_ranges_get_the_whole_file():
+    status, headers, start, stop = plan_video(INFO, {'Range': 'bytes=0-1,5-6'})
+    assert (status, start, stop) == (200, 0, 100)
+    assert 'Content-Range' not in headers
+
+
+def test_if_none_match():
+    status, _, start, stop = plan_video(INFO, {'If-None-Match': '"abc"'})
+    assert (status, start, stop) == (304, None, None)
+    status, _, _, _ = plan_video(INFO, {'If-None-Match': '"other"'})
+    assert status == 200
+
+
+def test_if_range():
+    fresh = {'Range': 'bytes=0-9', 'If-Range': '"abc"'}
+    assert plan_video(INFO, fresh)[0] == 206
+    stale = {'Range': 'bytes=0-9', 'If-Range': '"old"'}
+    assert plan_video(INFO, stale)[0] == 200
+    dated = {'Range': 'bytes=0-9', 'If-Range': http_date(INFO.mtime)}
+    assert plan_video(INFO, dated)[0] == 206
+    older = {'Range': 'bytes=0-9', 'If-Range': http_date(INFO.mtime - 60)}
+    assert plan_video(INFO, older)[0] == 200
+
+
+@pytest.fixture
+def clip(tmp_path, monkeypatch):
+    path = tmp_path / 'clip.mp4'
+    path.write_bytes(bytes(range(256)) * 4)
+    monkeypatch.setattr(media, 'videos', media.scan_videos(str(tmp_path)))
+    return media.videos['clip.mp4']
+
+
+def test_route_streams_ranges(client, clip):
+    full = client.get('/videos/clip.mp4')
+    assert full.status_code == 200
+    assert full.data == bytes(range(256)) * 4
+    assert full.mimetype == 'video/mp4'
+    part = client.get('/videos/clip.mp4', headers={'Range': 'bytes=10-19'})
+    assert part.status_code == 206
+    assert part.data == bytes(range(10, 20))
+    assert part.headers['Content-Length'] == '10'
+    assert client.get('/videos/missing.mp4').status_code == 404
+
+
+def test_route_caps_concurrent_streams(client, clip, monkeypatch):
+    monkeypatch.setattr(media, 'video_streams', threading.BoundedSemaphore(1))
+    media.video_streams.acquire()
+    resp = client.get('/videos/clip.mp4')
+    assert resp.status_code == 503
+    assert resp.headers['Retry-After'] == '1'
+    media.video_streams.release()
+    resp = client.get('/videos/clip.mp4')
+    assert resp.status_code == 200
+    resp.close()
+    # closing the response gives the slot back
+    assert media.video_streams.acquire(blocking=False)
@@ -0,0 +1,76 @@
+import re
+
+from flask import Flask
+
+import metrics
+from metrics import Registry
+
+# name{labels} value, as Prometheus' text format 0.0.4 expects it
+SAMPLE = re.compile(r'^[a-zA-Z_:][a-zA-Z0-9_:]*(\{([a-zA-Z_][a-zA-Z0-9_]*="([^"\\]|\\.)*",?)*\})? '
+                    r'(-?[0-9.e+-]+|\+Inf|NaN)$')
+
+
+def test_render_format():
+    registry = Registry()
+    registry.describe('jobs_total', 'counter', 'Jobs run.')
+    registry.describe('job_seconds', 'histogram', 'Job time.')
+    registry.inc('jobs_total', kind='a "quoted"\nname')
+    registry.inc('jobs_total', 2, kind='b')
+    registry.observe('job_seconds', 0.002, kind='b')
+    registry.observe('job_seconds', 7.0, kind='b')
+    registry.add_collector(lambda: [('up', 'gauge', 'Up.', [({}, True)])])
+    lines = registry.render().splitlines()
+
+    assert lines[:4] == [
+        '# HELP jobs_total Jobs run.',
+        '# TYPE jobs_total counter',
+        'jobs_total{kind="a \\"quoted\\"\\nname"} 1',
+        'jobs_total{kind="b"} 2',
+    ]
+    assert 'job_seconds_bucket{kind="b",le="0.001"} 0' in lines
+    assert 'job_seconds_bucket{kind="b",le="0.0025"} 1' in lines
+    assert 'job_seconds_bucket{kind="b",le="5.0"} 1' in lines
+    assert 'job_seconds_bucket{kind="b",le="+Inf"} 2' in lines
+    assert 'job_seconds_sum{kind="b"} 7.002' in lines
+    assert 'job_seconds_count{kind="b"} 2' in lines
+    assert lines[-3:] == ['# HELP up Up.', '# TYPE up gauge', 'up 1']
+    for line in lines:
+        assert line.startswith('# ') or SAMPLE.match(line), line
+
+
+def test_requests_are_counted_per_route():
+    app = Flask(__name__)
+    metrics.init_app(app)
+
+    @app.route('/item/<int:n>')
+    def item(n):
+        return 'ok' if n else ('gone', 503)
+
+    @app.route('/boom')
+    def boom():
+        raise RuntimeError('boom')
+
+    client = app.test_client()
+    client.get('/item/1')
+    client.get('/item/2')
+    client.get('/item/0')
+    client.get('/boom')
+    resp = client.get('/metrics')
+    assert resp.content_type == metrics.CONTENT_TYPE
+    text = resp.get_data(as_text=True)
+    for line in text.splitlines():
+        assert line.startswith('# ') or SAMPLE.match(line), line
+    assert 'http_requests_total{method="GET",route="/item/<int:n>",status="200"} 2' in text
+    assert 'http_requests_total{method="GET",route="/item/<int:n>",status="503"} 1' in text
+    assert 'http_requests_total{method="GET",route="/boom",status="500"} 1' in text
+    assert 'http_request_errors_total{method="GET",route="/item/<int:n>"} 1' in text
+    assert 'http_requests_in_flight{route="/item/<int:n>"} 0' in text
+    assert 'http_request_duration_seconds_count{route="/item/<int:n>"} 3' in text
+
+
+def test_site_metrics(client):
+    client.get('/recommend?city=Goa')
+    text = client.get('/metrics').get_data(as_text=True)
+    assert 'model_loaded 1' in text
+    assert re.search(r'^recommend_cache_misses_total \d+$', text, re.M)
+    assert 'recommend_stage_seconds_count{stage="lookup"}' in text
@@ -0,0 +1,82 @@
+import os
+import threading
+
+import pytest
+
+from benchmarks.synthetic import make_artifacts, write_pickle
+from model_reload import ModelReloader
+
+
+def write_model(path, seed):
+    write_pickle(make_artifacts(40, dense=True, seed=seed), path)
+    # a distinct stamp even on filesystems with coarse mtimes
+    st = os.stat(path)
+    os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns + seed * 10**9))
+
+
+@pytest.fixture
+def path(tmp_path):
+    path = str(tmp_path / 'model.pkl')
+    write_model(path, 1)
+    return path
+
+
+def test_swaps_in_new_versions(path):
+    swaps = []
+    reloader = ModelReloader(path, interval=0, on_swap=lambda old, new: swaps.append((old, new)))
+    assert reloader.reload() == 'swapped'
+    first = reloader.current
+    assert swaps == [(None, first)]
+    assert not reloader.changed()
+
+    write_model(path, 2)
+    assert reloader.changed()
+    assert reloader.reload() == 'swapped'
+    assert reloader.current.version != first.version
+    assert swaps[-1] == (first, reloader.current)
+    # a request holding the old model keeps a complete, working object
+    assert first.recommender.top_neighbors(0, 3)[0].tolist()
+
+
+def test_same_content_is_not_swapped(path):
+    swaps = []
+    reloader = ModelReloader(path, interval=0, on_swap=lambda old, new: swaps.append(new))
+    reloader.reload()
+    loaded = reloader.current
+    st = os.stat(path)
+    os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns + 10**9))
+    assert reloader.changed()
+    assert reloader.reload() == 'unchanged'
+    assert reloader.current.recommender is loaded.recommender
+    assert not reloader.changed()
+    assert len(swaps) == 1
+
+
+def test_broken_artifact_keeps_the_old_model(path):
+    reloader = ModelReloader(path, interval=0)
+    reloader.reload()
+    good = reloader.current
+    with open(path, 'wb') as f:
+        f.write(b'not a pickle')
+    assert reloader.reload() == 'failed'
+    assert reloader.current is good
+    # the failed stamp is not retried until the file changes again
+    assert not reloader.changed()
+    write_model(path, 3)
+    assert reloader.changed()
+    assert reloader.reload() == 'swapped'
+
+
+def test_missing_artifact_fails(tmp_path):
+    reloader = ModelReloader(str(tmp_path / 'missing.pkl'), interval=0)
+    assert reloader.reload() == 'failed'
+    assert reloader.current is None
+    assert not reloader.changed()
+
+
+def test_request_reload_runs_in_the_watcher(path):
+    swapped = threading.Event()
+    reloader = ModelReloader(path, interval=0, on_swap=lambda old, new: swapped.set())
+    reloader.request_reload()
+    assert swapped.wait(10)
+    assert reloader.current is not None
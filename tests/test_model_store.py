@@ -0,0 +1,58 @@
+import os
+
+import numpy as np
+import pytest
+
+from benchmarks.synthetic import make_artifacts, write_pickle
+from model_store import convert, load_artifacts, load_model, save_model_dir
+
+
+@pytest.fixture
+def pickled(tmp_path):
+    path = str(tmp_path / 'model.pkl')
+    write_pickle(make_artifacts(60, dense=True, seed=1), path)
+    return path
+
+
+def test_convert_round_trip(pickled, tmp_path):
+    dest = str(tmp_path / 'model')
+    convert(pickled, dest)
+    from_pickle = load_model(pickled)
+    from_dir = load_model(dest)
+    assert isinstance(load_artifacts(dest)['sim_matrix'], np.memmap)
+    assert from_dir.city_to_idx == from_pickle.city_to_idx
+    assert from_dir.rows == from_pickle.rows
+    for idx in range(len(from_dir.rows)):
+        assert (from_dir.recommender.top_neighbors(idx, 5)[0].tolist()
+                == from_pickle.recommender.top_neighbors(idx, 5)[0].tolist())
+
+
+def test_convert_without_sim_matrix_serves_sparse(pickled, tmp_path):
+    dest = str(tmp_path / 'model')
+    convert(pickled, dest, include_sim_matrix=False)
+    assert not os.path.exists(os.path.join(dest, 'sim_matrix.npy'))
+    model = load_model(dest)
+    assert model.recommender.mode == 'sparse'
+    # the index built at conversion is shipped, so nothing is rebuilt
+    assert isinstance(model.recommender.neighbor_idx, np.memmap)
+
+
+def test_version_follows_content(tmp_path):
+    first, second = str(tmp_path / 'a'), str(tmp_path / 'b')
+    save_model_dir(make_artifacts(30, seed=1), first)
+    save_model_dir(make_artifacts(30, seed=1), second)
+    assert load_artifacts(first)['model_version'] == load_artifacts(second)['model_version']
+    save_model_dir(make_artifacts(30, seed=2), second)
+    assert load_artifacts(first)['model_version'] != load_artifacts(second)['model_version']
+
+
+def test_rewriting_a_live_directory_leaves_loaded_arrays_alone(tmp_path):
+    path = str(tmp_path / 'model')
+    save_model_dir(make_artifacts(30, seed=1), path)
+    live = load_artifacts(path)
+    data = np.array(live['tfidf'].data)
+    save_model_dir(make_artifacts(30, seed=2), path)
+    # new files were renamed into place; the old mapping keeps its inode
+    assert np.array_equal(live['tfidf'].data, data)
+    assert not np.array_equal(load_artifacts(path)['tfidf'].data, data)
+    assert not [name for name in os.listdir(path) if name.endswith('.tmp')]
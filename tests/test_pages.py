@@ -0,0 +1,57 @@
+import gzip
+
+import pytest
+
+import assets
+import pages
+from cities import CITIES
+
+SLUG = sorted(CITIES)[0]
+
+
+@pytest.fixture
+def fresh_cache(monkeypatch):
+    monkeypatch.setattr(pages, 'rendered_pages', {})
+    return pages.rendered_pages
+
+
+def test_city_page_is_rendered_once(client, fresh_cache, monkeypatch):
+    renders = []
+    render_city = pages.render_city
+    monkeypatch.setattr(pages, 'render_city', lambda slug: renders.append(slug) or render_city(slug))
+
+    first = client.get('/' + SLUG)
+    second = client.get('/' + SLUG)
+    assert first.status_code == second.status_code == 200
+    assert first.data == second.data
+    assert CITIES[SLUG]['name'].encode('utf-8') in first.data
+    assert renders == [SLUG]
+    assert list(fresh_cache) == [(SLUG, assets.manifest['version'])]
+
+
+def test_city_page_etag_and_gzip(client, fresh_cache):
+    plain = client.get('/' + SLUG)
+    assert plain.headers['Cache-Control'] == assets.REVALIDATE
+    assert 'Accept-Encoding' in plain.headers['Vary']
+    etag = plain.headers['ETag']
+
+    packed = client.get('/' + SLUG, headers={'Accept-Encoding': 'gzip'})
+    assert packed.headers['Content-Encoding'] == 'gzip'
+    assert gzip.decompress(packed.data) == plain.data
+    assert packed.headers['ETag'] != etag
+
+    revalidated = client.get('/' + SLUG, headers={'If-None-Match': etag})
+    assert revalidated.status_code == 304
+    assert revalidated.data == b''
+
+
+def test_new_manifest_version_renders_again(client, fresh_cache, monkeypatch):
+    client.get('/' + SLUG)
+    monkeypatch.setattr(assets, 'manifest', dict(assets.manifest, version='next'))
+    client.get('/' + SLUG)
+    assert (SLUG, 'next') in fresh_cache
+    assert len(fresh_cache) == 2
+
+
+def test_unknown_city_is_404(client):
+    assert client.get('/atlantis').status_code == 404
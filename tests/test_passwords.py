@@ -0,0 +1,67 @@
+import threading
+
+import pytest
+
+from passwords import HasherBusy, PasswordHasher, legacy_hash
+
+FAST = 'pbkdf2:sha256:1000'
+
+
+def test_hash_and_verify():
+    hasher = PasswordHasher(method=FAST)
+    stored = hasher.hash('secret')
+    assert stored.startswith(FAST + '$')
+    assert hasher.verify(stored, 'secret') == (True, False)
+    assert hasher.verify(stored, 'wrong') == (False, False)
+
+
+def test_legacy_and_outdated_hashes_need_rehash():
+    hasher = PasswordHasher(method=FAST)
+    assert hasher.verify(legacy_hash('secret'), 'secret') == (True, True)
+    assert hasher.verify(legacy_hash('secret'), 'wrong') == (False, False)
+    older = PasswordHasher(method='pbkdf2:sha256:500').hash('secret')
+    assert hasher.verify(older, 'secret') == (True, True)
+
+
+def test_full_hasher_fails_fast():
+    hasher = PasswordHasher(method=FAST, workers=1, queue_size=1)
+    started, release = threading.Event(), threading.Event()
+
+    def slow():
+        started.set()
+        release.wait(5)
+
+    worker = threading.Thread(target=hasher._run, args=(slow,))
+    worker.start()
+    try:
+        assert started.wait(5)
+        with pytest.raises(HasherBusy):
+            hasher.hash('secret')
+    finally:
+        release.set()
+        worker.join()
+    # the slot is given back once the job is done
+    assert hasher.verify(hasher.hash('secret'), 'secret') == (True, False)
+
+
+def test_login_upgrades_legacy_hashes(app, client):
+    import app as site
+    site.user_store.create_user('legacy-user', legacy_hash('old-pw'))
+    resp = client.post('/auth/login', json={'username': 'legacy-user', 'password': 'old-pw'})
+    assert resp.get_json() == {'ok': True, 'username': 'legacy-user'}
+    upgraded = site.user_store.get_password_hash('legacy-user')
+    assert upgraded.startswith(site.password_hasher.method + '$')
+    assert client.post('/auth/login', json={'username': 'legacy-user', 'password': 'old-pw'}).status_code == 200
+
+
+def test_busy_hasher_answers_503(app, client, monkeypatch):
+    import app as site
+    site.user_store.create_user('busy-user', site.password_hasher.hash('pw'))
+    monkeypatch.setattr(site, 'password_hasher', PasswordHasher(queue_size=1))
+    site.password_hasher._slots.acquire()
+    for path, body in (('/auth/signup', {'username': 'busy-new', 'password': 'pw'}),
+                       ('/auth/login', {'username': 'busy-user', 'password': 'pw'})):
+        resp = client.post(path, json=body)
+        assert resp.status_code == 503
+        assert resp.headers['Retry-After'] == '1'
+    assert site.user_store.get_password_hash('busy-new') is None
@@ -0,0 +1,33 @@
+import os
+import runpy
+
+from user_store import UserStore
+
+GUNICORN_CONF = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'gunicorn.conf.py')
+
+
+def test_close_drains_the_pool(tmp_path):
+    store = UserStore(str(tmp_path / 'users.db'))
+    with store.connection():
+        with store.connection():
+            pass
+    assert store._pool.qsize() == 2
+    store.close()
+    assert store._pool.empty()
+    # usable again afterwards
+    assert store.create_user('asha', 'h')
+
+
+def test_create_app_leaves_no_connection_for_fork(app):
+    import app as site
+    built = site.create_app()
+    assert site.user_store._pool.empty()
+    assert built.session_interface.store._pool.empty()
+
+
+def test_thread_count_stays_above_the_caps(monkeypatch):
+    monkeypatch.setenv('GUNICORN_THREADS', '4')
+    assert runpy.run_path(GUNICORN_CONF)['threads'] == 4
+    monkeypatch.setenv('MAX_VIDEO_STREAMS', '6')
+    monkeypatch.setenv('PASSWORD_HASH_QUEUE', '9')
+    assert runpy.run_path(GUNICORN_CONF)['threads'] == 10
@@ -0,0 +1,83 @@
+import pytest
+
+
+def test_batch_matches_single_requests(client):
+    resp = client.post('/recommend/batch', json={'cities': ['Goa', 'goa', 'Nowhere-xyz', 'Jaipur'],
+                                                 'topn': 3})
+    assert resp.status_code == 200
+    body = resp.get_json()
+    assert body['topn'] == 3
+    goa, fuzzy, missing, jaipur = body['results']
+    assert goa['query_city'] == fuzzy['query_city'] == 'Goa'
+    assert missing == {'city': 'Nowhere-xyz', 'error': "City 'Nowhere-xyz' not found"}
+    for entry in (goa, jaipur):
+        single = client.get('/recommend', query_string={'city': entry['city'], 'topn': 3}).get_json()
+        assert entry['results'] == single['results']
+    assert resp.headers['X-Model-Version']
+
+
+@pytest.mark.parametrize('body', [
+    ['Goa'],
+    'Goa',
+    {},
+    {'cities': []},
+    {'cities': 'Goa'},
+    {'cities': ['Goa', 5]},
+    {'cities': ['Goa'] * 101},
+    {'cities': ['Goa'], 'topn': 'many'},
+])
+def test_batch_rejects_bad_bodies(client, body):
+    resp = client.post('/recommend/batch', json=body)
+    assert resp.status_code == 400
+    assert 'error' in resp.get_json()
+
+
+def test_batch_rejects_non_json(client):
+    resp = client.post('/recommend/batch', data='cities=Goa')
+    assert resp.status_code == 400
+
+
+def test_recommend_etag_and_cache_headers(client):
+    resp = client.get('/recommend?city=Goa&topn=3')
+    assert resp.status_code == 200
+    assert resp.headers['Cache-Control'].startswith('public, max-age=')
+    assert 'Cookie' not in resp.headers.get('Vary', '')
+    etag = resp.headers['ETag']
+    assert etag
+
+    # same resolved city and topn: same ETag, even through the fuzzy lookup
+    assert client.get('/recommend?city=goa&topn=3').headers['ETag'] == etag
+    assert client.get('/recommend?city=Goa&topn=4').headers['ETag'] != etag
+
+    revalidated = client.get('/recommend?city=Goa&topn=3', headers={'If-None-Match': etag})
+    assert revalidated.status_code == 304
+    assert revalidated.data == b''
+    assert revalidated.headers['ETag'] == etag
+    assert revalidated.headers['Cache-Control'] == resp.headers['Cache-Control']
+
+
+def test_recommend_cache_counts_hits_and_misses(app, client):
+    import app as site
+    site.recommend_cache.clear()
+    before = client.get('/recommend/cache').get_json()
+    first = client.get('/recommend?city=Jaipur&topn=2')
+    second = client.get('/recommend?city=Jaipur&topn=2')
+    assert first.data == second.data
+    after = client.get('/recommend/cache').get_json()
+    assert after['misses'] - before['misses'] == 1
+    assert after['hits'] - before['hits'] == 1
+    assert after['size'] == 1
+    # a 304 answers from the ETag alone, without reading the cache
+    client.get('/recommend?city=Jaipur&topn=2', headers={'If-None-Match': first.headers['ETag']})
+    assert client.get('/recommend/cache').get_json()['hits'] == after['hits']
+
+
+@pytest.mark.parametrize('query, status', [
+    ('', 400),
+    ('?city=Goa&topn=x', 400),
+    ('?city=Nowhere-xyz', 404),
+])
+def test_recommend_errors(client, query, status):
+    resp = client.get('/recommend' + query)
+    assert resp.status_code == status
+    assert 'error' in resp.get_json()
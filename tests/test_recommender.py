@@ -0,0 +1,99 @@
+import numpy as np
+import pytest
+
+from benchmarks.synthetic import make_artifacts
+from model_store import load_model_dir, save_model_dir
+from recommender import Recommender, select_top, top_from_row
+
+
+def baseline_top(row, idx, topn):
+    """The original /recommend ranking: stable descending sort, query city skipped."""
+    ranked = sorted(enumerate(row), key=lambda x: x[1], reverse=True)
+    return [i for i, _ in ranked if i != idx][:topn]
+
+
+@pytest.fixture(scope='module')
+def artifacts():
+    artifacts = make_artifacts(120, vocab=40, terms=4, dense=True, seed=3)
+    # duplicate a few cities so their scores tie exactly
+    tfidf = artifacts['tfidf'].tolil()
+    for src, dest in ((0, 7), (0, 50), (3, 90), (3, 91)):
+        tfidf[dest] = tfidf[src]
+    tfidf = tfidf.tocsr()
+    artifacts['tfidf'] = tfidf
+    artifacts['sim_matrix'] = (tfidf @ tfidf.T).toarray()
+    return artifacts
+
+
+def test_select_top_breaks_ties_by_lowest_column():
+    block = np.array([[0.5, 0.9, 0.5, 0.9, 0.1, 0.5]])
+    cols, scores = select_top(block, 3)
+    assert cols.tolist() == [[1, 3, 0]]
+    assert scores.tolist() == [[0.9, 0.9, 0.5]]
+    cols, _ = select_top(block, 4)
+    assert cols.tolist() == [[1, 3, 0, 2]]
+
+
+def test_select_top_matches_stable_sort():
+    rng = np.random.default_rng(0)
+    block = rng.integers(0, 5, size=(20, 30)).astype(np.float64)
+    for count in (1, 5, 29, 30):
+        cols, _ = select_top(block, count)
+        for row, got in zip(block, cols):
+            expected = sorted(range(len(row)), key=lambda i: row[i], reverse=True)[:count]
+            assert got.tolist() == expected
+
+
+def test_top_from_row_skips_query():
+    cols, scores = top_from_row([1.0, 0.3, 1.0, 0.3], 0, 2)
+    assert cols.tolist() == [2, 1]
+    assert scores.tolist() == [1.0, 0.3]
+
+
+@pytest.fixture(scope='module', params=['dense', 'sparse', 'dense_dir', 'sparse_dir'])
+def recommender(request, artifacts, tmp_path_factory):
+    mode, _, stored = request.param.partition('_')
+    if not stored:
+        return Recommender.from_artifacts(artifacts, mode=mode, k=10)
+    # a model directory, memory-mapped, with the index built at conversion
+    path = str(tmp_path_factory.mktemp('model'))
+    built = Recommender.from_artifacts(artifacts, mode=mode, k=10)
+    save_model_dir(artifacts, path, include_sim_matrix=mode == 'dense',
+                   neighbor_index=built.neighbor_index())
+    return Recommender.from_artifacts(load_model_dir(path), mode=mode, k=10)
+
+
+@pytest.mark.parametrize('topn', [1, 5, 10, 11, 40])
+def test_top_neighbors_match_baseline_sort(recommender, topn):
+    for idx in range(recommender.size):
+        row = recommender.score_rows([idx])[0]
+        cols, scores = recommender.top_neighbors(idx, topn)
+        assert cols.tolist() == baseline_top(row, idx, topn)
+        assert np.allclose(scores, row[cols])
+
+
+@pytest.mark.parametrize('topn', [5, 40])
+def test_batch_matches_single(recommender, topn):
+    idxs = [0, 7, 50, 3, 91, 119, 0]
+    cols, scores = recommender.top_neighbors_batch(idxs, topn)
+    for idx, got, got_scores in zip(idxs, cols, scores):
+        expected, expected_scores = recommender.top_neighbors(idx, topn)
+        assert got.tolist() == expected.tolist()
+        assert np.allclose(got_scores, expected_scores)
+
+
+def test_modes_agree(artifacts):
+    dense = Recommender.from_artifacts(artifacts, mode='dense', k=10)
+    sparse_ = Recommender.from_artifacts(artifacts, mode='sparse', k=10)
+    # sparse mode ranks on demand unless the artifact ships an index
+    assert sparse_.neighbor_idx is None
+    for idx in range(dense.size):
+        d_cols, d_scores = dense.top_neighbors(idx, 5)
+        s_cols, s_scores = sparse_.top_neighbors(idx, 5)
+        assert np.allclose(d_scores, s_scores)
+        assert d_cols.tolist() == s_cols.tolist()
+
+
+def test_sparse_mode_needs_tfidf(artifacts):
+    with pytest.raises(ValueError):
+        Recommender.from_artifacts(dict(artifacts, tfidf=None), mode='sparse')
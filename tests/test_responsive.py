@@ -0,0 +1,42 @@
+from responsive import DEFAULT_SIZES, responsive_images
+
+IMAGES = {
+    'images/goa.jpg': {
+        'width': 1200,
+        'height': 800,
+        'variants': {
+            'avif': [[320, 'derived/images/goa-320.avif'], [640, 'derived/images/goa-640.avif']],
+            'jpeg': [[320, 'derived/images/goa-320.jpg'], [640, 'derived/images/goa-640.jpg']],
+        },
+    },
+}
+
+
+def test_image_with_derivatives_becomes_picture():
+    html = responsive_images('<p><img src="static/images/goa.jpg" alt="Goa"></p>', images=IMAGES)
+    assert html == (
+        '<p><picture>'
+        '<source type="image/avif" srcset="/static/derived/images/goa-320.avif 320w, '
+        f'/static/derived/images/goa-640.avif 640w" sizes="{DEFAULT_SIZES}">'
+        '<img src="static/images/goa.jpg" alt="Goa" srcset="/static/derived/images/goa-320.jpg 320w, '
+        f'/static/derived/images/goa-640.jpg 640w" sizes="{DEFAULT_SIZES}" width="1200" height="800" '
+        'loading="lazy" decoding="async">'
+        '</picture></p>'
+    )
+
+
+def test_existing_attributes_are_kept():
+    html = responsive_images('<img src="/static/images/goa.jpg" width="300" loading="eager" />',
+                             url_for=lambda path: '/assets/' + path, images=IMAGES)
+    assert 'width="300"' in html and 'height="800"' not in html
+    assert 'loading="eager"' in html and 'loading="lazy"' not in html
+    assert '/assets/derived/images/goa-320.jpg 320w' in html
+
+
+def test_other_images_are_untouched():
+    for tag in ('<img src="static/images/delhi.jpg">',
+                '<img src="https://example.com/goa.jpg">',
+                '<img src="static/images/goa.jpg" srcset="a.jpg 1x">'):
+        assert responsive_images(tag, images=IMAGES) == tag
+    assert responsive_images('<img src="static/images/goa.jpg">', images={}) == \
+        '<img src="static/images/goa.jpg">'
@@ -0,0 +1,186 @@
+import time
+
+import pytest
+from flask import Flask, jsonify, request, session
+
+from session_store import ServerSessionInterface, SessionStore
+
+
+@pytest.fixture
+def store(tmp_path):
+    return SessionStore(str(tmp_path / 'sessions.db'))
+
+
+@pytest.fixture
+def app(store):
+    app = Flask(__name__)
+    app.secret_key = 'test'
+    app.session_interface = ServerSessionInterface(store, cache_ttl=0)
+
+    @app.route('/set')
+    def set_value():
+        session['value'] = request.args['value']
+        return ''
+
+    @app.route('/get')
+    def get_value():
+        return jsonify(value=session.get('value'), sid=session.sid)
+
+    @app.route('/regenerate')
+    def regenerate():
+        session.regenerate()
+        return ''
+
+    @app.route('/clear')
+    def clear():
+        session.clear()
+        return ''
+
+    return app
+
+
+def sid_cookie(client):
+    cookie = client.get_cookie('session')
+    return cookie.value if cookie else None
+
+
+def test_store_round_trip(store):
+    now = time.time()
+    store.save('a', '{"x": 1}', now + 60)
+    assert store.load('a', now) == ('{"x": 1}', now + 60)
+    assert store.load('a', now + 61) is None
+    assert store.purge(now + 61) == 1
+    store.save('b', '{}', now + 60)
+    store.delete('b')
+    assert store.load('b', now) is None
+
+
+def test_cookie_holds_only_the_id(app, store):
+    client = app.test_client()
+    client.get('/set?value=secret')
+    sid = sid_cookie(client)
+    assert sid and 'secret' not in sid
+    assert store.load(sid, time.time()) is not None
+    assert client.get('/get').get_json() == {'value': 'secret', 'sid': sid}
+
+
+def test_unchanged_session_is_not_written(app):
+    client = app.test_client()
+    assert 'Set-Cookie' not in client.get('/get').headers
+    client.get('/set?value=x')
+    assert 'Set-Cookie' not in client.get('/get').headers
+
+
+def test_unknown_id_is_not_adopted(app, store):
+    client = app.test_client()
+    client.set_cookie('session', 'chosen-by-attacker')
+    client.get('/set?value=x')
+    assert sid_cookie(client) != 'chosen-by-attacker'
+    assert store.load('chosen-by-attacker', time.time()) is None
+
+
+def test_regenerate_moves_data_to_a_new_id(app, store):
+    client = app.test_client()
+    client.get('/set?value=x')
+    old = sid_cookie(client)
+    client.get('/regenerate')
+    new = sid_cookie(client)
+    assert new != old
+    assert store.load(old, time.time()) is None
+    assert client.get('/get').get_json() == {'value': 'x', 'sid': new}
+
+
+def test_clear_deletes_the_session(app, store):
+    client = app.test_client()
+    client.get('/set?value=x')
+    sid = sid_cookie(client)
+    client.get('/clear')
+    assert sid_cookie(client) is None
+    assert store.load(sid, time.time()) is None
+
+
+def test_store_update_expects_the_data_read(store):
+    now = time.time()
+    store.save('a', '{"x": 1}', now + 60)
+    assert not store.update('a', '{"x": 2}', now + 60, '{"x": 0}')
+    assert store.update('a', '{"x": 2}', now + 90, '{"x": 1}')
+    assert store.load('a', now) == ('{"x": 2}', now + 90)
+    store.touch('a', now + 120)
+    assert store.load('a', now) == ('{"x": 2}', now + 120)
+
+
+def two_workers(app, store):
+    """A second client whose requests go through their own cached interface."""
+    other = Flask(__name__)
+    other.secret_key = app.secret_key
+    other.url_map = app.url_map
+    other.view_functions = app.view_functions
+    other.session_interface = ServerSessionInterface(store, cache_ttl=60)
+    app.session_interface = ServerSessionInterface(store, cache_ttl=60)
+    return other
+
+
+def test_logout_on_one_worker_ends_the_login_on_all(app, store):
+    other = two_workers(app, store)
+
+    @app.route('/login')
+    def login():
+        session['_user_id'] = '1'
+        return ''
+
+    client = app.test_client()
+    client.get('/login')
+    sid = sid_cookie(client)
+    # the other worker caches the logged-in session ...
+    peer = other.test_client()
+    peer.set_cookie('session', sid)
+    assert peer.get('/get').get_json()['sid'] == sid
+    # ... and must not keep accepting it once it is gone
+    client.get('/clear')
+    assert peer.get('/get').get_json()['sid'] != sid
+
+
+def test_stale_copy_does_not_overwrite_other_changes(app, store):
+    other = two_workers(app, store)
+
+    @app.route('/set2')
+    def set_other():
+        session['other'] = request.args['value']
+        return ''
+
+    client = app.test_client()
+    client.get('/set?value=a')
+    sid = sid_cookie(client)
+    peer = other.test_client()
+    peer.set_cookie('session', sid)
+    peer.get('/get')
+    client.get('/set2?value=b')
+    # the peer's cached copy has no 'other'; its write must keep it
+    peer.get('/set?value=c')
+    data = ServerSessionInterface(store).serializer.loads(store.load(sid, time.time())[0])
+    assert data == {'value': 'c', 'other': 'b'}
+
+
+def test_write_to_an_ended_session_is_dropped(app, store):
+    other = two_workers(app, store)
+    client = app.test_client()
+    client.get('/set?value=a')
+    sid = sid_cookie(client)
+    peer = other.test_client()
+    peer.set_cookie('session', sid)
+    peer.get('/get')
+    client.get('/clear')
+    peer.get('/set?value=b')
+    assert store.load(sid, time.time()) is None
+
+
+def test_unknown_ids_are_cached_as_misses(app, store, monkeypatch):
+    app.session_interface = ServerSessionInterface(store, cache_ttl=60)
+    loads = []
+    load = store.load
+    monkeypatch.setattr(store, 'load', lambda *args: loads.append(args) or load(*args))
+    client = app.test_client()
+    client.set_cookie('session', 'unknown')
+    client.get('/get')
+    client.get('/get')
+    assert len(loads) == 1
@@ -0,0 +1,72 @@
+import itertools
+
+import pytest
+from flask import session
+
+import WebSecurity
+from WebSecurity import User, db, load_user, user_cache
+
+_names = itertools.count()
+
+
+@pytest.fixture
+def user(app):
+    with app.app_context():
+        row = User(username=f'cached-{next(_names)}', password_hash='x')
+        db.session.add(row)
+        db.session.commit()
+        return str(row.id)
+
+
+@pytest.fixture
+def queries(monkeypatch):
+    calls = []
+    get = db.session.get
+    monkeypatch.setattr(db.session, 'get', lambda *args: calls.append(args) or get(*args))
+    return calls
+
+
+def test_loaded_user_is_cached_per_session(app, user, queries):
+    with app.test_request_context():
+        first = load_user(user)
+        assert load_user(user) is first
+        assert len(queries) == 1
+        assert user_cache.get((session.sid, user))[1] is first
+    # another session loads its own copy
+    with app.test_request_context():
+        assert load_user(user) is not first
+        assert len(queries) == 2
+
+
+def test_cached_user_expires(app, user, queries, monkeypatch):
+    monkeypatch.setattr(WebSecurity, 'USER_CACHE_TTL', -1)
+    with app.test_request_context():
+        load_user(user)
+        load_user(user)
+        assert len(queries) == 2
+
+
+def test_unknown_user_is_not_cached(app):
+    with app.test_request_context():
+        assert load_user('987654') is None
+        assert user_cache.get((session.sid, '987654')) is None
+
+
+def test_user_agent_change_logs_out(app, user):
+    client = app.test_client()
+    with client.session_transaction() as sess:
+        sess['_user_id'] = user
+        sess['_fresh'] = True
+        sess['ua'] = 'fingerprint of another browser'
+        sid = sess.sid
+    user_cache.put((sid, user), (float('inf'), WebSecurity.SessionUser(int(user), 'x')))
+    resp = client.get('/comments')
+    assert resp.status_code == 401
+    assert user_cache.get((sid, user)) is None
+
+
+def test_unchecked_endpoints_do_not_vary_on_the_cookie(client):
+    client.get('/comment')
+    resp = client.get('/health')
+    assert 'Cookie' not in resp.headers.get('Vary', '')
+    assert 'Cookie' in client.get('/comments').headers.get('Vary', '')
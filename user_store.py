@@ -0,0 +1,152 @@
+"""SQLite-backed user store for the auth API.
+
+Users live in the ``user`` table of ``instance/site.db`` -- the same table
+WebSecurity.py maps with its SQLAlchemy ``User`` model. The database runs in
+WAL mode so logins (indexed point lookups on ``username``) never wait on a
+signup, and each write is a single atomic statement, safe across worker
+processes.
+
+Import an existing users.json with::
+
+    python user_store.py migrate users.json
+"""
+import json
+import os
+import queue
+import sqlite3
+import sys
+from contextlib import contextmanager
+
+USER_DB_PATH = os.environ.get('USER_DB_PATH', os.path.join('instance', 'site.db'))
+USER_DB_POOL_SIZE = int(os.environ.get('USER_DB_POOL_SIZE', 8))
+
+# Mirrors what db.create_all() emits for WebSecurity.User.
+SCHEMA = (
+    'CREATE TABLE IF NOT EXISTS user ('
+    'id INTEGER NOT NULL, '
+    'username VARCHAR(64) NOT NULL, '
+    'password_hash VARCHAR(255) NOT NULL, '
+    'PRIMARY KEY (id))',
+    'CREATE UNIQUE INDEX IF NOT EXISTS ix_user_username ON user (username)',
+)
+
+
+class SQLiteStore:
+    """Base for stores on the site database: a small pool of autocommit connections.
+
+    Subclasses list their CREATE statements in `schema`; they run on init.
+    """
+
+    schema = ()
+
+    def __init__(self, path=USER_DB_PATH, pool_size=USER_DB_POOL_SIZE):
+        self.path = path
+        self.pool_size = pool_size
+        self._pool = queue.LifoQueue(maxsize=pool_size)
+        self._pid = os.getpid()
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with self.connection() as conn:
+            for statement in self.schema:
+                conn.execute(statement)
+
+    def _connect(self):
+        # autocommit mode: every statement is its own atomic transaction
+        conn = sqlite3.connect(self.path, timeout=30, isolation_level=None,
+                               check_same_thread=False)
+        conn.execute('PRAGMA journal_mode=WAL')
+        conn.execute('PRAGMA synchronous=NORMAL')
+        return conn
+
+    @contextmanager
+    def connection(self):
+        """Borrow a pooled connection, opening a new one if the pool is empty."""
+        if self._pid != os.getpid():
+            # connections must not be shared with a forked child
+            self._pool = queue.LifoQueue(maxsize=self.pool_size)
+            self._pid = os.getpid()
+        try:
+            conn = self._pool.get_nowait()
+        except queue.Empty:
+            conn = self._connect()
+        try:
+            yield conn
+        finally:
+            try:
+                self._pool.put_nowait(conn)
+            except queue.Full:
+                conn.close()
+
+    def close(self):
+        """Close the pooled connections; the next use opens new ones.
+
+        Call before forking: SQLite connections must not cross fork().
+        """
+        while True:
+            try:
+                conn = self._pool.get_nowait()
+            except queue.Empty:
+                return
+            conn.close()
+
+
+class UserStore(SQLiteStore):
+    """Username -> password hash store with a small connection pool."""
+
+    schema = SCHEMA
+
+    def get_password_hash(self, username):
+        """Return the stored password hash for `username`, or None."""
+        with self.connection() as conn:
+            row = conn.execute('SELECT password_hash FROM user WHERE username = ?',
+                               (username,)).fetchone()
+        return row[0] if row else None
+
+    def create_user(self, username, password_hash):
+        """Insert a new user; return False if the username is taken."""
+        try:
+            with self.connection() as conn:
+                conn.execute('INSERT INTO user (username, password_hash) VALUES (?, ?)',
+                             (username, password_hash))
+        except sqlite3.IntegrityError:
+            return False
+        return True
+
+    def set_password_hash(self, username, password_hash):
+        with self.connection() as conn:
+            conn.execute('UPDATE user SET password_hash = ? WHERE username = ?',
+                         (password_hash, username))
+
+    def is_empty(self):
+        with self.connection() as conn:
+            return conn.execute('SELECT 1 FROM user LIMIT 1').fetchone() is None
+
+    def import_users_json(self, path):
+        """Copy users from a legacy users.json file; existing usernames are kept.
+
+        Returns the number of users inserted.
+        """
+        with open(path, 'r', encoding='utf-8') as f:
+            users = json.load(f)
+        records = [(name, entry['pw']) for name, entry in users.items() if entry.get('pw')]
+        with self.connection() as conn:
+            conn.execute('BEGIN IMMEDIATE')
+            try:
+                before = conn.total_changes
+                conn.executemany('INSERT OR IGNORE INTO user (username, password_hash) VALUES (?, ?)',
+                                 records)
+                inserted = conn.total_changes - before
+                conn.execute('COMMIT')
+            except Exception:
+                conn.execute('ROLLBACK')
+                raise
+        return inserted
+
+
+if __name__ == '__main__':
+    if len(sys.argv) < 2 or sys.argv[1] != 'migrate':
+        sys.exit('usage: python user_store.py migrate [users.json]')
+    source = sys.argv[2] if len(sys.argv) > 2 else 'users.json'
+    count = UserStore().import_users_json(source)
+    print(f"Imported {count} users from {source} into {USER_DB_PATH}")